@@ -134,7 +134,8 @@ class Analyzer:
                 'open': row.get('Open', row['Close']),
                 'high': row.get('High', row['Close']),
                 'low': row.get('Low', row['Close']),
-                'close': row['Close']
+                'close': row['Close'],
+                'volume': row.get('Volume', 0)
             })
         
         # Golden Cross (SMA 50 crosses above SMA 200 - Classic)
@@ -275,5 +276,19 @@ class Analyzer:
         if win_rate > 60:
             score += 3
             score_reasons.append(f"Highly Consistent ({win_rate:.0f}% Win) (+3)")
+
+        # 6. Relative Strength (percentile vs the universe, relative_strength.py)
+        rs = tech_data.get('rs')
+        if rs is not None:
+            if rs >= 80:
+                score += 1
+                score_reasons.append(f"Relative Strength Leader (RS {rs}) (+1)")
+            elif rs <= 20:
+                score -= 1
+                score_reasons.append(f"Relative Strength Laggard (RS {rs}) (-1)")
+            sector = tech_data.get('sector')
+            if sector and sector != 'Uncategorized' and tech_data.get('sector_rs', 0) >= 75 and rs >= 50:
+                score += 1
+                score_reasons.append(f"Leading Sector: {sector} (+1)")
             
         return score, score_reasons
@@ -1,20 +1,127 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, send_from_directory, g, Response
 import os
 import json
-from report_generator import ReportGenerator
+import time
+import threading
+from report_generator import ASSET_DIR, ReportGenerator
 from portfolio_manager import PortfolioManager
+from metrics import Registry, CONTENT_TYPE
+from datastore import data_mtime
 
 app = Flask(__name__)
 portfolio_mgr = PortfolioManager()
 generator = ReportGenerator()
 
+# Files that feed the dashboard; it is re-rendered only when one of them changes
+# (including the derived tables generate_dashboard reads, which the pipeline rewrites)
+DASHBOARD_INPUTS = [
+    "data/technical_data.json",
+    "data/pse_fundamentals.json",
+    "data/stock_metadata.json",
+    "data/news_data.json",
+    "data/portfolio.json",
+    "data/portfolio.wal",
+    "data/ledger.jsonl",
+    "data/scores.json",
+    "data/dividends.json",
+    "data/chart_series.json",
+    "data/timeframes.json",
+    "data/relative_strength.json",
+]
+AGE_TRACKED_FILES = ["data/technical_data.json", "data/pse_fundamentals.json"]
+
+_dashboard_cache = {'key': None, 'html': None}
+_dashboard_lock = threading.Lock()
+
+# --- Metrics ---
+registry = Registry()
+REQUESTS = registry.counter('pse_http_requests_total', 'HTTP requests by route, method and status.',
+                            labels=('route', 'method', 'status'))
+REQUEST_LATENCY = registry.histogram('pse_http_request_duration_seconds', 'HTTP request latency by route.',
+                                     labels=('route', 'method'))
+RENDER_TIME = registry.histogram('pse_dashboard_render_seconds', 'Time to regenerate report.html.',
+                                 buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0])
+CACHE_LOOKUPS = registry.counter('pse_dashboard_cache_total', 'Dashboard cache lookups by result.',
+                                 labels=('result',))
+PORTFOLIO_WRITE = registry.histogram('pse_portfolio_write_seconds', 'Latency of portfolio mutations (incl. file write).',
+                                     labels=('op',), buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0])
+
+
+def _cache_hit_ratio():
+    hits = CACHE_LOOKUPS.values.get(('hit',), 0)
+    total = hits + CACHE_LOOKUPS.values.get(('miss',), 0)
+    return {(): (hits / total) if total else 0.0}
+
+
+def _data_file_age():
+    now = time.time_ns()
+    ages = {}
+    for p in AGE_TRACKED_FILES:
+        mtime = data_mtime(p)
+        if mtime is not None:
+            ages[(os.path.basename(p),)] = (now - mtime) / 1e9
+    return ages
+
+
+registry.gauge('pse_dashboard_cache_hit_ratio', 'Share of dashboard requests served without re-rendering.',
+               fn=_cache_hit_ratio)
+registry.gauge('pse_data_file_age_seconds', 'Seconds since the data file was last written.',
+               labels=('file',), fn=_data_file_age)
+
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _note_status(response):
+    g.response_status = response.status_code
+    return response
+
+
+@app.teardown_request
+def _record_request(exc):
+    # Runs for every request, including ones that raised (which after_request may not see)
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    status = 500 if exc is not None else g.get('response_status', 500)
+    REQUESTS.inc(route, request.method, status)
+    REQUEST_LATENCY.observe(elapsed, route, request.method)
+
+
+def _inputs_key():
+    return tuple((p, data_mtime(p)) for p in DASHBOARD_INPUTS)
+
+
+def render_dashboard(force=False):
+    """Return dashboard HTML, regenerating only if a data file changed (or force)."""
+    with _dashboard_lock:
+        key = _inputs_key()
+        if not force and _dashboard_cache['html'] is not None and _dashboard_cache['key'] == key:
+            CACHE_LOOKUPS.inc('hit')
+            return _dashboard_cache['html']
+
+        CACHE_LOOKUPS.inc('miss')
+        start = time.perf_counter()
+        output_path = generator.generate_dashboard()
+        RENDER_TIME.observe(time.perf_counter() - start)
+        with open(output_path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        _dashboard_cache['key'] = _inputs_key()
+        _dashboard_cache['html'] = html
+        return html
+
+
 @app.route('/')
 def dashboard():
-    # Always regenerate for fresh data
-    output_path = generator.generate_dashboard()
-    # Serve the file content directly
-    with open(output_path, 'r', encoding='utf-8') as f:
-        return f.read()
+    # Regenerated whenever one of DASHBOARD_INPUTS changes
+    return render_dashboard()
+
+@app.route('/assets/<path:name>')
+def dashboard_asset(name):
+    # report.html links these with ?v=<content hash>, so they can be cached for long
+    return send_from_directory(os.path.abspath(ASSET_DIR), name, max_age=365 * 24 * 3600)
 
 @app.route('/api/add', methods=['POST'])
 def add_position():
@@ -22,31 +129,40 @@ def add_position():
     symbol = data.get('symbol')
     shares = float(data.get('shares', 0))
     price = float(data.get('price', 0))
-    
+
     if not symbol or shares <= 0 or price <= 0:
         return jsonify({'success': False, 'error': 'Invalid input'}), 400
-        
+
+    start = time.perf_counter()
     portfolio_mgr.add_position(symbol, shares, price)
+    PORTFOLIO_WRITE.observe(time.perf_counter() - start, 'add')
     return jsonify({'success': True})
 
 @app.route('/api/remove', methods=['POST'])
 def remove_position():
     data = request.json
     symbol = data.get('symbol')
-    
+
     if not symbol:
         return jsonify({'success': False, 'error': 'Symbol required'}), 400
-        
+
+    start = time.perf_counter()
     portfolio_mgr.remove_position(symbol)
+    PORTFOLIO_WRITE.observe(time.perf_counter() - start, 'remove')
     return jsonify({'success': True})
 
 @app.route('/api/refresh', methods=['POST'])
 def refresh():
     # Just regenerating the report is enough, the client reload will fetch it
-    generator.generate_dashboard()
+    render_dashboard(force=True)
     return jsonify({'success': True})
 
+@app.route('/metrics')
+def metrics():
+    return Response(registry.render(), mimetype=None, content_type=CONTENT_TYPE)
+
 if __name__ == '__main__':
     print("🚀 Starting PSE Pro Dashboard...")
     print("👉 Open http://localhost:5000 in your browser")
+    print("📈 Metrics at http://localhost:5000/metrics")
     app.run(debug=True, port=5000)
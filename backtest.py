@@ -1,15 +1,20 @@
-import json
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from analyzer import Analyzer
-import os
+from datastore import load_data
+import dividends
+import relative_strength
 
 class Backtester:
     def __init__(self):
         self.analyzer = Analyzer()
-        self.tech_data = self._load_json("data/technical_data.json")
-        self.fund_data = self._load_json("data/pse_fundamentals.json")
+        self.tech_data = load_data("data/technical_data.json")
+        self.fund_data = load_data("data/pse_fundamentals.json")
+        # Typed dividend events, so each checkpoint's TTM stats are a bisect, not a re-parse
+        self.div_table = dividends.ensure_table(self.fund_data)
+        # Universe/sector ranks for every day, read point-in-time at each checkpoint
+        self.strength = relative_strength.ensure_table(self.tech_data)
         # stock_meta not strictly needed if we iterate tech_data keys
         
         # Prepare data cache to avoid re-parsing for every date
@@ -18,12 +23,6 @@ class Backtester:
             if 'history' in data:
                 self.history_cache[symbol] = pd.DataFrame(data['history'])
                 
-    def _load_json(self, path):
-        if os.path.exists(path):
-            with open(path, 'r') as f:
-                return json.load(f)
-        return {}
-
     def run_backtest(self, months_back=12, thresholds=[5, 6, 7]):
         results_md = "# Backtest Results\n\n"
         results_md += f"**Date**: {datetime.now().strftime('%Y-%m-%d')}\n"
@@ -78,7 +77,11 @@ class Backtester:
                     
                     # RUN STRATEGY
                     trend_res = self.analyzer.analyze_trend(df_analysis)
-                    f_data = self.fund_data.get(symbol, {})
+                    trend_res.update(relative_strength.at(self.strength, symbol, past_data.iloc[-1]['time']))
+                    # Fundamentals with the dividends known as of the checkpoint
+                    f_data = dict(self.fund_data.get(symbol, {}))
+                    f_data.update(dividends.stats(self.div_table.get(symbol), date_str,
+                                                  past_data.iloc[-1]['close'], point_in_time=True))
                     score, _ = self.analyzer.calculate_score(trend_res, f_data)
                     
                     # 2. Outcome Measurement (Next 30 Days)
@@ -136,5 +139,13 @@ class Backtester:
         print(summary_table)
 
 if __name__ == "__main__":
-    b = Backtester()
-    b.run_backtest(months_back=12)
+    import argparse
+    from profiling import Profiler, add_profile_args
+    
+    parser = argparse.ArgumentParser(description="Backtest the Top Pick score thresholds")
+    add_profile_args(parser)
+    args = parser.parse_args()
+    
+    with Profiler.from_args('backtest', args):
+        b = Backtester()
+        b.run_backtest(months_back=12)
@@ -0,0 +1,2 @@
+# benchmarks
+# Reproducible benchmarks over a seeded synthetic PSE universe (see benchmarks/run.py)
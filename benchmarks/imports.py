@@ -0,0 +1,83 @@
+# benchmarks/imports.py
+# Import-time budget for the entry points: cold start of each CLI module in a fresh interpreter
+#
+#   python -m benchmarks.imports              # exit status 1 if any module is over budget
+#   python -m benchmarks.imports --repeat 5
+#
+# A module fails if its import (cumulative, from -X importtime) takes longer than
+# its budget, or if it loads a heavy dependency its import path should not need
+# (pandas for `portfolio.py list`, say). benchmarks.run records the same numbers
+# in its results file.
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('pandas', 'numpy', 'requests', 'bs4', 'flask')
+
+# module -> (budget in ms, heavy modules it must not import)
+BUDGETS = {
+    'stock_data':        (20, HEAVY),
+    'scores':            (50, HEAVY),
+    'portfolio':         (50, HEAVY),
+    'main':              (50, HEAVY),
+    'pipeline':          (100, HEAVY),
+    'fetch_news':        (150, ('pandas', 'numpy', 'bs4', 'flask')),
+    'suggest_portfolio': (150, ('pandas', 'requests', 'bs4', 'flask')),
+}
+
+
+def measure(module, repeat=3):
+    """(best cumulative import ms, heavy modules loaded) for `module` in a fresh interpreter."""
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    best, loaded = None, []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_DIR,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+        # "import time: self [us] | cumulative | imported package"
+        for line in proc.stderr.splitlines():
+            parts = line.split('|')
+            if line.startswith('import time:') and len(parts) == 3 and parts[2].strip() == module:
+                ms = int(parts[1]) / 1000.0
+                best = ms if best is None else min(best, ms)
+        loaded = [m for m in proc.stdout.strip().split(',') if m]
+    return best, loaded
+
+
+def check(repeat=3, budgets=BUDGETS):
+    """{module: {'ms', 'budget_ms', 'heavy', 'ok'}} for every budgeted module."""
+    results = {}
+    for module, (budget, forbidden) in budgets.items():
+        ms, loaded = measure(module, repeat)
+        heavy = [m for m in loaded if m in forbidden]
+        results[module] = {'ms': round(ms, 1), 'budget_ms': budget, 'heavy': heavy,
+                           'ok': ms <= budget and not heavy}
+    return results
+
+
+def print_results(results):
+    print(f" {'MODULE':<20} {'IMPORT':>9} {'BUDGET':>9}  HEAVY")
+    for module, r in results.items():
+        flag = "" if r['ok'] else "  OVER"
+        print(f" {module:<20} {r['ms']:>7.1f}ms {r['budget_ms']:>7}ms  {', '.join(r['heavy']) or '-'}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the entry points' import time against their budgets")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per module; the fastest is kept")
+    args = parser.parse_args()
+
+    results = check(args.repeat)
+    print_results(results)
+    failed = [m for m, r in results.items() if not r['ok']]
+    if failed:
+        print(f"\n[!] Over budget: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+# benchmarks/run.py
+# Timed benchmark cases over synthetic universes; results go to a JSON file for commit-to-commit comparison
+#
+#   python -m benchmarks.run                          # 300, 3,000 and 30,000 symbols
+#   python -m benchmarks.run --sizes 300 3000 --cases analyze_trend generate_dashboard
+#   python -m benchmarks.run --compare benchmarks/results/<old-commit>.json
+#   python -m benchmarks.imports                      # entry-point import-time budgets only
+#
+# Cases run inside a scratch directory (the modules read and write data/ relative
+# to the working directory), so the real data/ folder is never touched.
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from analyzer import Analyzer
+from backtest import Backtester
+from recommender import Recommender
+from report_generator import ReportGenerator, _spark_cache, _sparkline_svgs
+import dividends
+from scores import FUNDAMENTAL_DATA_FILE, TECHNICAL_DATA_FILE, fundamentals_view
+import datastore
+from datastore import load_data, resolve, save_data
+from benchmarks import imports
+from benchmarks.synthetic import SyntheticUniverse
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+
+DEFAULT_SIZES = [300, 3000, 30000]
+CASES = [
+    'analyze_trend',
+    'save_technical',
+    'load_technical',
+    'save_fundamentals',
+    'load_fundamentals',
+    'build_dividends',
+    'build_sparklines',
+    'calculate_score',
+    'recommend_by_category',
+    'backtest_init',
+    'run_backtest',
+    'generate_dashboard',
+]
+
+
+def _git_commit():
+    try:
+        sha = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+class Timer:
+    """Accumulates time over many calls (per-symbol cases) or one block."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.items = 0
+
+    @contextlib.contextmanager
+    def measure(self, items=1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.items += items
+
+    def best_of(self, repeat, fn, items=1):
+        """Run fn() `repeat` times and keep the fastest run (for single-block cases)."""
+        best, value = None, None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            value = fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        self.seconds += best
+        self.items += items
+        return value
+
+    def result(self):
+        return {
+            'seconds': round(self.seconds, 4),
+            'items': self.items,
+            'per_item_ms': round(self.seconds / self.items * 1000, 4) if self.items else None,
+        }
+
+
+def run_size(n_symbols, args):
+    """Run the selected cases for one universe size. Returns {case: result}."""
+    universe = SyntheticUniverse(n_symbols, days=args.days, seed=args.seed)
+    results = {}
+    timers = {case: Timer() for case in args.cases}
+
+    def want(case):
+        return case in timers
+
+    print(f"\n[{n_symbols} symbols x {args.days} days] generating universe...")
+    meta = universe.write("data")
+    categories = universe.categories(meta)
+
+    # analyze_trend (bar generation is outside the timed region)
+    analysis_results = {}
+    analyzer = Analyzer()
+    timer = timers.get('analyze_trend', Timer())
+    for symbol, bars in universe.iter_bars():
+        with timer.measure():
+            analysis_results[symbol] = analyzer.analyze_trend(bars)
+
+    # Save/load paths (datastore settings; run with PSE_DATA_FORMAT=json to time the JSON files)
+    timers.get('save_technical', Timer()).best_of(
+        args.repeat, lambda results=analysis_results: save_data(TECHNICAL_DATA_FILE, results), n_symbols)
+    del analysis_results
+    gc.collect()
+
+    fund_data = load_data(FUNDAMENTAL_DATA_FILE)  # as written by SyntheticUniverse.write (JSON)
+    timers.get('save_fundamentals', Timer()).best_of(
+        args.repeat, lambda fund_data=fund_data: save_data(FUNDAMENTAL_DATA_FILE, fund_data), n_symbols)
+    del fund_data
+
+    tech_data = timers.get('load_technical', Timer()).best_of(
+        args.repeat, lambda: load_data(TECHNICAL_DATA_FILE), n_symbols)
+    fund_data = timers.get('load_fundamentals', Timer()).best_of(
+        args.repeat, lambda: load_data(FUNDAMENTAL_DATA_FILE), n_symbols)
+    file_bytes = {name: os.path.getsize(resolve(path))
+                  for name, path in [('technical', TECHNICAL_DATA_FILE), ('fundamentals', FUNDAMENTAL_DATA_FILE)]}
+
+    if want('build_sparklines'):
+        # Cold cache each time (a warm re-render only hashes the rows)
+        series = {s: (t.get('sparkline'), "#10b981" if "Uptrend" in t.get('trend', '') else "#ef4444")
+                  for s, t in tech_data.items()}
+
+        def sparklines():
+            _spark_cache.clear()
+            return _sparkline_svgs(series, width=80, height=20)
+
+        timers['build_sparklines'].best_of(args.repeat, sparklines, n_symbols)
+
+    prices = {s: t.get('last_close') for s, t in tech_data.items()}
+    div_table = timers.get('build_dividends', Timer()).best_of(
+        args.repeat, lambda fund_data=fund_data: dividends.build_table(fund_data, prices), n_symbols)
+    dividends.save_table(div_table)
+
+    if want('calculate_score'):
+        now = datetime.datetime.now()
+        for symbol, t in tech_data.items():
+            f = fundamentals_view(fund_data.get(symbol, {}), t.get('last_close'), now, div_table.get(symbol))
+            with timers['calculate_score'].measure():
+                analyzer.calculate_score(t, f)
+
+    if want('recommend_by_category'):
+        timers['recommend_by_category'].best_of(
+            args.repeat, lambda tech_data=tech_data: Recommender().recommend_by_category(tech_data, categories), n_symbols)
+
+    del tech_data, fund_data, div_table
+    gc.collect()
+
+    if want('backtest_init') or want('run_backtest'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            timer = timers.get('backtest_init', Timer())
+            with timer.measure(n_symbols):
+                backtester = Backtester()
+            if want('run_backtest'):
+                with timers['run_backtest'].measure(n_symbols):
+                    backtester.run_backtest(months_back=args.backtest_months, thresholds=[6])
+        del backtester
+        gc.collect()
+
+    if want('generate_dashboard'):
+        # Cold render: data/scores.json is removed first, so the score table is built inside
+        def render():
+            if os.path.exists("data/scores.json"):
+                os.remove("data/scores.json")
+            ReportGenerator().generate_dashboard("report.html")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            timers['generate_dashboard'].best_of(args.repeat, render, n_symbols)
+
+    for case in args.cases:
+        results[case] = timers[case].result()
+        print(f"  {case:<24} {results[case]['seconds']:>10.3f}s  ({results[case]['per_item_ms']} ms/item)")
+    for name, size in file_bytes.items():
+        for case in (f'save_{name}', f'load_{name}'):
+            if want(case):
+                results[case]['bytes'] = size
+    if want('generate_dashboard'):
+        results['generate_dashboard']['report_bytes'] = os.path.getsize("report.html")
+    return results
+
+
+def compare(base, current):
+    """Print current vs base timings for every (size, case) present in both."""
+    print(f"\n{'='*72}")
+    print(f" {base['meta']['commit']} -> {current['meta']['commit']}")
+    print(f"{'='*72}")
+    print(f" {'SIZE':>6}  {'CASE':<24} {'BASE':>10} {'CURRENT':>10} {'RATIO':>7}")
+    for size, cases in current['results'].items():
+        for case, r in cases.items():
+            b = base['results'].get(size, {}).get(case)
+            if not b or not b['seconds']:
+                continue
+            ratio = r['seconds'] / b['seconds']
+            flag = "  slower" if ratio > 1.10 else ("  faster" if ratio < 0.90 else "")
+            print(f" {size:>6}  {case:<24} {b['seconds']:>9.3f}s {r['seconds']:>9.3f}s {ratio:>6.2f}x{flag}")
+    for module, r in current.get('imports', {}).items():
+        b = base.get('imports', {}).get(module)
+        if b and b['ms']:
+            print(f" {'import':>6}  {module:<24} {b['ms']:>8.1f}ms {r['ms']:>8.1f}ms {r['ms'] / b['ms']:>6.2f}x")
+    print(f"{'='*72}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis, scoring, backtest and report paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Universe sizes (symbols)")
+    parser.add_argument('--days', type=int, default=400, help="Trading days of bars per symbol (default 400)")
+    parser.add_argument('--seed', type=int, default=42, help="Generator seed (default 42)")
+    parser.add_argument('--cases', nargs='+', default=CASES, help="Subset of: " + ", ".join(CASES))
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Runs of each single-block case; the fastest is kept (default 3)")
+    parser.add_argument('--backtest-months', type=int, default=1,
+                        help="months_back for run_backtest (2 checkpoints per month; default 1)")
+    parser.add_argument('--out', help="Results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    unknown = [c for c in args.cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    args.cases = [c for c in CASES if c in args.cases]
+
+    commit = _git_commit()
+    out_path = os.path.abspath(args.out or os.path.join(RESULTS_DIR, f"{commit}.json"))
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'seed': args.seed,
+            'days': args.days,
+            'data_format': datastore.DATA_FORMAT if datastore.msgpack else 'json',
+            'data_compression': datastore.DATA_COMPRESSION,
+            'repeat': args.repeat,
+            'backtest_months': args.backtest_months,
+        },
+        'results': {},
+    }
+
+    print("\n[imports] entry-point cold start")
+    report['imports'] = imports.check(args.repeat)
+    imports.print_results(report['imports'])
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="pse-bench-") as scratch:
+        os.chdir(scratch)
+        try:
+            for size in args.sizes:
+                report['results'][str(size)] = run_size(size, args)
+                gc.collect()
+        finally:
+            os.chdir(cwd)
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nResults saved to {out_path}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
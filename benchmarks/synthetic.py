@@ -0,0 +1,212 @@
+# benchmarks/synthetic.py
+# Seeded synthetic PSE universe: OHLCV bars plus matching metadata, fundamentals, news and portfolio
+#
+# Every symbol draws from its own generator seeded with (seed, index), so a
+# 300-symbol universe is an exact prefix of the 3,000 and 30,000 ones and bars
+# can be regenerated on demand instead of holding N DataFrames in memory.
+import datetime
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from stock_data import Universe
+
+SECTORS = [
+    ("Financials", ["Banks", "Other Financial Institutions"]),
+    ("Industrial", ["Electricity, Energy, Power and Water", "Food, Beverage and Tobacco", "Construction, Infrastructure and Allied Services"]),
+    ("Holding Firms", ["Holding Firms"]),
+    ("Property", ["Property"]),
+    ("Services", ["Telecommunications", "Transportation Services", "Retail", "Casinos and Gaming"]),
+    ("Mining & Oil", ["Mining", "Oil"]),
+    ("Small, Medium & Emerging Board", ["SME"]),
+]
+SECTOR_WEIGHTS = [0.14, 0.22, 0.12, 0.16, 0.24, 0.08, 0.04]
+
+NEWS_SOURCES = ["BusinessWorld", "Inquirer.net", "Philstar.com", "Manila Bulletin", "BusinessMirror", "Rappler"]
+NEWS_TEMPLATES = [
+    "{sym} net income up {pct}% in {q}",
+    "{sym} declares cash dividend",
+    "{sym} eyes expansion, sets {amt}B capex",
+    "{sym} shares slip on profit taking",
+    "{sym} posts {pct}% revenue growth in {q}",
+    "{sym} board approves share buyback program",
+]
+
+
+def _symbol(i):
+    """0 -> 'BAA', 1 -> 'BAB', ...: unique 3-4 letter tickers."""
+    n = i + 26 ** 2
+    letters = []
+    while n:
+        n, r = divmod(n, 26)
+        letters.append(chr(ord('A') + r))
+    return "".join(reversed(letters))
+
+
+class SyntheticUniverse:
+    def __init__(self, n_symbols, days=400, seed=42, end=None):
+        self.n_symbols = n_symbols
+        self.days = days
+        self.seed = seed
+        # Bars end today so Backtester's date checkpoints land inside the history
+        self.end = pd.Timestamp(end or datetime.date.today()).normalize()
+        self.dates = pd.bdate_range(end=self.end, periods=days)
+        self.symbols = [_symbol(i) for i in range(n_symbols)]
+
+    def _rng(self, stream, i=None):
+        """Per-symbol generator for index i, or a universe-wide one when i is None."""
+        return np.random.default_rng([self.seed, stream] if i is None else [self.seed, stream, i])
+
+    def ohlcv(self, i):
+        """Raw (open, high, low, close, volume) arrays for symbol index i."""
+        rng = self._rng(0, i)
+        days = self.days
+
+        start = float(np.clip(np.exp(rng.normal(np.log(5.0), 1.5)), 0.1, 2000.0))
+        vol = rng.uniform(0.01, 0.05)
+        drift = rng.normal(0.0002, 0.0005)
+        # Student-t returns for fat tails, scaled to the target daily volatility
+        rets = drift + rng.standard_t(4, days) * vol / np.sqrt(2.0)
+        close = start * np.exp(np.cumsum(rets))
+
+        gap = rng.normal(0.0, vol / 4, days)
+        open_ = np.concatenate(([start], close[:-1])) * (1 + gap)
+        wick_up = np.abs(rng.normal(0.0, vol / 2, days))
+        wick_dn = np.abs(rng.normal(0.0, vol / 2, days))
+        high = np.maximum(open_, close) * (1 + wick_up)
+        low = np.minimum(open_, close) * (1 - wick_dn)
+
+        # Liquidity tiers: a few blue chips, a long tail of thin names with no-trade days
+        base_volume = np.exp(rng.normal(np.log(200_000), 1.8))
+        volume = rng.lognormal(np.log(base_volume), 0.6, days)
+        volume[rng.random(days) < 0.03] *= rng.uniform(2.5, 6.0)
+        volume[rng.random(days) < 0.02] = 0
+
+        decimals = 4 if start < 1 else 2
+        return (np.round(open_, decimals), np.round(high, decimals), np.round(low, decimals),
+                np.round(close, decimals), np.floor(volume))
+
+    def bars(self, i):
+        """OHLCV DataFrame for symbol index i, shaped like DataFetcher.fetch_investagrams output."""
+        o, h, l, c, v = self.ohlcv(i)
+        return pd.DataFrame({'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v}, index=self.dates)
+
+    def iter_bars(self):
+        for i, symbol in enumerate(self.symbols):
+            yield symbol, self.bars(i)
+
+    def metadata(self):
+        rng = self._rng(1)
+        picks = rng.choice(len(SECTORS), size=self.n_symbols, p=SECTOR_WEIGHTS)
+        meta = {}
+        for i, (symbol, s) in enumerate(zip(self.symbols, picks)):
+            sector, subsectors = SECTORS[s]
+            meta[symbol] = {
+                "symbol": symbol,
+                "name": f"{symbol.title()} Holdings Corporation",
+                "sector": sector,
+                "subsector": subsectors[i % len(subsectors)],
+                "listingDate": (datetime.date(1950, 1, 1) + datetime.timedelta(days=int(rng.integers(0, 27000)))).strftime("%b %d, %Y"),
+            }
+        return meta
+
+    def categories(self, meta=None):
+        """{sector: [symbols]} with the same normalisation as stock_data.STOCK_CATEGORIES."""
+        return Universe(meta or self.metadata()).categories
+
+    def stock_ids(self):
+        return {s: {"symbol": s, "cmpy_id": str(100 + i), "security_id": str(1000 + i)}
+                for i, s in enumerate(self.symbols)}
+
+    def _dividends(self, rng, last_close):
+        if rng.random() > 0.45:
+            return []
+        per_year = int(rng.choice([1, 2, 4], p=[0.5, 0.3, 0.2]))
+        amount = last_close * rng.uniform(0.01, 0.08) / per_year
+        first = self.end - pd.Timedelta(days=int(rng.integers(5, 365 // per_year)))
+        history = []
+        for k in range(3 * per_year):
+            ex = first - pd.Timedelta(days=int(365 / per_year * k))
+            history.append({
+                "type": "Cash",
+                "amount": round(amount * rng.uniform(0.9, 1.1), 6),
+                "ex_date": ex.strftime("%b %d, %Y"),
+                "pay_date": (ex + pd.Timedelta(days=14)).strftime("%b %d, %Y"),
+            })
+        return history
+
+    def fundamentals(self):
+        updated = self.end.strftime("%Y-%m-%d 10:00:00")
+        out = {}
+        for i, symbol in enumerate(self.symbols):
+            _, high, low, close, _ = self.ohlcv(i)
+            rng = self._rng(2, i)
+            last_close = float(close[-1])
+            shares = float(np.round(np.exp(rng.normal(np.log(1e9), 1.2))))
+            eps = round(last_close / rng.uniform(4, 40) * (1 if rng.random() > 0.15 else -1), 2)
+            out[symbol] = {
+                "symbol": symbol,
+                "pe_ratio": round(last_close / eps, 2) if eps else None,
+                "market_cap": round(last_close * shares, 1),
+                "outstanding_shares": shares,
+                "high_52": float(high[-252:].max()),
+                "low_52": float(low[-252:].min()),
+                "eps": eps,
+                "div_history": self._dividends(rng, last_close),
+                "last_updated": updated,
+                "status": "Suspended" if rng.random() < 0.01 else "Open",
+            }
+        return out
+
+    def news(self):
+        out = {}
+        for i, symbol in enumerate(self.symbols):
+            rng = self._rng(3, i)
+            if rng.random() > 0.3:
+                continue
+            items = []
+            for k in range(int(rng.integers(1, 11))):
+                published = self.end - pd.Timedelta(hours=int(rng.integers(1, 24 * 120)))
+                title = NEWS_TEMPLATES[int(rng.integers(len(NEWS_TEMPLATES)))].format(
+                    sym=symbol, pct=int(rng.integers(2, 60)), q=f"Q{int(rng.integers(1, 5))}",
+                    amt=int(rng.integers(1, 50)))
+                items.append({
+                    "title": title,
+                    "source": NEWS_SOURCES[int(rng.integers(len(NEWS_SOURCES)))],
+                    "date": published.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+                    "link": f"https://news.example.com/{symbol.lower()}/{k}",
+                })
+            out[symbol] = items
+        return out
+
+    def portfolio(self, positions=8):
+        rng = self._rng(4)
+        out = {}
+        stamp = self.end.strftime("%Y-%m-%d 09:30:00")
+        for i in rng.choice(self.n_symbols, size=min(positions, self.n_symbols), replace=False):
+            close = float(self.ohlcv(int(i))[3][-1])
+            out[self.symbols[int(i)]] = {
+                "shares": float(rng.integers(1, 50) * 100),
+                "avg_price": round(close * rng.uniform(0.8, 1.2), 2),
+                "date_added": stamp,
+                "last_updated": stamp,
+            }
+        return out
+
+    def write(self, data_dir="data"):
+        """Write every input file except technical_data.json (that comes from analyze_trend)."""
+        os.makedirs(data_dir, exist_ok=True)
+        meta = self.metadata()
+        files = {
+            "stock_metadata.json": meta,
+            "stock_ids.json": self.stock_ids(),
+            "pse_fundamentals.json": self.fundamentals(),
+            "news_data.json": self.news(),
+            "portfolio.json": self.portfolio(),
+        }
+        for name, payload in files.items():
+            with open(os.path.join(data_dir, name), 'w') as f:
+                json.dump(payload, f, indent=4)
+        return meta
@@ -0,0 +1,139 @@
+# board_lots.py
+# PSE board lots: the minimum/multiple share quantity an order must be in, by price band
+#
+# PSE trading rules: orders are placed in multiples of the board lot for the
+# stock's price band; tick size (minimum price step) is listed alongside.
+# allocate() turns target weights into whole lots for a budget.
+import heapq
+
+# (lowest price in band, tick size, board lot), ascending by price
+BOARD_LOTS = [
+    (0.0001,   0.0001, 1_000_000),
+    (0.0100,   0.0010,   100_000),
+    (0.0500,   0.0010,    10_000),
+    (0.2500,   0.0050,    10_000),
+    (0.5000,   0.0100,     1_000),
+    (5.0000,   0.0100,       100),
+    (10.0000,  0.0200,       100),
+    (20.0000,  0.0500,       100),
+    (50.0000,  0.0500,        10),
+    (100.0000, 0.1000,        10),
+    (200.0000, 0.2000,        10),
+    (500.0000, 0.5000,        10),
+    (1000.0000, 1.0000,        5),
+    (2000.0000, 2.0000,        5),
+    (5000.0000, 5.0000,        5),
+]
+
+
+def _band(price):
+    band = BOARD_LOTS[0]
+    for entry in BOARD_LOTS:
+        if price < entry[0]:
+            break
+        band = entry
+    return band
+
+
+def board_lot(price):
+    """Board lot (shares) for a stock trading at `price`."""
+    return _band(price)[2]
+
+
+def tick_size(price):
+    return _band(price)[1]
+
+
+def round_to_lot(shares, price):
+    """Largest whole number of board lots not exceeding `shares` (may be 0)."""
+    lot = board_lot(price)
+    return int(shares // lot) * lot
+
+
+# --- Integer allocation ---
+
+UNIT = 10_000      # money is handled in integer units of P0.0001 so lot sums are exact
+MAX_NODES = 20_000  # branch-and-bound budget per allocation
+
+
+def allocate(budget, prices, weights, max_drift=0.05, max_nodes=MAX_NODES):
+    """
+    Whole board lots for target weights, deploying as much of `budget` as possible.
+
+    prices/weights: {symbol: price}, {symbol: target weight of budget}.
+    Each stock stays within `max_drift` (absolute weight) of its target, or within
+    one lot of it where lots are coarser than that (small budgets, pricey lots).
+    1. Floor: as many lots as fit under each target.
+    2. Greedy fill: spend the remainder one lot at a time on the stocks furthest below target.
+    3. Repair: branch-and-bound over one lot more/less per stock (largest lot cost
+       first) for a combination that leaves less idle cash, within `max_nodes` nodes.
+    Returns {'shares': {symbol: shares}, 'cost', 'cash', 'weights': {symbol: actual weight}}.
+    """
+    symbols = [s for s in weights if prices.get(s, 0) > 0 and weights[s] > 0]
+    lot = {s: board_lot(prices[s]) for s in symbols}
+    cost = {s: int(round(prices[s] * UNIT)) * lot[s] for s in symbols}
+    total = int(budget * UNIT)
+    target = {s: weights[s] * total for s in symbols}
+    floor = {s: int(min(target[s], total) // cost[s]) for s in symbols}
+    upper = {s: max((weights[s] + max_drift) * total, (floor[s] + 1) * cost[s]) for s in symbols}
+    lots = dict(floor)
+    cash = total - sum(lots[s] * cost[s] for s in symbols)
+
+    # Greedy: a lot at a time to whichever stock is furthest below target, while any fits
+    heap = [(lots[s] * cost[s] - target[s], s) for s in symbols]
+    heapq.heapify(heap)
+    while heap:
+        _, s = heapq.heappop(heap)
+        if cost[s] <= cash and (lots[s] + 1) * cost[s] <= upper[s]:
+            lots[s] += 1
+            cash -= cost[s]
+            heapq.heappush(heap, (lots[s] * cost[s] - target[s], s))
+
+    # Repair: one lot more or less per stock (inside its band) -- can that leave less cash?
+    items = []
+    for s in symbols:
+        low = min(-int(-max(target[s] - max_drift * total, 0) // cost[s]), floor[s])
+        high = max(int(min(upper[s], total) // cost[s]), floor[s])
+        options = [k for k in (lots[s], lots[s] + 1, lots[s] - 1) if low <= k <= high]
+        items.append((cost[s], min(options), [k - min(options) for k in options], s))
+    items.sort(key=lambda item: -item[0])
+    spare = total - sum(c * base for c, base, _, _ in items)
+    # reach[i]: most the items from i on could add above their base
+    reach = [0] * (len(items) + 1)
+    for i in range(len(items) - 1, -1, -1):
+        reach[i] = reach[i + 1] + items[i][0] * max(items[i][2])
+
+    best = {'left': cash, 'pick': None}
+    nodes = [0]
+    pick = [0] * len(items)
+
+    def search(i, left):
+        nodes[0] += 1
+        if i == len(items):
+            if left < best['left']:
+                best['left'], best['pick'] = left, list(pick)
+            return
+        if left - min(left, reach[i]) >= best['left'] or nodes[0] > max_nodes:
+            return  # even spending everything reachable can't beat the best
+        c, _, offsets, _ = items[i]
+        for k in offsets:  # greedy's count first
+            if k * c <= left:
+                pick[i] = k
+                search(i + 1, left - k * c)
+        pick[i] = 0
+
+    if cash > 0:
+        search(0, spare)
+    if best['pick'] is not None:
+        for (c, base, _, s), k in zip(items, best['pick']):
+            lots[s] = base + k
+        cash = best['left']
+
+    shares = {s: lots[s] * lot[s] for s in symbols}
+    spent = total - cash
+    return {
+        'shares': shares,
+        'cost': spent / UNIT,
+        'cash': cash / UNIT,
+        'weights': {s: lots[s] * cost[s] / total if total else 0.0 for s in symbols},
+    }
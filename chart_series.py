@@ -0,0 +1,106 @@
+# chart_series.py
+# Multi-resolution price series for the stock detail chart, precomputed per symbol
+#
+# data/chart_series.json (stored through datastore) holds, for every symbol in
+# technical_data.json, columnar series at up to three resolutions:
+#   D  last 3 months of daily bars as candles   {'t', 'o', 'h', 'l', 'c'}
+#   W  last year of closes, ~weekly density     {'t', 'c'}
+#   M  the whole stored history, ~monthly       {'t', 'c'}  (only once it spans > 1 year)
+# W and M are downsampled with Largest-Triangle-Three-Buckets (Steinarsson 2013),
+# which keeps the peaks and troughs a plain every-Nth-bar sample would drop.
+# The dashboard modal starts on the coarsest series and switches by zoom level.
+import numpy as np
+
+from datastore import data_mtime, load_data, save_data
+
+CHARTS_FILE = "data/chart_series.json"
+TECHNICAL_DATA_FILE = "data/technical_data.json"
+DAILY_BARS = 63   # ~3 months of trading days
+YEAR_BARS = 252
+WEEKS = 52
+DAYS_PER_MONTH = 30.44
+
+
+def lttb(x, y, n_out):
+    """Indices of the `n_out` points of (x, y) that Largest-Triangle-Three-Buckets keeps (x ascending)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # n_out - 2 buckets over the interior points; the first and last points are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Centroid of the bucket after each one (the last interior bucket looks at the final point)
+    counts = np.diff(np.append(edges[1:], n))
+    cxs = np.add.reduceat(x, edges[1:]) / counts
+    cys = np.add.reduceat(y, edges[1:]) / counts
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = cxs[i], cys[i]
+        # Triangle (previous pick, candidate, next bucket's centroid): keep the largest
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def _line(times, days, closes, n_out):
+    idx = lttb(days, closes, n_out)
+    return {'t': [times[i] for i in idx], 'c': np.round(closes[idx], 4).tolist()}
+
+
+def build(history):
+    """Series record for one symbol's technical_data 'history' ([] / None -> {})."""
+    if not history:
+        return {}
+    times = [b['time'] for b in history]
+    closes = np.array([b['close'] for b in history], dtype=float)
+    days = np.array([t[:10] for t in times], dtype='datetime64[D]').astype(float)
+
+    daily = history[-DAILY_BARS:]
+    record = {'D': {
+        't': times[-DAILY_BARS:],
+        'o': [round(float(b['open']), 4) for b in daily],
+        'h': [round(float(b['high']), 4) for b in daily],
+        'l': [round(float(b['low']), 4) for b in daily],
+        'c': np.round(closes[-DAILY_BARS:], 4).tolist(),
+    }}
+    if len(history) > DAILY_BARS:
+        record['W'] = _line(times[-YEAR_BARS:], days[-YEAR_BARS:], closes[-YEAR_BARS:], WEEKS)
+    if len(history) > YEAR_BARS:
+        months = int((days[-1] - days[0]) / DAYS_PER_MONTH) + 1
+        record['M'] = _line(times, days, closes, months)
+    return record
+
+
+def build_table(tech_data):
+    """{symbol: record} for every technical_data entry."""
+    return {symbol: build(t.get('history')) for symbol, t in tech_data.items() if isinstance(t, dict)}
+
+
+def save_table(table):
+    """Persist the table, stamped with the technical data file it was built from."""
+    save_data(CHARTS_FILE, {'source': data_mtime(TECHNICAL_DATA_FILE), 'symbols': table})
+
+
+def load_table():
+    """The persisted table, or None if missing or built from other technical data."""
+    stored = load_data(CHARTS_FILE)
+    if not stored or stored.get('source') != data_mtime(TECHNICAL_DATA_FILE):
+        return None
+    return stored.get('symbols')
+
+
+def ensure_table(tech_data=None):
+    """Current table, rebuilding (and saving) it if the technical data changed since it was built."""
+    table = load_table()
+    if table is not None:
+        return table
+    if tech_data is None:
+        tech_data = load_data(TECHNICAL_DATA_FILE)
+    table = build_table(tech_data)
+    save_table(table)
+    return table
@@ -5,6 +5,9 @@ import requests
 from bs4 import BeautifulSoup
 import datetime
 import time
+from tracing import span, record_request
+
+INVESTAGRAMS_HOST = "webapi.investagrams.com"
 
 
 class DataFetcher:
@@ -27,7 +30,7 @@ class DataFetcher:
             now = int(datetime.datetime.now().timestamp())
             past = int((datetime.datetime.now() - datetime.timedelta(days=days)).timestamp())
             
-            url = f"https://webapi.investagrams.com/InvestaApi/TradingViewChart/history?symbol={symbol}&resolution=D&from={past}&to={now}"
+            url = f"https://{INVESTAGRAMS_HOST}/InvestaApi/TradingViewChart/history?symbol={symbol}&resolution=D&from={past}&to={now}"
             
             # Simplified headers, Mimic browser
             headers = {
@@ -35,28 +38,36 @@ class DataFetcher:
                 "Referer": "https://www.investagrams.com/",
             }
             
-            resp = requests.get(url, headers=headers, timeout=10)
+            start = time.perf_counter()
+            ok = False
+            try:
+                with span('fetch'):
+                    resp = requests.get(url, headers=headers, timeout=10)
+                ok = resp.status_code == 200
+            finally:
+                record_request(INVESTAGRAMS_HOST, symbol, time.perf_counter() - start, ok)
             
             if resp.status_code != 200:
                 return None
                 
-            data = resp.json()
-            
-            if "t" not in data or not data["t"]:
-                return None
+            with span('parse'):
+                data = resp.json()
                 
-            # Parse Data
-            dates = [datetime.datetime.fromtimestamp(ts) for ts in data["t"]]
-            
-            df = pd.DataFrame({
-                'Open': data['o'],
-                'High': data['h'],
-                'Low': data['l'],
-                'Close': data['c'],
-                'Volume': data['v']
-            }, index=dates)
-            
-            df.index.name = 'Date'
+                if "t" not in data or not data["t"]:
+                    return None
+                    
+                # Parse Data
+                dates = [datetime.datetime.fromtimestamp(ts) for ts in data["t"]]
+                
+                df = pd.DataFrame({
+                    'Open': data['o'],
+                    'High': data['h'],
+                    'Low': data['l'],
+                    'Close': data['c'],
+                    'Volume': data['v']
+                }, index=dates)
+                
+                df.index.name = 'Date'
             return df
             
         except Exception as e:
@@ -0,0 +1,149 @@
+# datastore.py
+# Compact binary storage for the large data files, with an optional JSON export
+#
+# Callers keep using the JSON names (e.g. "data/technical_data.json"):
+#   save_data(path, obj)  writes data/technical_data.bin (msgpack, optionally gzip/zstd)
+#                         and, with PSE_EXPORT_JSON=1, the pretty-printed JSON as well
+#   load_data(path)       reads whichever of the two files is newer
+#
+# Lists of same-keyed dicts (history bars, div_history) are stored as a key row
+# plus value rows, so the field names are written once per list instead of once
+# per bar. Without msgpack installed everything falls back to plain JSON.
+import gzip
+import json
+import os
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BINARY_SUFFIX = ".bin"
+MAGIC = b"PSEB"
+FORMAT_VERSION = 1
+RECORDS_EXT = 1  # msgpack ext type code for a packed list of records
+
+# name -> (header id, compress, decompress)
+COMPRESSIONS = {
+    'none': (0, lambda b: b, lambda b: b),
+    'gzip': (1, lambda b: gzip.compress(b, compresslevel=6), gzip.decompress),
+}
+if zstandard:
+    COMPRESSIONS['zstd'] = (2, lambda b: zstandard.ZstdCompressor(level=3).compress(b),
+                            lambda b: zstandard.ZstdDecompressor().decompress(b))
+
+# Settings (environment overrides)
+DATA_FORMAT = os.environ.get('PSE_DATA_FORMAT', 'binary' if msgpack else 'json')
+DATA_COMPRESSION = os.environ.get('PSE_DATA_COMPRESSION', 'zstd' if zstandard else 'gzip')
+EXPORT_JSON = os.environ.get('PSE_EXPORT_JSON', '0') == '1'
+
+
+def _plain(obj):
+    """numpy scalars/arrays -> python (what main.CustomEncoder did for json.dump)."""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+_CONTAINERS = (dict, list, tuple)
+
+
+def _pack(obj):
+    t = type(obj)
+    if t is dict:
+        return {k: _pack(v) if type(v) in _CONTAINERS else v for k, v in obj.items()}
+    if len(obj) > 1 and type(obj[0]) is dict:
+        keys = tuple(obj[0])
+        if all(type(r) is dict and tuple(r) == keys for r in obj):
+            rows = [[_pack(v) if type(v) in _CONTAINERS else v for v in r.values()] for r in obj]
+            return msgpack.ExtType(RECORDS_EXT, msgpack.packb([list(keys), rows], default=_plain))
+    return [_pack(v) if type(v) in _CONTAINERS else v for v in obj]
+
+
+def _ext_hook(code, data):
+    if code == RECORDS_EXT:
+        keys, rows = msgpack.unpackb(data, ext_hook=_ext_hook)
+        return [dict(zip(keys, row)) for row in rows]
+    return msgpack.ExtType(code, data)
+
+
+def encode(obj, compression=None):
+    """Serialize a JSON-shaped object to the binary container format."""
+    name = compression or DATA_COMPRESSION
+    if name not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{name}' (available: {', '.join(COMPRESSIONS)})")
+    comp_id, compress, _ = COMPRESSIONS[name]
+    payload = msgpack.packb(_pack(obj) if type(obj) in _CONTAINERS else obj, default=_plain)
+    return MAGIC + bytes([FORMAT_VERSION, comp_id]) + compress(payload)
+
+
+def decode(raw):
+    if raw[:4] != MAGIC or raw[4] != FORMAT_VERSION:
+        raise ValueError("Not a PSE binary data file (or unsupported version)")
+    for comp_id, _, decompress in COMPRESSIONS.values():
+        if comp_id == raw[5]:
+            return msgpack.unpackb(decompress(raw[6:]), ext_hook=_ext_hook)
+    raise ValueError(f"Data file uses compression id {raw[5]}, which is not available here")
+
+
+def binary_path(path):
+    return os.path.splitext(path)[0] + BINARY_SUFFIX
+
+
+def resolve(path):
+    """The file load_data(path) would read: the newer of the .bin and .json, or None."""
+    candidates = []
+    # On equal mtimes the binary file wins
+    for rank, p in enumerate([path, binary_path(path)] if msgpack else [path]):
+        if os.path.exists(p):
+            candidates.append((os.stat(p).st_mtime_ns, rank, p))
+    return max(candidates)[2] if candidates else None
+
+
+def data_mtime(path):
+    """mtime (ns) of the file backing `path`, or None if there is none."""
+    p = resolve(path)
+    return os.stat(p).st_mtime_ns if p else None
+
+
+def _write_atomic(path, data, mode):
+    tmp = path + ".tmp"
+    with open(tmp, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def save_data(path, obj, export_json=None):
+    """Write obj for `path` in the configured format (+ the JSON export if enabled)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    export_json = EXPORT_JSON if export_json is None else export_json
+
+    binary = DATA_FORMAT == 'binary' and msgpack
+    if export_json or not binary:
+        _write_atomic(path, json.dumps(obj, indent=4, default=_plain), 'w')
+    # Binary written last so load_data prefers it over the export
+    if binary:
+        _write_atomic(binary_path(path), encode(obj), 'wb')
+
+
+def load_data(path):
+    """Load the data stored under `path` ({} if missing or unreadable)."""
+    p = resolve(path)
+    if not p:
+        return {}
+    try:
+        if p.endswith(BINARY_SUFFIX):
+            with open(p, 'rb') as f:
+                return decode(f.read())
+        with open(p, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[Warning] Could not load {p}: {e}")
+        return {}
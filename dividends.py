@@ -0,0 +1,137 @@
+# dividends.py
+# Dividend analytics table: div_history parsed once into typed events plus TTM stats per symbol
+#
+# data/dividends.json (stored through datastore, so normally dividends.bin) holds,
+# for every symbol in pse_fundamentals.json:
+#   events      [[ex_date, pay_date, amount], ...] as ISO dates, sorted by ex-date
+#   as_of       date the stats below were computed for
+#   div_amount  trailing-365-day total (by ex-date), div_freq, div_sched ("Mar, Sep"),
+#   div_yield   (at `price`, the last close known when the table was built)
+# It is rebuilt whenever the fundamentals are scraped. Scoring, the dashboard and
+# the backtest read it through stats() instead of parsing "%b %d, %Y" strings.
+import bisect
+import datetime
+
+from datastore import data_mtime, load_data, save_data
+
+DIVIDENDS_FILE = "data/dividends.json"
+FUNDAMENTAL_DATA_FILE = "data/pse_fundamentals.json"
+TTM_DAYS = 365
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def parse_date(text):
+    """PSE Edge date ("Sep 05, 2025") -> "2025-09-05", or None."""
+    try:
+        return datetime.datetime.strptime(text, "%b %d, %Y").date().isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def _iso(day):
+    if day is None:
+        return datetime.date.today().isoformat()
+    if isinstance(day, datetime.datetime):
+        return day.date().isoformat()
+    if isinstance(day, datetime.date):
+        return day.isoformat()
+    return str(day)[:10]
+
+
+def parse_events(div_history):
+    """[[ex_date, pay_date, amount], ...] for entries with a readable ex-date and an amount."""
+    events = []
+    for d in div_history or []:
+        ex = parse_date(d.get('ex_date'))
+        try:
+            amount = float(d.get('amount') or 0)
+        except (TypeError, ValueError):
+            continue
+        if ex and amount:
+            events.append([ex, parse_date(d.get('pay_date')), amount])
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+def _stats(events, as_of, until=None, price=None):
+    """TTM amount / frequency / schedule / yield over ex-dates in (as_of - 365d, until]."""
+    cutoff = (datetime.date.fromisoformat(as_of) - datetime.timedelta(days=TTM_DAYS)).isoformat()
+    exs = [e[0] for e in events]
+    lo = bisect.bisect_right(exs, cutoff)
+    hi = bisect.bisect_right(exs, until) if until else len(events)
+    window = events[lo:hi]
+
+    out = {}
+    total = sum(e[2] for e in window)
+    if total <= 0:
+        return out
+    months = sorted({int(e[0][5:7]) for e in window})
+    out['div_amount'] = total
+    # Frequency from the number of distinct ex-date months
+    out['div_freq'] = "Quarterly" if len(months) >= 4 else ("Semi-Annual" if len(months) >= 2 else "Annual")
+    out['div_sched'] = ", ".join(MONTHS[m - 1] for m in months)
+    if price and price > 0:
+        out['div_yield'] = total / price * 100.0
+    return out
+
+
+def summarize(div_history, as_of=None, price=None):
+    """Table record for one symbol's raw div_history."""
+    as_of = _iso(as_of)
+    events = parse_events(div_history)
+    record = {'events': events, 'as_of': as_of, 'price': price}
+    record.update(_stats(events, as_of, price=price))
+    return record
+
+
+def stats(record, as_of=None, price=None, point_in_time=False):
+    """
+    div_amount / div_freq / div_sched / div_yield for `record` as of a date.
+    Uses the stored values when as_of matches the table; otherwise recomputes from
+    the typed events. point_in_time=True ignores dividends with later ex-dates
+    (for backtests; live views include declared upcoming dividends).
+    """
+    if not record:
+        return {}
+    as_of = _iso(as_of)
+    if as_of == record.get('as_of') and not point_in_time:
+        out = {k: record[k] for k in ('div_amount', 'div_freq', 'div_sched') if k in record}
+        if out and price and price > 0:
+            out['div_yield'] = out['div_amount'] / price * 100.0
+        elif 'div_yield' in record:
+            out['div_yield'] = record['div_yield']
+        return out
+    return _stats(record.get('events', []), as_of, as_of if point_in_time else None, price)
+
+
+def build_table(fund_data, prices=None, as_of=None):
+    """{symbol: record} for every fundamentals record. prices: {symbol: last_close} for yields."""
+    prices = prices or {}
+    as_of = _iso(as_of)
+    return {symbol: summarize(of.get('div_history'), as_of, prices.get(symbol))
+            for symbol, of in fund_data.items()}
+
+
+def save_table(table):
+    """Persist the table, stamped with the fundamentals file it was built from."""
+    save_data(DIVIDENDS_FILE, {'source': data_mtime(FUNDAMENTAL_DATA_FILE), 'symbols': table})
+
+
+def load_table():
+    """The persisted table, or None if missing or built from other fundamentals."""
+    stored = load_data(DIVIDENDS_FILE)
+    if not stored or stored.get('source') != data_mtime(FUNDAMENTAL_DATA_FILE):
+        return None
+    return stored.get('symbols')
+
+
+def ensure_table(fund_data=None, prices=None):
+    """Current table, rebuilding (and saving) it if the fundamentals changed since it was built."""
+    table = load_table()
+    if table is not None:
+        return table
+    if fund_data is None:
+        fund_data = load_data(FUNDAMENTAL_DATA_FILE)
+    table = build_table(fund_data, prices)
+    save_table(table)
+    return table
@@ -1,15 +1,25 @@
 import json
 import os
+import time
+import hashlib
 import requests
 import xml.etree.ElementTree as ET
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from analyzer import Analyzer
+from email.utils import parsedate_to_datetime
+from scores import ensure_score_table
+from tracing import TRACER, record_request
 
 # Files
-TECHNICAL_DATA_FILE = "data/technical_data.json"
-FUNDAMENTAL_DATA_FILE = "data/pse_fundamentals.json"
 NEWS_DATA_FILE = "data/news_data.json"
+NEWS_CACHE_FILE = "data/news_cache.json"
+NEWS_HOST = "news.google.com"
+
+# Feed cache policy
+NEWS_TTL_SECONDS = 3 * 60 * 60 # Don't even ask Google again within this window
+MAX_ITEMS_PER_FEED = 5 # Latest N items taken from each feed
+MAX_NEWS_PER_SYMBOL = 10 # Retention per symbol in news_data.json
+STREAM_CHUNK_SIZE = 4096 # Bytes pulled per read while stream-parsing a feed
 
 def load_json(filepath):
     if os.path.exists(filepath):
@@ -20,41 +30,149 @@ def load_json(filepath):
             return {}
     return {}
 
-def fetch_rss(symbol):
-    """Fetch Google News RSS for a symbol."""
+def _feed_url(symbol):
     query = f"{symbol} stock philippines"
-    url = f"https://news.google.com/rss/search?q={query}&hl=en-PH&gl=PH&ceid=PH:en"
+    return f"https://{NEWS_HOST}/rss/search?q={query}&hl=en-PH&gl=PH&ceid=PH:en"
+
+def _rss_item(elem):
+    title = elem.findtext('title', '')
+    pubDate = elem.findtext('pubDate')
+    link = elem.findtext('link')
+    
+    # Clean Source from Title "Title - Source"
+    source = "Unknown"
+    if " - " in title:
+        parts = title.rsplit(" - ", 1)
+        title = parts[0]
+        source = parts[1]
+    
+    return {
+        "title": title,
+        "source": source,
+        "date": pubDate,
+        "link": link
+    }
+
+def parse_rss_stream(chunks, limit=MAX_ITEMS_PER_FEED):
+    """
+    Incrementally parse RSS from an iterable of byte chunks.
+    Stops pulling chunks as soon as `limit` <item>s are complete.
+    Returns (items, finished_early).
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    items = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if elem.tag != 'item':
+                continue
+            items.append(_rss_item(elem))
+            elem.clear()
+            if len(items) >= limit:
+                return items, True
+    return items, False
+
+def parse_rss(content, limit=MAX_ITEMS_PER_FEED):
+    """Parse a complete RSS document (bytes) into news items (latest `limit`)."""
+    items, _ = parse_rss_stream([content], limit)
+    return items
+
+def fetch_rss(symbol, cache_entry=None):
+    """
+    Fetch Google News RSS for a symbol, conditionally if we hold validators.
+    The body is parsed as it streams in and the connection is dropped once
+    MAX_ITEMS_PER_FEED items are read.
+    Returns (items, cache_entry). items is None when the feed is unchanged (304).
+    """
+    start = time.perf_counter()
+    items, entry, ok = _fetch_rss(symbol, cache_entry)
+    elapsed = time.perf_counter() - start
+    TRACER.add_span('news', elapsed)
+    record_request(NEWS_HOST, symbol, elapsed, ok)
+    return items, entry
+
+def _fetch_rss(symbol, cache_entry):
+    entry = dict(cache_entry or {})
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
     
     try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            root = ET.fromstring(resp.content)
-            items = []
-            count = 0
-            for item in root.findall('.//item'):
-                title = item.find('title').text
-                pubDate = item.find('pubDate').text
-                link = item.find('link').text
+        with requests.get(_feed_url(symbol), headers=headers, timeout=10, stream=True) as resp:
+            if resp.status_code == 304:
+                entry['fetched_at'] = time.time()
+                entry['bytes_read'] = 0
+                entry['bytes_saved'] = 0
+                return None, entry, True
+            if resp.status_code == 200:
+                items, early = parse_rss_stream(resp.iter_content(chunk_size=STREAM_CHUNK_SIZE))
                 
-                # Clean Source from Title "Title - Source"
-                source = "Unknown"
-                if " - " in title:
-                    parts = title.rsplit(" - ", 1)
-                    title = parts[0]
-                    source = parts[1]
+                # Wire bytes consumed vs advertised size (unknown for chunked bodies)
+                bytes_read = resp.raw.tell()
+                total = resp.headers.get('Content-Length')
+                bytes_saved = max(int(total) - bytes_read, 0) if total and total.isdigit() else None
                 
-                items.append({
-                    "title": title,
-                    "source": source,
-                    "date": pubDate,
-                    "link": link
-                })
-                count += 1
-                if count >= 5: break # Limit to latest 5 news per stock
-            return items
+                entry['etag'] = resp.headers.get('ETag')
+                entry['last_modified'] = resp.headers.get('Last-Modified')
+                entry['fetched_at'] = time.time()
+                entry['bytes_read'] = bytes_read
+                entry['bytes_saved'] = bytes_saved if early else 0
+                return items, entry, True
     except Exception as e:
         print(f"Error fetching {symbol}: {e}")
-    return []
+    return [], cache_entry or {}, False
+
+def _article_keys(item):
+    """Dedup keys for an article: hash of its link and of its normalized title."""
+    keys = set()
+    if item.get('link'):
+        keys.add(hashlib.sha1(item['link'].encode('utf-8')).hexdigest())
+    if item.get('title'):
+        keys.add(hashlib.sha1(item['title'].strip().lower().encode('utf-8')).hexdigest())
+    return keys
+
+def _published(item):
+    try:
+        return parsedate_to_datetime(item.get('date', '')).timestamp()
+    except Exception:
+        return 0.0
+
+def merge_news(existing, fresh, limit=MAX_NEWS_PER_SYMBOL):
+    """Merge fresh items into a symbol's stored list: dedupe, newest first, keep `limit`."""
+    seen = set()
+    merged = []
+    for item in list(fresh) + list(existing):
+        keys = _article_keys(item)
+        if keys & seen:
+            continue
+        seen |= keys
+        merged.append(item)
+    merged.sort(key=_published, reverse=True)
+    return merged[:limit]
+
+def is_due(symbol, cache, now=None):
+    """True if the symbol's feed is outside the TTL and should be (conditionally) refetched."""
+    now = now or time.time()
+    return now - cache.get(symbol, {}).get('fetched_at', 0) >= NEWS_TTL_SECONDS
+
+def apply_news(symbol, items, entry, news_store, cache):
+    """Record one fetch_rss result. Returns 'updated', 'unchanged' (304) or None."""
+    cache[symbol] = entry
+    if items is None:
+        return 'unchanged'
+    if items:
+        news_store[symbol] = merge_news(news_store.get(symbol, []), items)
+        return 'updated'
+    return None
+
+def save_news(news_store, cache):
+    print(f"Saving {len(news_store)} news records to {NEWS_DATA_FILE}...")
+    with open(NEWS_DATA_FILE, 'w') as f:
+        json.dump(news_store, f, indent=4)
+    with open(NEWS_CACHE_FILE, 'w') as f:
+        json.dump(cache, f, indent=4)
 
 def run_news_fetch(targets=None):
     """
@@ -65,52 +183,50 @@ def run_news_fetch(targets=None):
     # existing Load Data logic
     
     if targets is None:
-        tech_data = load_json(TECHNICAL_DATA_FILE)
-        fund_data = load_json(FUNDAMENTAL_DATA_FILE)
-        analyzer = Analyzer()
-        
         # 1. Identify Target Stocks (Score >= 6 to be broader than Top Picks)
-        targets = []
-        print("Scoring Stocks for News Eligibility...")
-        for symbol, t in tech_data.items():
-            f = fund_data.get(symbol, {})
-            score, _ = analyzer.calculate_score(t, f)
-            
-            # Fetch news for anything decent, or part of top picks
-            if score >= 6: 
-                targets.append(symbol)
+        # Read from the pipeline's score table; only rescored if it is stale
+        score_table = ensure_score_table()
+        targets = [symbol for symbol, entry in score_table.items() if entry['score'] >= 6]
                 
-    print(f"Fetching News for {len(targets)} stocks...")
+    news_store = load_json(NEWS_DATA_FILE)
+    cache = load_json(NEWS_CACHE_FILE)
     
-    news_results = {}
+    # Fresh within TTL -> no request at all
+    now = time.time()
+    due = [s for s in targets if is_due(s, cache, now)]
+    print(f"Fetching News for {len(due)} stocks ({len(targets) - len(due)} fresh in cache)...")
     
-    # Load existing news to avoid re-fetching if recent? 
-    # For now, we overwrite or maybe we should merge? 
-    # Let's keep it simple and overwrite as per original logic.
-    
-    # 2. Parallel Fetch
+    # 2. Parallel Conditional Fetch
+    updated = unchanged = 0
+    bytes_read = bytes_saved = 0
     with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_symbol = {executor.submit(fetch_rss, sym): sym for sym in targets}
+        future_to_symbol = {executor.submit(fetch_rss, sym, cache.get(sym)): sym for sym in due}
         
         count = 0
         for future in as_completed(future_to_symbol):
             sym = future_to_symbol[future]
+            count += 1
             try:
-                data = future.result()
-                if data:
-                    news_results[sym] = data
-                    count += 1
+                items, entry = future.result()
+                bytes_read += entry.get('bytes_read') or 0
+                bytes_saved += entry.get('bytes_saved') or 0
+                outcome = apply_news(sym, items, entry, news_store, cache)
+                if outcome == 'unchanged':
+                    unchanged += 1
+                elif outcome == 'updated':
+                    updated += 1
             except Exception as e:
                 print(f"[{sym}] Failed: {e}")
                 
             if count % 10 == 0:
-                print(f"News Progress: {count}/{len(targets)}")
+                print(f"News Progress: {count}/{len(due)}")
 
-    print(f"Saving {len(news_results)} news records to {NEWS_DATA_FILE}...")
-    with open(NEWS_DATA_FILE, 'w') as f:
-        json.dump(news_results, f, indent=4)
+    print(f"News: {updated} updated, {unchanged} unchanged (304).")
+    print(f"News: {bytes_read / 1024:.1f} KB read, {bytes_saved / 1024:.1f} KB skipped by early stop.")
+    save_news(news_store, cache)
         
-    return news_results
+    return news_store
 
 if __name__ == "__main__":
     run_news_fetch()
+    TRACER.finish('news')
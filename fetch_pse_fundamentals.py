@@ -1,10 +1,16 @@
 import json
 import os
 import re
+import asyncio
 import datetime
+import functools
+import time
 import requests
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from tracing import TRACER, record_request
+from datastore import load_data, save_data
+import dividends
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 # Files
 STOCK_IDS_FILE = "data/stock_ids.json"
@@ -12,9 +18,15 @@ TECHNICAL_DATA_FILE = "data/technical_data.json"
 OUTPUT_FILE = "data/pse_fundamentals.json"
 
 # URLs
+PSE_EDGE_HOST = "edge.pse.com.ph"
 STOCK_DATA_URL = "https://edge.pse.com.ph/companyPage/stockData.do?cmpy_id={}&security_id={}"
 FINANCIALS_URL = "https://edge.pse.com.ph/companyPage/financial_reports_view.do?cmpy_id={}"
 DIVIDENDS_URL = "https://edge.pse.com.ph/companyPage/dividends_and_rights_form.do?cmpy_id={}"
+DIVIDENDS_AJAX_URL = "https://edge.pse.com.ph/companyPage/dividends_and_rights_list.ax?DividendsOrRights=Dividends"
+
+# Async engine limits: in-flight requests to edge.pse.com.ph, and HTML parser processes
+HOST_CONCURRENCY = 10
+PARSE_WORKERS = 4
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
@@ -89,11 +101,8 @@ def clean_value(text):
     except:
         return None
 
-def scrape_stock_details(symbol, ids, tech_price):
-    session = requests.Session()
-    session.headers.update(HEADERS)
-    
-    data = {
+def _new_record(symbol):
+    return {
         "symbol": symbol,
         "pe_ratio": None,
         "market_cap": None,
@@ -105,10 +114,120 @@ def scrape_stock_details(symbol, ids, tech_price):
         "last_updated": datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         "status": "Active" # Default
     }
-    
+
+def parse_stock_data(html):
+    """Extract P/E, market cap, shares, 52-week range and status from stockData.do."""
+    soup = BeautifulSoup(html, 'html.parser')
+    fields = {}
+
+    # Helper to extract value by Header Text
+    def get_val(label):
+        th = soup.find('th', string=re.compile(label, re.I))
+        if th:
+            td = th.find_next_sibling('td')
+            if td:
+                return clean_value(td.text)
+        return None
+
+    fields['pe_ratio'] = get_val(r'P/E Ratio')
+    fields['market_cap'] = get_val(r'Market Capitalization')
+    fields['outstanding_shares'] = get_val(r'Outstanding Shares')
+    fields['high_52'] = get_val(r'52-Week High')
+    fields['low_52'] = get_val(r'52-Week Low')
+
+    # Status
+    th_stat = soup.find('th', string=re.compile(r'Status', re.I))
+    if th_stat:
+        td_stat = th_stat.find_next_sibling('td')
+        if td_stat:
+            fields['status'] = td_stat.text.strip()
+    return fields
+
+def parse_eps(html):
+    """Extract basic EPS from financial_reports_view.do."""
+    soup = BeautifulSoup(html, 'html.parser')
+    # Look for Earnings/(Loss) Per Share (Basic)
+    th = soup.find('th', string=re.compile(r'Earnings/\(Loss\) Per Share \(Basic\)', re.I))
+    if not th:
+        th = soup.find('th', string=re.compile(r'Earnings Per Share', re.I))
+
+    if th:
+        # Value is in the following TD
+        td = th.find_next_sibling('td')
+        if td:
+            return clean_value(td.text)
+    return None
+
+def parse_dividends(html):
+    """Extract common-share cash dividends from the dividends Ajax table."""
+    div_history = []
+    soup = BeautifulSoup(html, 'html.parser')
+    # Find rows in the returned table
+    rows = soup.find_all('tr')
+    for row in rows:
+        cols = row.find_all('td')
+        # In Ajax response:
+        # Col 0: Type (Common)
+        # Col 1: Div Type (Cash)
+        # Col 2: Rate (PhP 1.00)
+        # Col 3: Ex-Date
+        # Col 4: Rec-Date
+        # Col 5: Pay-Date
+        if len(cols) < 6: continue
+
+        security_name = cols[0].text.strip().upper()
+        # Filter: Must be "Common". Preferred shares (e.g. GTPPB) usually won't say "Common"
+        if "PREFERRED" in security_name or "PF" in security_name or "GTPPB" in security_name:
+            continue
+
+        div_type = cols[1].text.strip() # "Cash" is in 2nd col usually
+        if "Cash" in div_type:
+            amount_text = cols[2].text.strip() # "PhP 1.00"
+            ex_date = cols[3].text.strip()
+            pay_date = cols[5].text.strip()
+
+            # Clean amount "PhP 1.00" -> 1.00
+            # Handle "Php1.10 per share", "PHP 1.00", "₱1.00"
+            clean_text = amount_text.replace(',', '')
+            match = re.search(r'(\d+(?:\.\d+)?)', clean_text)
+
+            amount = None
+            if match:
+                try:
+                    amount = float(match.group(1))
+                except: pass
+            else:
+                # Fallback to Text Parsing ("Fifty Centavos")
+                amount = clean_value(amount_text)
+
+            div_history.append({
+                "type": div_type,
+                "amount": amount,
+                "ex_date": ex_date,
+                "pay_date": pay_date
+            })
+    return div_history
+
+def _derive_ratios(data, tech_price):
+    # If EPS missing but have PE and Price -> Calc EPS
+    if data['eps'] is None and data['pe_ratio'] and data['pe_ratio'] > 0 and tech_price:
+        data['eps'] = round(tech_price / data['pe_ratio'], 4)
+
+    # If PE missing but have EPS and Price -> Calc PE
+    if data['pe_ratio'] is None and data['eps'] and data['eps'] != 0 and tech_price:
+        data['pe_ratio'] = round(tech_price / data['eps'], 2)
+    return data
+
+def scrape_stock_details(symbol, ids, tech_price):
+    """Sequential (one thread, three round trips) scrape of a single symbol."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+
+    data = _new_record(symbol)
+
     cmpy_id = ids.get('cmpy_id')
     security_id = ids.get('security_id')
-    
+
     if not cmpy_id:
         return data
 
@@ -117,178 +236,157 @@ def scrape_stock_details(symbol, ids, tech_price):
         try:
             resp = session.get(STOCK_DATA_URL.format(cmpy_id, security_id), timeout=10)
             if resp.status_code == 200:
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                
-                # Helper to extract value by Header Text
-                def get_val(label):
-                    th = soup.find('th', string=re.compile(label, re.I))
-                    if th:
-                        td = th.find_next_sibling('td')
-                        if td:
-                            return clean_value(td.text)
-                    return None
-
-                data['pe_ratio'] = get_val(r'P/E Ratio')
-                data['market_cap'] = get_val(r'Market Capitalization')
-                data['outstanding_shares'] = get_val(r'Outstanding Shares')
-                data['high_52'] = get_val(r'52-Week High')
-                data['low_52'] = get_val(r'52-Week Low')
-                
-                # Status
-                th_stat = soup.find('th', string=re.compile(r'Status', re.I))
-                if th_stat:
-                    td_stat = th_stat.find_next_sibling('td')
-                    if td_stat:
-                        data['status'] = td_stat.text.strip()
-        except Exception as e:
+                data.update(parse_stock_data(resp.text))
+        except Exception:
             pass
 
     # 2. EPS (financial_reports_view.do)
     try:
         resp = session.get(FINANCIALS_URL.format(cmpy_id), timeout=15)
         if resp.status_code == 200:
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            # Look for Earnings/(Loss) Per Share (Basic)
-            # Use specific text
-            th = soup.find('th', string=re.compile(r'Earnings/\(Loss\) Per Share \(Basic\)', re.I))
-            if not th:
-                th = soup.find('th', string=re.compile(r'Earnings Per Share', re.I))
-            
-            if th:
-                # Value is in the following TD
-                td = th.find_next_sibling('td')
-                if td:
-                    data['eps'] = clean_value(td.text)
-    except Exception as e:
+            data['eps'] = parse_eps(resp.text)
+    except Exception:
         pass
 
-    # 3. Dividend History (Ajax POST)
-    DIVIDENDS_AJAX_URL = "https://edge.pse.com.ph/companyPage/dividends_and_rights_list.ax?DividendsOrRights=Dividends"
+    # 3. Dividend History (Ajax POST, must send cmpy_id)
     try:
-        # Must use POST with cmpy_id
         resp = session.post(DIVIDENDS_AJAX_URL, data={"cmpy_id": cmpy_id}, timeout=10)
-        
         if resp.status_code == 200:
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            # Find rows in the returned table
-            rows = soup.find_all('tr')
-            for row in rows:
-                cols = row.find_all('td')
-                if len(cols) >= 4:
-                    # In Ajax response: 
-                    # Col 0: Type (Common)
-                    # Col 1: Div Type (Cash)
-                    # Col 2: Rate (PhP 1.00)
-                    # Col 3: Ex-Date
-                    # Col 4: Rec-Date
-                    # Col 5: Pay-Date
-                    
-                    # Safety check on column count
-                    if len(cols) < 6: continue
-                    
-                    security_name = cols[0].text.strip().upper()
-                    # Filter: Must be "Common" or contain the Symbol (e.g. "GTCAP" but not "GTPPB" if possible, usually checking "Common" is safest)
-                    # GTCAP example: "GTPPB" vs "Common"
-                    # If it's a preferred share, it usually won't say "Common"
-                    if "PREFERRED" in security_name or "PF" in security_name or "GTPPB" in security_name:
-                        continue
-                        
-                    div_type = cols[1].text.strip() # "Cash" is in 2nd col usually
-                    if "Cash" in div_type:
-                        amount_text = cols[2].text.strip() # "PhP 1.00"
-                        ex_date = cols[3].text.strip()
-                        pay_date = cols[5].text.strip()
-                        
-                        # Clean amount "PhP 1.00" -> 1.00
-                        # Handle "Php1.10 per share", "PHP 1.00", "₱1.00"
-                        # Robust extraction
-                        # 1. Try standard regex for digits "P0.42"
-                        clean_text = amount_text.replace(',', '')
-                        # print(f"[{symbol}] Raw Amount: {amount_text}") # DEBUG
-                        match = re.search(r'(\d+(?:\.\d+)?)', clean_text)
-                        
-                        amount = None
-                        if match:
-                            try:
-                                amount = float(match.group(1))
-                            except: pass
-                        else:
-                            # 2. Fallback to Text Parsing
-                            amount = clean_value(amount_text)
-                        
-                        data['div_history'].append({
-                            "type": div_type,
-                            "amount": amount,
-                            "ex_date": ex_date,
-                            "pay_date": pay_date
-                        })
-                        
-    except Exception as e:
+            data['div_history'] = parse_dividends(resp.text)
+    except Exception:
         pass
 
+    return _derive_ratios(data, tech_price)
 
+# --- Async Engine ---
+# The three PSE Edge requests for a symbol are independent, so they are issued
+# together. A single semaphore caps in-flight requests against edge.pse.com.ph
+# across ALL symbols, and HTML parsing runs in a process pool off the event loop.
 
-    # Calculations
-    # If EPS missing but have PE and Price -> Calc EPS
-    if data['eps'] is None and data['pe_ratio'] and data['pe_ratio'] > 0 and tech_price:
-        data['eps'] = round(tech_price / data['pe_ratio'], 4)
-        
-    # If PE missing but have EPS and Price -> Calc PE
-    if data['pe_ratio'] is None and data['eps'] and data['eps'] != 0 and tech_price:
-        data['pe_ratio'] = round(tech_price / data['eps'], 2)
+async def _fetch_text(loop, io_pool, host_sem, session, symbol, method, url, **kwargs):
+    """Run one blocking request on the I/O pool under the host cap. Returns body or None."""
+    async with host_sem:
+        start = time.perf_counter()
+        try:
+            resp = await loop.run_in_executor(io_pool, functools.partial(session.request, method, url, **kwargs))
+        except Exception:
+            record_request(PSE_EDGE_HOST, symbol, time.perf_counter() - start, ok=False)
+            return None
+        elapsed = time.perf_counter() - start
+    TRACER.add_span('fetch', elapsed)
+    record_request(PSE_EDGE_HOST, symbol, elapsed, ok=resp.status_code == 200)
+    return resp.text if resp.status_code == 200 else None
 
-    return data
+async def _parse(loop, parse_pool, parser, html):
+    if html is None:
+        return None
+    start = time.perf_counter()
+    try:
+        return await loop.run_in_executor(parse_pool, parser, html)
+    except Exception:
+        return None
+    finally:
+        TRACER.add_span('parse', time.perf_counter() - start)
+
+async def scrape_stock_details_async(symbol, ids, tech_price, loop, io_pool, parse_pool, host_sem):
+    """Async counterpart of scrape_stock_details: same record, requests fanned out concurrently."""
+    data = _new_record(symbol)
+
+    cmpy_id = ids.get('cmpy_id')
+    security_id = ids.get('security_id')
+
+    if not cmpy_id:
+        return data
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+
+    async def no_page():
+        return None
+
+    fetch = functools.partial(_fetch_text, loop, io_pool, host_sem, session, symbol)
+    try:
+        stock_html, fin_html, div_html = await asyncio.gather(
+            fetch('GET', STOCK_DATA_URL.format(cmpy_id, security_id), timeout=10) if security_id else no_page(),
+            fetch('GET', FINANCIALS_URL.format(cmpy_id), timeout=15),
+            fetch('POST', DIVIDENDS_AJAX_URL, data={"cmpy_id": cmpy_id}, timeout=10),
+        )
+    finally:
+        session.close()
+
+    stock_fields, eps, div_history = await asyncio.gather(
+        _parse(loop, parse_pool, parse_stock_data, stock_html),
+        _parse(loop, parse_pool, parse_eps, fin_html),
+        _parse(loop, parse_pool, parse_dividends, div_html),
+    )
+
+    if stock_fields:
+        data.update(stock_fields)
+    data['eps'] = eps
+    data['div_history'] = div_history or []
+
+    return _derive_ratios(data, tech_price)
+
+async def scrape_all_async(stock_ids, technical_data, host_concurrency=HOST_CONCURRENCY, parse_workers=PARSE_WORKERS,
+                           on_record=None, mp_context=None):
+    """
+    Scrape every symbol in stock_ids. Returns {symbol: record} in pse_fundamentals.json schema.
+    on_record(symbol, record) is called as each symbol completes. mp_context picks how the
+    parse workers start (a 'spawn' context when other threads are running, as in the pipeline).
+    """
+    loop = asyncio.get_running_loop()
+    host_sem = asyncio.Semaphore(host_concurrency)
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=host_concurrency) as io_pool, \
+            ProcessPoolExecutor(max_workers=parse_workers, mp_context=mp_context) as parse_pool:
+        tasks = {}
+        for symbol, ids in stock_ids.items():
+            price = technical_data.get(symbol, {}).get('last_close')
+            coro = scrape_stock_details_async(symbol, ids, price, loop, io_pool, parse_pool, host_sem)
+            tasks[asyncio.ensure_future(coro)] = symbol
+
+        count = 0
+        for future in asyncio.as_completed(list(tasks)):
+            try:
+                data = await future
+            except Exception as exc:
+                print(f"Error: {exc}")
+                continue
+            symbol = data['symbol']
+            results[symbol] = data
+            count += 1
+            if on_record:
+                on_record(symbol, data)
+
+            # Concise progress
+            div_c = len(data['div_history'])
+            print(f"[{symbol}] EPS:{data['eps']} PE:{data['pe_ratio']} Divs:{div_c}")
+
+            if count % 10 == 0:
+                save_data(OUTPUT_FILE, results)
+
+    return results
 
 def main():
     stock_ids = load_json(STOCK_IDS_FILE)
-    technical_data = load_json(TECHNICAL_DATA_FILE)
+    technical_data = load_data(TECHNICAL_DATA_FILE)
     
     if not stock_ids:
         print("No stock IDs found. Run scrape_pse_list.py first.")
         return
 
-    results = {}
-    
-    # 10 workers for speed with requests
-    max_workers = 10
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_symbol = {}
-        
-        # FULL RUN
-        test_items = stock_ids.items()
-        
-        for symbol, ids in test_items:
-            tech = technical_data.get(symbol, {})
-            price = tech.get('last_close')
-            
-            future = executor.submit(scrape_stock_details, symbol, ids, price)
-            future_to_symbol[future] = symbol
-            
-        count = 0
-        total = len(test_items)
-        
-        for future in as_completed(future_to_symbol):
-            symbol = future_to_symbol[future]
-            try:
-                data = future.result()
-                results[symbol] = data
-                count += 1
-                
-                # Concise progress
-                div_c = len(data['div_history'])
-                print(f"[{symbol}] EPS:{data['eps']} PE:{data['pe_ratio']} Divs:{div_c}")
-                
-                if count % 10 == 0:
-                    with open(OUTPUT_FILE, 'w') as f:
-                        json.dump(results, f, indent=4)
-                        
-            except Exception as exc:
-                print(f"[{symbol}] Error: {exc}")
+    results = asyncio.run(scrape_all_async(stock_ids, technical_data))
 
     print("Scraping Complete!")
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(results, f, indent=4)
+    save_data(OUTPUT_FILE, results)
+
+    # Parse div_history once into the dividend analytics table
+    prices = {s: t.get('last_close') for s, t in technical_data.items() if isinstance(t, dict)}
+    dividends.save_table(dividends.build_table(results, prices))
+    print(f"Dividend table saved to {dividends.DIVIDENDS_FILE}")
+
+    TRACER.finish('fundamentals')
 
 if __name__ == "__main__":
     main()
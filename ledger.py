@@ -0,0 +1,399 @@
+# ledger.py
+# Lot-level transaction ledger: buys/sells as individual lots, FIFO or average-cost accounting
+#
+# data/ledger.jsonl is the append-only source of truth (one transaction per line).
+# data/ledger_index.json caches the derived open lots / realized P&L per symbol plus
+# the byte offset it was built up to, so opening the ledger only replays the tail
+# and position queries never scan the whole history. The index also stores a hash
+# of the bytes just before that offset: a ledger replaced underneath it (a git pull
+# of the committed ledger; the index itself is not versioned) fails the check and
+# is replayed from the start.
+import bisect
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+import dividends
+
+LEDGER_FILE = "data/ledger.jsonl"
+INDEX_FILE = "data/ledger_index.json"
+METHODS = ('fifo', 'average')
+INDEX_EVERY = 50  # transactions between index rewrites (the tail is replayed on open)
+INDEX_VERSION = 3  # bumped when the index layout or lot ordering changes
+TAIL_BYTES = 256   # ledger bytes just before the indexed offset, fingerprinted in the index
+
+
+def _today():
+    return datetime.date.today().isoformat()
+
+
+def parse_date(text):
+    """Trade date as "YYYY-MM-DD"; ValueError if `text` is not an ISO date."""
+    try:
+        return datetime.date.fromisoformat(str(text)).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid trade date '{text}' (use YYYY-MM-DD)") from None
+
+
+def _parse_ex_date(text):
+    try:
+        return datetime.datetime.strptime(text, "%b %d, %Y").date().isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def _empty_dividends():
+    # events: [[ex_date, pay_date, shares, per_share], ...] attributed for ex-dates <= through
+    # shares: held at `through`; steps: [[date, shares_after], ...] trades not yet attributed
+    # key: hash of the known ex-dates <= through (a revised dividend history forces a replay)
+    return {'through': None, 'shares': 0.0, 'steps': [], 'events': [], 'key': None, 'dirty': False}
+
+
+def _empty_position():
+    return {'lots': [], 'shares': 0.0, 'cost': 0.0, 'realized': 0.0, 'div': _empty_dividends()}
+
+
+def _events_key(events):
+    return hashlib.sha1(json.dumps(events).encode('utf-8')).hexdigest() if events else None
+
+
+class Ledger:
+    def __init__(self, path=LEDGER_FILE, index_file=INDEX_FILE, method='fifo', lock=None):
+        if method not in METHODS:
+            raise ValueError(f"Unknown cost method '{method}' (use one of {', '.join(METHODS)})")
+        self.path = path
+        self.index_file = index_file
+        self.method = method
+        self.lock = lock or threading.RLock()
+        with self.lock:
+            self._load_index()
+
+    # --- Index ---
+
+    def _reset_index(self):
+        self.count = 0
+        self.offset = 0
+        self.tail = b""       # last TAIL_BYTES of the ledger up to self.offset
+        self.positions = {}   # symbol -> {'lots': [[date, shares, price], ...], 'shares', 'cost', 'realized', 'div'}
+        self.pending = 0      # transactions applied since the index was last written
+
+    def _size(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def _tail_at(self, offset):
+        """The ledger's last TAIL_BYTES bytes before `offset`."""
+        if not os.path.exists(self.path):
+            return b""
+        with open(self.path, 'rb') as f:
+            f.seek(max(0, offset - TAIL_BYTES))
+            return f.read(offset - max(0, offset - TAIL_BYTES))
+
+    def _load_index(self):
+        self._reset_index()
+        size = self._size()
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r') as f:
+                    idx = json.load(f)
+                # Stale if the ledger was replaced/truncated or the method/layout changed
+                if (idx.get('version') == INDEX_VERSION and idx.get('method') == self.method
+                        and idx.get('offset', 0) <= size):
+                    tail = self._tail_at(idx['offset'])
+                    if hashlib.sha1(tail).hexdigest() == idx.get('tail'):
+                        self.count = idx['count']
+                        self.offset = idx['offset']
+                        self.tail = tail
+                        self.positions = idx['positions']
+            except:
+                self._reset_index()
+        self._replay_tail()
+
+    def _replay_tail(self):
+        for txn in self._read_from(self.offset):
+            self._apply(self.positions, txn)
+            self.count += 1
+            self.pending += 1
+
+    def refresh(self):
+        """Pick up transactions appended by another Ledger on the same file."""
+        with self.lock:
+            size = self._size()
+            if size < self.offset or (size > self.offset and self._tail_at(self.offset) != self.tail):
+                # Truncated or replaced since we read it
+                self._load_index()
+            elif size > self.offset:
+                self._replay_tail()
+
+    def _read_from(self, offset):
+        """Yield transactions from byte `offset`, advancing self.offset past complete lines."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn last line
+                self.offset += len(line)
+                self.tail = (self.tail + line)[-TAIL_BYTES:]
+                try:
+                    txn = json.loads(line)
+                except ValueError:
+                    continue
+                yield txn
+
+    def flush(self):
+        """Write the position index (temp file + rename)."""
+        with self.lock:
+            self._write_index()
+
+    def _write_index(self):
+        os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+        tmp = self.index_file + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'method': self.method, 'count': self.count, 'offset': self.offset,
+                       'tail': hashlib.sha1(self.tail).hexdigest(), 'positions': self.positions}, f)
+        os.replace(tmp, self.index_file)
+        self.pending = 0
+
+    # --- Accounting ---
+
+    def _apply(self, positions, txn, closed=None):
+        """Apply one transaction to a positions dict; closed lots are appended to `closed` if given."""
+        symbol = txn['symbol']
+        pos = positions.setdefault(symbol, _empty_position())
+        kind, shares, price, date = txn['type'], txn.get('shares', 0), txn.get('price'), txn['date']
+
+        if kind == 'buy':
+            # Lots stay in trade-date order (back-dated buys included), so FIFO closes the oldest
+            # (bisect's key= needs Python 3.10; the monthly workflow runs 3.9)
+            slot = bisect.bisect_right([lot[0] for lot in pos['lots']], date)
+            pos['lots'].insert(slot, [date, shares, price])
+            pos['shares'] += shares
+            pos['cost'] += shares * price
+            self._note_trade(pos, date)
+            return
+
+        if kind not in ('sell', 'remove'):
+            return
+
+        if kind == 'remove':
+            shares = pos['shares']
+        avg = pos['cost'] / pos['shares'] if pos['shares'] else 0.0
+        remaining = shares
+        removed_cost = 0.0
+
+        while remaining > 1e-9 and pos['lots']:
+            lot = pos['lots'][0]
+            take = min(lot[1], remaining)
+            lot_cost = take * (avg if self.method == 'average' else lot[2])
+            removed_cost += lot_cost
+            if closed is not None and kind == 'sell':
+                closed.append({
+                    'symbol': symbol, 'buy_date': lot[0], 'sell_date': date, 'shares': take,
+                    'buy_price': lot_cost / take, 'sell_price': price,
+                    'realized': take * price - lot_cost,
+                    'days_held': (datetime.date.fromisoformat(date) - datetime.date.fromisoformat(lot[0])).days,
+                })
+            lot[1] -= take
+            remaining -= take
+            if lot[1] <= 1e-9:
+                pos['lots'].pop(0)
+
+        pos['shares'] -= shares
+        pos['cost'] -= removed_cost
+        if self.method == 'average':
+            # Pooled cost: every remaining lot carries the average price
+            for lot in pos['lots']:
+                lot[2] = avg
+        if pos['shares'] <= 1e-9:
+            pos['shares'], pos['cost'], pos['lots'] = 0.0, 0.0, []
+        if kind == 'sell':
+            pos['realized'] += shares * price - removed_cost
+        self._note_trade(pos, date)
+
+    def _note_trade(self, pos, date):
+        """Queue the new share count for dividend attribution."""
+        div = pos['div']
+        if (div['through'] and date < div['through']) or (div['steps'] and date < div['steps'][-1][0]):
+            div['dirty'] = True  # back-dated: holdings before already-attributed ex-dates changed
+        div['steps'].append([date, pos['shares']])
+
+    def _accrue(self, pos, events, as_of):
+        """
+        Attribute ex-dates in (through, as_of] of `events` ([[ex, pay, per_share], ...])
+        to the shares held before each. False if the position needs a replay instead.
+        """
+        div = pos['div']
+        through = div['through']
+        if div['dirty'] or _events_key([e for e in events if through and e[0] <= through]) != div['key']:
+            return False
+        shares, steps, i = div['shares'], div['steps'], 0
+        for ex, pay, amount in events:
+            if (through and ex <= through) or ex > as_of:
+                continue
+            while i < len(steps) and steps[i][0] < ex:
+                shares = steps[i][1]
+                i += 1
+            if shares > 0:
+                div['events'].append([ex, pay or ex, shares, amount])
+        while i < len(steps) and steps[i][0] <= as_of:
+            shares = steps[i][1]
+            i += 1
+        div['shares'], div['steps'] = shares, steps[i:]
+        div['through'] = max(through or as_of, as_of)
+        div['key'] = _events_key([e for e in events if e[0] <= div['through']])
+        return True
+
+    def _replay_dividends(self):
+        """Reset dividend attribution to the full date-ordered holdings history (replays the ledger)."""
+        for pos in self.positions.values():
+            pos['div'] = _empty_dividends()
+        for symbol, steps in self._holdings_timeline().items():
+            self.positions[symbol]['div']['steps'] = [list(step) for step in steps]
+
+    def record(self, kind, symbol, shares=0.0, price=None, date=None, note=None):
+        """Append one transaction and apply it to the index. Returns the transaction."""
+        symbol = symbol.upper()
+        # Validate before appending: a bad date in the append-only log breaks every later replay
+        date = parse_date(date) if date else _today()
+        with self.lock:
+            self.refresh()
+            held = self.positions.get(symbol, {}).get('shares', 0.0)
+            if kind == 'sell' and shares > held + 1e-9:
+                raise ValueError(f"Cannot sell {shares:g} {symbol}: only {held:g} held")
+            if kind in ('sell', 'remove') and held <= 0:
+                raise ValueError(f"{symbol} is not held")
+            if kind == 'sell':
+                # Only lots bought on or before the sale date can be closed by it
+                lots = self.positions[symbol]['lots']
+                held_then = sum(lot[1] for lot in lots if lot[0] <= date)
+                if shares > held_then + 1e-9:
+                    raise ValueError(f"Cannot sell {shares:g} {symbol} on {date}: only {held_then:g} held by then")
+            if kind == 'remove':
+                shares = held
+
+            txn = {'id': self.count + 1, 'ts': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                   'date': date, 'type': kind, 'symbol': symbol,
+                   'shares': float(shares), 'price': float(price) if price is not None else None}
+            if note:
+                txn['note'] = note
+
+            line = (json.dumps(txn) + "\n").encode('utf-8')
+            if self._size() > self.offset:
+                # A torn line from a crash mid-append: terminate it so it is skipped as garbage
+                line = b"\n" + line
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+                self.offset = f.tell()
+            self.tail = self._tail_at(self.offset)  # includes a torn fragment terminated above
+
+            self._apply(self.positions, txn)
+            self.count += 1
+            self.pending += 1
+            if self.pending >= INDEX_EVERY:
+                self._write_index()
+            return txn
+
+    def buy(self, symbol, shares, price, date=None, note=None):
+        return self.record('buy', symbol, shares, price, date, note)
+
+    def sell(self, symbol, shares, price, date=None):
+        return self.record('sell', symbol, shares, price, date)
+
+    def remove(self, symbol, date=None):
+        """Drop a holding without booking P&L (e.g. a position entered by mistake)."""
+        return self.record('remove', symbol, date=date)
+
+    # --- Queries (index-backed, O(symbols)) ---
+
+    def position(self, symbol):
+        self.refresh()
+        return self.positions.get(symbol.upper())
+
+    def open_positions(self):
+        self.refresh()
+        return {s: p for s, p in self.positions.items() if p['shares'] > 0}
+
+    def dividends_received(self, fund_data, as_of=None):
+        """
+        Total dividends paid by `as_of` on held shares (the rules of dividends()), from
+        the index: only ex-dates since the last call are attributed, so this is
+        O(positions + their dividend events). Back-dated trades or a revised dividend
+        history trigger one replay of the ledger.
+        """
+        as_of = as_of or _today()
+        with self.lock:
+            self.refresh()
+            calendar = {symbol: dividends.parse_events(fund_data.get(symbol, {}).get('div_history'))
+                        for symbol in self.positions}
+            if not all([self._accrue(pos, calendar[s], as_of) for s, pos in self.positions.items()]):
+                self._replay_dividends()
+                for symbol, pos in self.positions.items():
+                    self._accrue(pos, calendar[symbol], as_of)
+            return sum(shares * amount for pos in self.positions.values()
+                       for ex, pay, shares, amount in pos['div']['events'] if pay <= as_of and ex <= as_of)
+
+    def realized_total(self):
+        self.refresh()
+        return sum(p['realized'] for p in self.positions.values())
+
+    # --- Queries that replay the ledger ---
+
+    def transactions(self):
+        if not os.path.exists(self.path):
+            return []
+        out = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue
+        return out
+
+    def closed_lots(self):
+        """Every realized lot with buy/sell dates, prices and holding period."""
+        closed, positions = [], {}
+        for txn in self.transactions():
+            self._apply(positions, txn, closed)
+        return closed
+
+    def _holdings_timeline(self):
+        """{symbol: [(date, shares_after), ...]} in transaction order."""
+        timeline, positions = {}, {}
+        for txn in sorted(self.transactions(), key=lambda t: (t['date'], t['id'])):
+            self._apply(positions, txn)
+            timeline.setdefault(txn['symbol'], []).append((txn['date'], positions[txn['symbol']]['shares']))
+        return timeline
+
+    def dividends(self, fund_data, as_of=None):
+        """
+        Dividends earned on held shares, from pse_fundamentals div_history.
+        Shares count if held before the ex-date; an event is 'received' once its
+        pay date has passed (or, with no pay date, its ex-date).
+        """
+        as_of = as_of or _today()
+        events = []
+        for symbol, steps in self._holdings_timeline().items():
+            for d in fund_data.get(symbol, {}).get('div_history', []):
+                ex = _parse_ex_date(d.get('ex_date'))
+                if not ex or ex > as_of or not d.get('amount'):
+                    continue
+                shares = 0.0
+                for date, held in steps:
+                    if date >= ex:
+                        break
+                    shares = held
+                if shares <= 0:
+                    continue
+                pay = _parse_ex_date(d.get('pay_date')) or ex
+                amount = float(d['amount'])
+                events.append({'symbol': symbol, 'ex_date': ex, 'pay_date': pay, 'shares': shares,
+                               'per_share': amount, 'amount': shares * amount, 'received': pay <= as_of})
+        events.sort(key=lambda e: e['ex_date'])
+        return events
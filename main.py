@@ -1,41 +1,30 @@
 # main.py
 # Entry point for PSE stock monitoring
-import json
-import numpy as np
-
-class CustomEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.bool_):
-            return bool(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super(CustomEncoder, self).default(obj)
-
-from data_fetcher import DataFetcher
-from analyzer import Analyzer
-from recommender import Recommender
-from report_generator import ReportGenerator
 import datetime
-from stock_data import STOCK_CATEGORIES, get_all_symbols
+from stock_data import get_universe
+from scores import FUNDAMENTAL_DATA_FILE, TECHNICAL_DATA_FILE, build_score_table, save_score_table
+from datastore import load_data, save_data
+from tracing import TRACER, span
 
 # Configuration
 START_DATE = "2023-01-01"
 END_DATE = datetime.datetime.now().strftime("%Y-%m-%d")
 
 def main():
+    # Heavy dependencies (pandas, requests, bs4) load here, not at import / --help
+    from data_fetcher import DataFetcher
+    from analyzer import Analyzer
+    from report_generator import ReportGenerator
+
     fetcher = DataFetcher()
     analyzer = Analyzer()
-    recommender = Recommender()
     report_gen = ReportGenerator()
     
     analysis_results = {}
-    all_symbols = get_all_symbols()
+    universe = get_universe()
+    all_symbols = universe.symbols
     
-    print(f"Starting analysis for {len(all_symbols)} stocks across {len(STOCK_CATEGORIES)} industries...")
+    print(f"Starting analysis for {len(all_symbols)} stocks across {len(universe.categories)} industries...")
     
     print(f"Using max_workers=8 for faster fetching...")
     
@@ -52,7 +41,8 @@ def main():
             data = fetcher.fetch_investagrams(symbol, days=365)
             
             if data is not None and not data.empty:
-                analysis = analyzer.analyze_trend(data)
+                with span('analyze'):
+                    analysis = analyzer.analyze_trend(data)
                 
                 with print_lock:
                     print(f"  [OK] [{symbol}] {analysis['last_close']:.2f} | {analysis.get('trend')} | RSI: {analysis.get('rsi', 0):.1f}")
@@ -82,29 +72,24 @@ def main():
                 analysis_results[symbol] = result
 
     # Save Technical Data
-    with open("data/technical_data.json", "w") as f:
-        json.dump(analysis_results, f, indent=4, cls=CustomEncoder)
+    save_data(TECHNICAL_DATA_FILE, analysis_results)
 
     fetcher.close()
     
     print(f"\nAnalysis Complete! {len(analysis_results)} stocks processed.")
     
+    # Score Table (shared by fetch_news, ReportGenerator and suggest_portfolio)
+    fund_data = load_data(FUNDAMENTAL_DATA_FILE)
+    score_table = build_score_table(analysis_results, fund_data, analyzer)
+    save_score_table(score_table)
+    
     # News Integration
     import fetch_news
     print(f"\n[i] Fetching News...")
     try:
-        # We can pass specific targets if we really want to filter, 
-        # but the logic in fetch_news handles filtering (score >= 6).
-        # Or we can pass 'analysis_results.keys()' if we want news for ALL processed stocks (might be too many).
-        # Let's stick to fetch_news default logic (score >= 6) for now to save bandwidth, 
-        # or we can pass the high scoring ones from our analysis.
-        
-        # Let's refine: Pass high scoring stocks from analysis_results to fetch_news?
-        # main.py knows the exact analysis. fetch_news re-calculates. 
-        # Optimization: Pass list of symbols with score >= 6 from analysis_results.
-        
-        # Actually, let's just let fetch_news do its thing to minimize main.py complexity for now.
-        fetch_news.run_news_fetch() 
+        # Pass the symbols with score >= 6 straight from this run's score table
+        targets = [s for s, entry in score_table.items() if entry['score'] >= 6]
+        fetch_news.run_news_fetch(targets)
     except Exception as e:
         print(f"[!] News Fetch Error: {e}")
     
@@ -112,13 +97,26 @@ def main():
     print(f"\n[i] Generating Dashboard...")
     report_gen.generate_dashboard() # Output file arg is default
     print(f"[OK] Dashboard saved.")
+    # Ranked in the same pass as the dashboard's Top Picks
+    for sector, pick in report_gen.category_picks.items():
+        print(f"  [{sector}] {pick['symbol']}: {pick['strategy']} {pick['buy_price']} -> {pick['sell_price']}")
     
     print(f"\n[->] Opening dashboard in browser...")
     report_gen.open_in_browser("report.html")
     
     print(f"\n[NOTE] Run 'python fetch_pse_fundamentals.py' in a separate terminal to populate fundamental data.")
+    
+    TRACER.finish('main')
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    from profiling import Profiler, add_profile_args
+    
+    parser = argparse.ArgumentParser(description="PSE technical analysis pipeline")
+    add_profile_args(parser)
+    args = parser.parse_args()
+    
+    with Profiler.from_args('main', args):
+        main()
 
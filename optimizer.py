@@ -0,0 +1,235 @@
+# optimizer.py
+# Portfolio weights from return history: min-variance, max-Sharpe and risk-parity
+#
+# Covariance comes from the candidates' daily closes (technical_data 'history')
+# with Ledoit-Wolf shrinkage toward a scaled identity, so a year of bars is
+# enough to get a well-conditioned matrix for hundreds of names.
+#
+# Weights are long-only, fully invested, capped per stock and per sector. The
+# smooth objectives are solved by accelerated projected gradient; the projection
+# onto {sum w = 1, 0 <= w <= max_weight, sector sums <= sector_cap} is exact
+# (each sector's cap becomes a threshold, then one bisection for the budget), so
+# every iterate is feasible. Everything is numpy: a few hundred candidates solve
+# in tens of milliseconds.
+import numpy as np
+
+METHODS = ('min_variance', 'max_sharpe', 'risk_parity')
+LOOKBACK = 252        # trading days of returns used
+MIN_OBS = 60          # candidates with fewer daily returns are left out
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.06  # annual, roughly the PH 1-year T-bill
+MU_SHRINKAGE = 0.5    # pull of each stock's mean return toward the cross-sectional mean
+MAX_ITER = 500
+TOL = 1e-9            # max weight change per iteration at convergence
+
+
+def return_matrix(tech_data, symbols, lookback=LOOKBACK, min_obs=MIN_OBS):
+    """(kept symbols, T x n daily simple returns) over the last `lookback` dates."""
+    from valuation import price_panel  # pandas
+    histories = {s: (tech_data.get(s) or {}).get('history') or [] for s in symbols}
+    closes = price_panel(histories, symbols).iloc[-(lookback + 1):]
+    returns = closes.pct_change().iloc[1:]
+    counts = returns.notna().sum()
+    kept = [s for s in symbols if counts.get(s, 0) >= min_obs]
+    # Days a stock did not trade (or had no bar yet) count as flat
+    return kept, returns[kept].fillna(0.0).to_numpy()
+
+
+def shrunk_covariance(returns):
+    """Ledoit-Wolf (2004) covariance shrunk toward mu*I. Returns (cov, shrinkage intensity)."""
+    t, n = returns.shape
+    x = returns - returns.mean(axis=0)
+    sample = x.T @ x / t
+    mu = np.trace(sample) / n
+    target = mu * np.eye(n)
+    d2 = ((sample - target) ** 2).sum() / n
+    # sum_t ||x_t x_t' - S||^2 = sum_t ||x_t||^4 - T ||S||^2
+    b2 = ((x ** 2).sum(axis=1) ** 2).sum() / t - (sample ** 2).sum()
+    b2 = min(max(b2 / (t * n), 0.0), d2)
+    shrinkage = b2 / d2 if d2 > 0 else 1.0
+    return shrinkage * target + (1 - shrinkage) * sample, shrinkage
+
+
+def _threshold(lo, hi, target):
+    """
+    lam with sum clip(hi - max(lam, lo), 0, hi - lo) == target, exactly.
+    The sum is piecewise linear in lam (slope -1 inside each (lo, hi)), so sort
+    the breakpoints, walk the cumulative sum and interpolate in the crossing segment.
+    """
+    live = hi > lo
+    lo, hi = lo[live], hi[live]
+    total = (hi - lo).sum()
+    if total <= target:
+        return -np.inf
+    points = np.concatenate([lo, hi])
+    order = np.argsort(points, kind='stable')
+    points = points[order]
+    active = np.cumsum(np.concatenate([np.ones(len(lo)), -np.ones(len(hi))])[order])
+    # Mass above each breakpoint: total minus what the active intervals lost so far
+    mass = total - np.concatenate([[0.0], np.cumsum(active[:-1] * np.diff(points))])
+    k = np.searchsorted(-mass, -target, side='left') - 1  # last breakpoint with mass > target
+    return points[k] + (mass[k] - target) / active[k]
+
+
+class Constraints:
+    """Long-only, fully invested, w_i <= max_weight, sector sums <= sector_cap."""
+
+    def __init__(self, sectors, max_weight=1.0, sector_cap=1.0):
+        n = len(sectors)
+        names = sorted(set(sectors))
+        self.group = np.array([names.index(s) for s in sectors])
+        self.n_groups = len(names)
+        self.upper = np.full(n, float(max_weight))
+        self.sector_cap = float(sector_cap)
+        self.members = [np.flatnonzero(self.group == g) for g in range(self.n_groups)]
+        # Sectors whose stocks could exceed the cap between them
+        self.capped = [m for m in self.members if self.upper[m].sum() > self.sector_cap]
+
+    def feasible(self):
+        return sum(min(self.upper[m].sum(), self.sector_cap) for m in self.members) >= 1.0 - 1e-9
+
+    def project(self, y):
+        """
+        Euclidean projection of y onto the constraint set: w_i = clip(y_i - max(lam, tau_s), 0, u_i)
+        where tau_s holds sector s at its cap (-inf where the cap doesn't bind) and lam sets the budget.
+        """
+        floor = np.full(len(y), -np.inf)
+        for m in self.capped:
+            floor[m] = _threshold(y[m] - self.upper[m], y[m], self.sector_cap)
+        lam = _threshold(np.maximum(y - self.upper, floor), y, 1.0)
+        return np.clip(y - np.maximum(lam, floor), 0.0, self.upper)
+
+
+def _minimize(fun, w0, cons, max_iter=MAX_ITER, tol=TOL):
+    """Accelerated projected gradient with backtracking and adaptive restart. fun(w) -> (f, grad)."""
+    w = cons.project(w0)
+    f, g = fun(w)
+    y, fy, gy = w, f, g
+    # Initial step from the local curvature along the gradient
+    probe = w - 1e-6 * g / (np.abs(g).max() or 1.0)
+    step = np.linalg.norm(probe - w) / (np.linalg.norm(fun(probe)[1] - g) or 1.0)
+    momentum = 1.0
+    for _ in range(max_iter):
+        while True:
+            z = cons.project(y - step * gy)
+            fz, gz = fun(z)
+            d = z - y
+            if fz <= fy + gy @ d + (d @ d) / (2 * step) + 1e-15:
+                break
+            step /= 2
+        if fz > f:  # restart momentum when it overshoots
+            y, fy, gy, momentum = w, f, g, 1.0
+            continue
+        converged = np.abs(z - w).max() < tol
+        nxt = (1 + np.sqrt(1 + 4 * momentum ** 2)) / 2
+        y = z + (momentum - 1) / nxt * (z - w)
+        w, f, g, momentum = z, fz, gz, nxt
+        if converged:
+            break
+        fy, gy = fun(y)
+    return w
+
+
+def min_variance(cov, cons):
+    def fun(w):
+        cw = cov @ w
+        return w @ cw, 2 * cw
+    n = len(cov)
+    return _minimize(fun, np.full(n, 1.0 / n), cons)
+
+
+def max_sharpe(mu, cov, cons, rf=0.0):
+    """
+    Maximize (mu'w - rf) / sqrt(w'Cw). The ratio is pseudo-concave while some
+    weights beat rf, so projected ascent reaches the global optimum; otherwise
+    it falls back to min-variance.
+    """
+    excess = mu - rf
+    if excess.max() <= 0:
+        return min_variance(cov, cons)
+
+    def fun(w):
+        cw = cov @ w
+        vol = np.sqrt(w @ cw)
+        ret = excess @ w
+        return -ret / vol, -(excess / vol - ret * cw / vol ** 3)
+    start = cons.project(np.maximum(excess, 0) / excess[excess > 0].sum())
+    return _minimize(fun, start, cons)
+
+
+def risk_parity(cov, cons, max_iter=50):
+    """
+    Equal risk contributions: Newton on Spinu's convex form min x'Cx/2 - sum(log x) / n,
+    scaled to sum to 1 and, if that breaks a cap, projected onto the constraints.
+    """
+    n = len(cov)
+    b = np.full(n, 1.0 / n)
+    x = 1.0 / np.sqrt(np.diag(cov))
+    x *= np.sqrt(1.0 / (x @ cov @ x))
+    for _ in range(max_iter):
+        grad = cov @ x - b / x
+        delta = np.linalg.solve(cov + np.diag(b / x ** 2), grad)
+        step = 1.0
+        while np.any(x - step * delta <= 0):
+            step /= 2
+        x = x - step * delta
+        if np.abs(grad * x).max() < 1e-12:
+            break
+    return cons.project(x / x.sum())
+
+
+def risk_contributions(w, cov):
+    """Each weight's share of portfolio variance."""
+    cw = cov @ w
+    return w * cw / (w @ cw)
+
+
+def optimize(method, tech_data, symbols, sectors, max_weight=0.25, sector_cap=0.4,
+             max_assets=None, rf=RISK_FREE_RATE):
+    """
+    Weights for `symbols` (with parallel `sectors`) under `method`.
+    Returns {'weights': {symbol: w}, 'volatility', 'expected_return', 'sharpe',
+    'shrinkage', 'dropped': [symbols without enough history]}, or None if nothing is left.
+    With max_assets, the largest weights are kept and the problem is re-solved on them.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}' (use one of {', '.join(METHODS)})")
+    sector_of = dict(zip(symbols, sectors))
+    kept, returns = return_matrix(tech_data, list(symbols))
+    dropped = sorted(set(symbols) - set(kept))
+    if not kept:
+        return None
+
+    def solve(names, rets):
+        cov, shrinkage = shrunk_covariance(rets)
+        mean = rets.mean(axis=0)
+        mu = MU_SHRINKAGE * mean.mean() + (1 - MU_SHRINKAGE) * mean
+        # At least 1/n per stock and a sector cap the universe can satisfy
+        cap = max(max_weight, 1.0 / len(names))
+        cons = Constraints([sector_of[s] for s in names], cap, sector_cap)
+        if not cons.feasible():
+            cons = Constraints([sector_of[s] for s in names], cap, 1.0)
+        if method == 'min_variance':
+            w = min_variance(cov, cons)
+        elif method == 'max_sharpe':
+            w = max_sharpe(mu, cov, cons, rf / TRADING_DAYS)
+        else:
+            w = risk_parity(cov, cons)
+        return w, cov, mu, shrinkage
+
+    w, cov, mu, shrinkage = solve(kept, returns)
+    if max_assets and np.count_nonzero(w > 1e-6) > max_assets:
+        top = np.sort(np.argsort(-w)[:max_assets])
+        kept = [kept[i] for i in top]
+        w, cov, mu, shrinkage = solve(kept, returns[:, top])
+
+    vol = float(np.sqrt(w @ cov @ w) * np.sqrt(TRADING_DAYS))
+    ret = float(mu @ w * TRADING_DAYS)
+    return {
+        'weights': {s: float(x) for s, x in zip(kept, w) if x > 1e-6},
+        'volatility': vol,
+        'expected_return': ret,
+        'sharpe': (ret - rf) / vol if vol > 0 else 0.0,
+        'shrinkage': float(shrinkage),
+        'dropped': dropped,
+    }
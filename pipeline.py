@@ -0,0 +1,493 @@
+# pipeline.py
+# Staged daily pipeline: universe -> bars -> indicators (-> charts, timeframes, strength), fundamentals -> dividends -> scores -> news -> report
+#
+# Each stage declares the stages it reads from. Independent stages run in
+# parallel threads and per-symbol results stream between stages, so e.g. news
+# for a symbol is requested as soon as that symbol has been scored. A stage is
+# skipped when its fingerprint (its own inputs + its dependencies' fingerprints)
+# matches the last successful run and its output file is still on disk.
+import argparse
+import asyncio
+import datetime
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from datastore import load_data, resolve, save_data
+from tracing import TRACER, span
+
+STATE_FILE = "data/pipeline_state.json"
+STOCK_IDS_FILE = "data/stock_ids.json"
+METADATA_FILE = "data/stock_metadata.json"
+TECHNICAL_DATA_FILE = "data/technical_data.json"
+FUNDAMENTAL_DATA_FILE = "data/pse_fundamentals.json"
+DIVIDENDS_FILE = "data/dividends.json"
+CHARTS_FILE = "data/chart_series.json"
+TIMEFRAMES_FILE = "data/timeframes.json"
+RELATIVE_STRENGTH_FILE = "data/relative_strength.json"
+NEWS_DATA_FILE = "data/news_data.json"
+PORTFOLIO_FILE = "data/portfolio.json"
+PORTFOLIO_WAL_FILE = "data/portfolio.wal"
+REPORT_FILE = "report.html"
+
+FETCH_WORKERS = 8
+NEWS_MIN_SCORE = 6
+
+
+def load_json(filepath):
+    if os.path.exists(filepath):
+        try:
+            with open(filepath, 'r') as f:
+                return json.load(f)
+        except:
+            return {}
+    return {}
+
+
+def file_stamp(*paths):
+    """Cheap change marker for input files (mtime + size)."""
+    stamp = []
+    for path in paths:
+        if os.path.exists(path):
+            st = os.stat(path)
+            stamp.append([path, st.st_mtime_ns, st.st_size])
+        else:
+            stamp.append([path, None, None])
+    return stamp
+
+
+class Channel:
+    """Append-only stream of (symbol, value) shared by a producer and any number of readers."""
+
+    def __init__(self, cond):
+        self.cond = cond
+        self.items = []
+        self.closed = False
+
+    def put(self, key, value):
+        with self.cond:
+            self.items.append((key, value))
+            self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def as_dict(self):
+        with self.cond:
+            return dict(self.items)
+
+
+class Stage:
+    def __init__(self, name, deps, run, inputs=None, output=None, load=None):
+        self.name = name
+        self.deps = deps
+        self.run = run            # run(ctx) -> None, emits with ctx.emit(symbol, value), writes with ctx.save
+        self.inputs = inputs      # inputs() -> JSON-able external inputs for the fingerprint
+        self.output = output      # file whose presence allows the stage to be skipped
+        self.load = load          # load() -> {symbol: value} when skipped
+
+
+class StageContext:
+    def __init__(self, pipeline, stage):
+        self.pipeline = pipeline
+        self.stage = stage
+
+    def emit(self, key, value):
+        self.pipeline.channels[self.stage.name].put(key, value)
+
+    def stream(self, *names):
+        """Yield (stage, symbol, value) from the named upstream stages as they arrive."""
+        channels = [(n, self.pipeline.channels[n]) for n in names]
+        cursors = {n: 0 for n in names}
+        cond = self.pipeline.cond
+        while True:
+            batch = []
+            with cond:
+                while True:
+                    for n, ch in channels:
+                        if cursors[n] < len(ch.items):
+                            batch.extend((n, k, v) for k, v in ch.items[cursors[n]:])
+                            cursors[n] = len(ch.items)
+                    if batch or all(ch.closed for _, ch in channels):
+                        break
+                    cond.wait()
+            if not batch:
+                return
+            yield from batch
+
+    def save(self, write, *args):
+        """
+        Write the stage's output with write(*args), unless a dependency failed: output built
+        from partial input must not replace the last good copy. Returns whether it wrote.
+        """
+        with self.pipeline.cond:
+            failed = [d for d in self.stage.deps if d in self.pipeline.failed]
+        if failed:
+            print(f"[!] Stage '{self.stage.name}' not saved: {', '.join(failed)} failed")
+            return False
+        write(*args)
+        return True
+
+    def wait(self, *names):
+        """Block until the named stages finish; returns their results as {stage: {symbol: value}}."""
+        for _ in self.stream(*names):
+            pass
+        return {n: self.pipeline.channels[n].as_dict() for n in names}
+
+
+class Pipeline:
+    def __init__(self, stages, force=False):
+        self.stages = {s.name: s for s in stages}
+        self.force = force
+        self.cond = threading.Condition()
+        self.channels = {}
+        self.state = load_json(STATE_FILE)
+        self.status = {}
+        self.failed = set()
+        self.elapsed = {}
+
+    def fingerprint(self, name, memo):
+        if name not in memo:
+            stage = self.stages[name]
+            payload = {
+                'inputs': stage.inputs() if stage.inputs else None,
+                'deps': [self.fingerprint(d, memo) for d in stage.deps],
+            }
+            raw = json.dumps(payload, sort_keys=True, default=str)
+            memo[name] = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return memo[name]
+
+    def plan(self, targets):
+        """Return ({stage: 'run'|'load'}, fingerprints) for everything the targets need."""
+        memo = {}
+        actions = {}
+
+        def visit(name):
+            if name in actions:
+                return
+            stage = self.stages[name]
+            fp = self.fingerprint(name, memo)
+            fresh = (not self.force and stage.load and stage.output and resolve(stage.output)
+                     and self.state.get(name) == fp)
+            actions[name] = 'load' if fresh else 'run'
+            if not fresh:
+                for dep in stage.deps:
+                    visit(dep)
+
+        for t in targets:
+            visit(t)
+        return actions, memo
+
+    def _run_stage(self, stage, fingerprint):
+        ctx = StageContext(self, stage)
+        started = time.time()
+        try:
+            stage.run(ctx)
+            self.elapsed[stage.name] = time.time() - started
+            elapsed = f"{self.elapsed[stage.name]:.1f}s"
+            with self.cond:
+                upstream_failed = any(d in self.failed for d in stage.deps)
+                if upstream_failed:
+                    # Ran on partial input (and ctx.save kept the old output): fail it too,
+                    # so its dependents don't save either and the next run doesn't skip it
+                    self.failed.add(stage.name)
+                    self.status[stage.name] = f"FAILED: upstream failed, not saved ({elapsed})"
+                else:
+                    self.state[stage.name] = fingerprint
+                    self.status[stage.name] = f"done in {elapsed}"
+        except Exception as e:
+            with self.cond:
+                self.failed.add(stage.name)
+            self.status[stage.name] = f"FAILED: {e}"
+            print(f"[!] Stage '{stage.name}' failed: {e}")
+        finally:
+            self.channels[stage.name].close()
+
+    def run(self, targets):
+        actions, fingerprints = self.plan(targets)
+        order = [n for n in self.stages if n in actions]
+        print("Pipeline plan: " + ", ".join(f"{n}({actions[n]})" for n in order))
+
+        for name in order:
+            self.channels[name] = Channel(self.cond)
+
+        threads = []
+        for name in order:
+            stage = self.stages[name]
+            if actions[name] == 'load':
+                for key, value in stage.load().items():
+                    self.channels[name].put(key, value)
+                self.channels[name].close()
+                self.status[name] = "skipped (unchanged)"
+                continue
+            th = threading.Thread(target=self._run_stage, args=(stage, fingerprints[name]), name=name, daemon=True)
+            th.start()
+            threads.append(th)
+
+        for th in threads:
+            th.join()
+
+        with open(STATE_FILE, 'w') as f:
+            json.dump(self.state, f, indent=4)
+
+        print("\nPipeline summary:")
+        for name in order:
+            print(f"  {name:<13} {self.status.get(name, '-')}")
+            if name in self.elapsed:
+                TRACER.add_span(f"stage:{name}", self.elapsed[name])
+        return self.status
+
+
+# --- Stage implementations ---
+
+def run_universe(ctx):
+    from stock_data import get_all_symbols
+    stock_ids = load_json(STOCK_IDS_FILE)
+    symbols = set(get_all_symbols()) | set(stock_ids)
+    for symbol in sorted(symbols):
+        ctx.emit(symbol, stock_ids.get(symbol, {}))
+
+
+def run_bars(ctx):
+    from data_fetcher import DataFetcher
+    fetcher = DataFetcher()
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        futures = {executor.submit(fetcher.fetch_investagrams, symbol, 365): symbol
+                   for _, symbol, _ in ctx.stream('universe')}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"  [!] [{symbol}] Error: {e}")
+                continue
+            if data is not None and not data.empty:
+                ctx.emit(symbol, data)
+            else:
+                print(f"  [X] [{symbol}] No data")
+    fetcher.close()
+
+
+def run_indicators(ctx):
+    from analyzer import Analyzer
+    analyzer = Analyzer()
+    results = {}
+    for _, symbol, data in ctx.stream('bars'):
+        try:
+            with span('analyze'):
+                analysis = analyzer.analyze_trend(data)
+        except Exception as e:
+            print(f"  [!] [{symbol}] Error: {e}")
+            continue
+        results[symbol] = analysis
+        print(f"  [OK] [{symbol}] {analysis['last_close']:.2f} | {analysis.get('trend')} | RSI: {analysis.get('rsi', 0):.1f}")
+        ctx.emit(symbol, analysis)
+
+    ctx.save(save_data, TECHNICAL_DATA_FILE, results)
+
+
+def run_charts(ctx):
+    import chart_series
+    table = {}
+    for _, symbol, analysis in ctx.stream('indicators'):
+        table[symbol] = chart_series.build(analysis.get('history'))
+        ctx.emit(symbol, table[symbol])
+    ctx.save(chart_series.save_table, table)
+
+
+def run_timeframes(ctx):
+    import timeframes
+    from analyzer import Analyzer
+    analyzer = Analyzer()
+    # Incremental: last run's aggregates plus the daily bars that came in since
+    table = timeframes.load_table(current=False)
+    for _, symbol, analysis in ctx.stream('indicators'):
+        if not analysis.get('history'):
+            continue
+        record = table[symbol] = timeframes.update(table.get(symbol), analysis['history'])
+        for tf in timeframes.TIMEFRAMES:
+            timeframes.analyze(record, tf, analyzer)
+        ctx.emit(symbol, record)
+    ctx.save(timeframes.save_table, table)
+
+
+def run_strength(ctx):
+    import relative_strength
+    # Cross-sectional: needs every symbol's history before anything can be ranked
+    tech = ctx.wait('indicators')['indicators']
+    table = relative_strength.build_table(tech)
+    ctx.save(relative_strength.save_table, table)
+    for symbol, snapshot in relative_strength.latest(table).items():
+        ctx.emit(symbol, snapshot)
+
+
+def run_fundamentals(ctx):
+    import fetch_pse_fundamentals
+    stock_ids = {sym: ids for _, sym, ids in ctx.stream('universe') if ids.get('cmpy_id')}
+    # Prices from the previous technical run, only used to back-fill P/E or EPS
+    technical_data = load_data(TECHNICAL_DATA_FILE)
+    # Other stages are running in threads: forking now could copy a held lock into the
+    # parse workers and deadlock them, so they are spawned instead
+    results = asyncio.run(fetch_pse_fundamentals.scrape_all_async(
+        stock_ids, technical_data, on_record=ctx.emit, mp_context=multiprocessing.get_context('spawn')))
+    ctx.save(save_data, FUNDAMENTAL_DATA_FILE, results)
+
+
+def run_dividends(ctx):
+    import dividends
+    # Prices from the previous technical run, only used for the stored yield
+    prices = {s: t.get('last_close') for s, t in load_data(TECHNICAL_DATA_FILE).items() if isinstance(t, dict)}
+    as_of = _today()
+    table = {}
+    for _, symbol, of in ctx.stream('fundamentals'):
+        table[symbol] = dividends.summarize(of.get('div_history'), as_of, prices.get(symbol))
+        ctx.emit(symbol, table[symbol])
+    ctx.save(dividends.save_table, table)
+
+
+def run_scores(ctx):
+    from analyzer import Analyzer
+    from scores import build_score_table, save_score_table
+    analyzer = Analyzer()
+    tech, fund, divs, strength, table = {}, {}, {}, {}, {}
+
+    def score(symbol):
+        table.update(build_score_table({symbol: tech[symbol]}, fund, analyzer, divs, strength))
+        if symbol in table:
+            ctx.emit(symbol, table[symbol])
+
+    pending = set()
+    for name, symbol, value in ctx.stream('indicators', 'fundamentals', 'dividends', 'strength'):
+        if name == 'indicators':
+            tech[symbol] = value
+            pending.add(symbol)
+        elif name == 'fundamentals':
+            fund[symbol] = value
+        elif name == 'dividends':
+            divs[symbol] = value
+        else:
+            strength[symbol] = value
+        if symbol in pending and symbol in divs and symbol in strength:
+            pending.discard(symbol)
+            score(symbol)
+
+    # Symbols without a PSE Edge record (or too little history to rank) are scored on what they have
+    for symbol in sorted(pending):
+        score(symbol)
+
+    ctx.save(save_score_table, table)
+
+
+def run_news(ctx):
+    import fetch_news
+    news_store = fetch_news.load_json(fetch_news.NEWS_DATA_FILE)
+    cache = fetch_news.load_json(fetch_news.NEWS_CACHE_FILE)
+    updated = 0
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        futures = {}
+        for _, symbol, entry in ctx.stream('scores'):
+            if entry['score'] >= NEWS_MIN_SCORE and fetch_news.is_due(symbol, cache):
+                futures[executor.submit(fetch_news.fetch_rss, symbol, cache.get(symbol))] = symbol
+
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                items, entry = future.result()
+            except Exception as e:
+                print(f"[{symbol}] Failed: {e}")
+                continue
+            if fetch_news.apply_news(symbol, items, entry, news_store, cache) == 'updated':
+                updated += 1
+                ctx.emit(symbol, news_store[symbol])
+
+    print(f"News: {updated} of {len(futures)} requested feeds updated.")
+    ctx.save(fetch_news.save_news, news_store, cache)
+
+
+def run_report(ctx):
+    from report_generator import ReportGenerator
+    ctx.wait('scores', 'news', 'charts', 'timeframes')
+
+    def generate():
+        print("\n[i] Generating Dashboard...")
+        path = ReportGenerator().generate_dashboard(REPORT_FILE)
+        print(f"[OK] Dashboard saved to {path}")
+
+    ctx.save(generate)
+
+
+def _today():
+    return datetime.date.today().isoformat()
+
+
+def _load_strength():
+    import relative_strength
+    return relative_strength.latest(load_data(RELATIVE_STRENGTH_FILE))
+
+
+def build_stages():
+    import fetch_news
+    return [
+        Stage('universe', [], run_universe,
+              inputs=lambda: file_stamp(METADATA_FILE, STOCK_IDS_FILE)),
+        Stage('bars', ['universe'], run_bars,
+              inputs=_today),
+        Stage('indicators', ['bars'], run_indicators,
+              output=TECHNICAL_DATA_FILE, load=lambda: load_data(TECHNICAL_DATA_FILE)),
+        Stage('charts', ['indicators'], run_charts,
+              output=CHARTS_FILE, load=lambda: load_data(CHARTS_FILE).get('symbols', {})),
+        Stage('timeframes', ['indicators'], run_timeframes,
+              output=TIMEFRAMES_FILE, load=lambda: load_data(TIMEFRAMES_FILE).get('symbols', {})),
+        Stage('strength', ['indicators'], run_strength,
+              inputs=lambda: file_stamp(METADATA_FILE),
+              output=RELATIVE_STRENGTH_FILE, load=_load_strength),
+        Stage('fundamentals', ['universe'], run_fundamentals,
+              inputs=_today,
+              output=FUNDAMENTAL_DATA_FILE, load=lambda: load_data(FUNDAMENTAL_DATA_FILE)),
+        Stage('dividends', ['fundamentals'], run_dividends,
+              output=DIVIDENDS_FILE, load=lambda: load_data(DIVIDENDS_FILE).get('symbols', {})),
+        Stage('scores', ['indicators', 'fundamentals', 'dividends', 'strength'], run_scores,
+              output="data/scores.json", load=lambda: load_json("data/scores.json").get('scores', {})),
+        Stage('news', ['scores'], run_news,
+              inputs=lambda: int(time.time() // fetch_news.NEWS_TTL_SECONDS),
+              output=NEWS_DATA_FILE, load=lambda: load_json(NEWS_DATA_FILE)),
+        Stage('report', ['scores', 'news', 'charts', 'timeframes'], run_report,
+              inputs=lambda: file_stamp(PORTFOLIO_FILE, PORTFOLIO_WAL_FILE),
+              output=REPORT_FILE, load=lambda: {}),
+    ]
+
+
+def main():
+    stages = build_stages()
+    names = [s.name for s in stages]
+
+    parser = argparse.ArgumentParser(description="PSE daily pipeline")
+    parser.add_argument('targets', nargs='*',
+                        help=f"Stages to bring up to date, from: {', '.join(names)}. Default: report")
+    parser.add_argument('--force', action='store_true', help="Re-run every needed stage even if unchanged")
+    parser.add_argument('--open', action='store_true', help="Open the dashboard in the browser when done")
+    args = parser.parse_args()
+
+    unknown = [t for t in args.targets if t not in names]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    pipeline = Pipeline(stages, force=args.force)
+    pipeline.run(args.targets or ['report'])
+
+    if args.open and os.path.exists(REPORT_FILE):
+        from report_generator import ReportGenerator
+        ReportGenerator().open_in_browser(os.path.abspath(REPORT_FILE))
+
+    TRACER.finish('pipeline')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,22 @@
 import argparse
 from portfolio_manager import PortfolioManager
-from analyzer import Analyzer
-import pandas as pd
-import json
+from datastore import load_data
+from ledger import parse_date
+
+def trade_date(text):
+    try:
+        return parse_date(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
 def main():
     parser = argparse.ArgumentParser(description="PSE Portfolio Manager")
-    parser.add_argument('action', choices=['add', 'remove', 'list', 'update'], help="Action to perform")
+    parser.add_argument('action', choices=['add', 'sell', 'remove', 'list', 'lots', 'dividends', 'nav', 'update'], help="Action to perform")
     parser.add_argument('--symbol', '-s', help="Stock Symbol")
-    parser.add_argument('--price', '-p', type=float, help="Average Buy Price")
+    parser.add_argument('--price', '-p', type=float, help="Buy/Sell Price (for 'remove': sell everything at this price)")
     parser.add_argument('--shares', '-q', type=float, help="Number of Shares")
+    parser.add_argument('--date', '-d', type=trade_date, help="Trade date YYYY-MM-DD (default: today)")
+    parser.add_argument('--csv', help="For 'nav': also write the full daily series to this CSV file")
     
     args = parser.parse_args()
     
@@ -19,25 +26,30 @@ def main():
         if not args.symbol or not args.price or not args.shares:
             print("❌ Error: --symbol, --price, and --shares are required for 'add'.")
             return
-        manager.add_position(args.symbol, args.shares, args.price)
+        manager.add_position(args.symbol, args.shares, args.price, date=args.date)
+        manager.save_portfolio()
+        
+    elif args.action == 'sell':
+        if not args.symbol or not args.price or not args.shares:
+            print("❌ Error: --symbol, --price, and --shares are required for 'sell'.")
+            return
+        manager.sell_position(args.symbol, args.shares, args.price, date=args.date)
+        manager.save_portfolio()
         
     elif args.action == 'remove':
         if not args.symbol:
             print("❌ Error: --symbol is required for 'remove'.")
             return
-        manager.remove_position(args.symbol)
+        manager.remove_position(args.symbol, price=args.price)
+        manager.save_portfolio()
         
     elif args.action == 'list':
         # Load latest prices for context
-        try:
-            with open('data/technical_data.json', 'r') as f:
-                tech_data = json.load(f)
-                # Helper to flatten price dict
-                prices = {k: v.get('last_close', 0) for k, v in tech_data.items()}
-        except:
-            prices = {}
+        tech_data = load_data('data/technical_data.json')
+        # Helper to flatten price dict
+        prices = {k: v.get('last_close', 0) for k, v in tech_data.items()}
             
-        summary = manager.get_portfolio_summary(prices)
+        summary = manager.get_portfolio_summary(prices, load_data('data/pse_fundamentals.json'))
         
         print(f"\n{'='*60}")
         print(f" PORTFOLIO SUMMARY")
@@ -45,6 +57,8 @@ def main():
         print(f" Total Equity:   ₱{summary['total_equity']:,.2f}")
         print(f" Cost Basis:     ₱{summary['total_cost']:,.2f}")
         print(f" Gain/Loss:      ₱{summary['total_gain_loss']:,.2f} ({summary['total_gain_loss_pct']:.2f}%)")
+        print(f" Realized P/L:   ₱{summary['total_realized_pl']:,.2f}")
+        print(f" Dividends:      ₱{summary['total_dividends']:,.2f}")
         print(f"{'-'*60}")
         print(f" {'SYMBOL':<10} {'SHARES':<10} {'AVG PRICE':<12} {'CURRENT':<10} {'G/L %':<10}")
         print(f"{'-'*60}")
@@ -54,12 +68,71 @@ def main():
             print(f" {color} {p['symbol']:<8} {p['shares']:<10,.0f} ₱{p['avg_price']:<11.2f} ₱{p['current_price']:<9.2f} {p['gain_loss_pct']:>6.2f}%")
         print(f"{'='*60}\n")
         
+    elif args.action == 'lots':
+        ledger = manager.ledger
+        print(f"\n{'='*60}")
+        print(f" OPEN LOTS ({ledger.method.upper()})")
+        print(f"{'='*60}")
+        for symbol, pos in sorted(ledger.open_positions().items()):
+            if args.symbol and symbol != args.symbol.upper(): continue
+            for date, shares, price in pos['lots']:
+                print(f" {symbol:<8} {date}  {shares:>10,.0f} @ ₱{price:<10.4f}")
+        print(f"{'-'*60}")
+        print(" CLOSED LOTS")
+        print(f"{'-'*60}")
+        for lot in ledger.closed_lots():
+            if args.symbol and lot['symbol'] != args.symbol.upper(): continue
+            print(f" {lot['symbol']:<8} {lot['buy_date']} -> {lot['sell_date']} ({lot['days_held']:>4}d) "
+                  f"{lot['shares']:>9,.0f} ₱{lot['buy_price']:.2f} -> ₱{lot['sell_price']:.2f}  P/L ₱{lot['realized']:,.2f}")
+        print(f"{'='*60}\n")
+        
+    elif args.action == 'dividends':
+        events = manager.ledger.dividends(load_data('data/pse_fundamentals.json'))
+        print(f"\n{'='*60}")
+        print(" DIVIDENDS")
+        print(f"{'='*60}")
+        for e in events:
+            if args.symbol and e['symbol'] != args.symbol.upper(): continue
+            status = "paid" if e['received'] else "pending"
+            print(f" {e['symbol']:<8} ex {e['ex_date']}  pay {e['pay_date']}  {e['shares']:>9,.0f} x ₱{e['per_share']:.4f} = ₱{e['amount']:,.2f} ({status})")
+        print(f" Total received: ₱{sum(e['amount'] for e in events if e['received']):,.2f}")
+        print(f"{'='*60}\n")
+        
+    elif args.action == 'nav':
+        import valuation  # pandas: only this command needs it
+        frame = valuation.value_ledger(manager.ledger, load_data('data/technical_data.json'),
+                                       load_data('data/pse_fundamentals.json'))
+        stats = valuation.summarize(frame)
+        if not stats:
+            print("❌ No transactions with price history to value.")
+            return
+        print(f"\n{'='*60}")
+        print(f" PORTFOLIO NAV  {stats['start']} -> {stats['end']}")
+        print(f"{'='*60}")
+        print(f" NAV:            ₱{stats['nav']:,.2f}")
+        print(f" Invested:       ₱{stats['invested']:,.2f}")
+        print(f" P/L:            ₱{stats['pl']:,.2f}")
+        print(f" Return (TWR):   {stats['time_weighted_return_pct']:+.2f}%")
+        print(f" Drawdown:       {stats['drawdown_pct']:.2f}% (max {stats['max_drawdown_pct']:.2f}%, "
+              f"{stats['max_drawdown_peak']} -> {stats['max_drawdown_trough']})")
+        print(f"{'-'*60}")
+        print(f" {'MONTH END':<12} {'NAV':>14} {'P/L':>14} {'DRAWDOWN':>10}")
+        print(f"{'-'*60}")
+        month_end = frame.groupby(frame.index.str[:7]).tail(1)
+        for date, row in month_end.iterrows():
+            print(f" {date:<12} ₱{row['nav']:>13,.2f} ₱{row['pl']:>13,.2f} {row['drawdown'] * 100:>9.2f}%")
+        print(f"{'='*60}\n")
+        if args.csv:
+            frame.to_csv(args.csv)
+            print(f"✅ Daily series saved to {args.csv}")
+        
     elif args.action == 'update':
         # Interactive Mode
         symbol = input("Stock Symbol: ").upper()
         shares = float(input("Shares to Add: "))
         price = float(input("Buy Price: "))
         manager.add_position(symbol, shares, price)
+        manager.save_portfolio()
 
 if __name__ == "__main__":
     main()
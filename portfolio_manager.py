@@ -1,80 +1,245 @@
+# portfolio_manager.py
+# Portfolio store: data/portfolio.json snapshot + append-only transaction log (data/portfolio.wal)
+#
+# Each mutation appends one JSON line ({"op": "set"|"del", "symbol", "position"}) to
+# the log and publishes a new read-only snapshot (the mapping and each position in
+# it are MappingProxyType views), so readers never take the lock.
+# Log entries carry the resulting position rather than a delta, which makes replay
+# idempotent: a crash between rewriting portfolio.json and truncating the log is
+# harmless. portfolio.json is only ever replaced via an atomic rename.
+#
+# Every trade is also booked as a lot in the ledger (ledger.py); the position
+# entries here (shares, avg_price = open-lot cost basis) are the ledger's current
+# state, kept so readers don't need to open the ledger.
 import json
 import os
+import threading
 from datetime import datetime
+from types import MappingProxyType
+
+from ledger import Ledger
+
+WAL_SUFFIX = ".wal"
+COMPACT_EVERY = 100  # log entries before they are folded into portfolio.json
+
+# One lock per portfolio file, shared by every PortfolioManager in the process
+# (app.py and ReportGenerator each hold one for the same file)
+_LOCKS = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def _lock_for(path):
+    with _LOCKS_GUARD:
+        return _LOCKS.setdefault(os.path.abspath(path), threading.RLock())
+
+
+def _frozen(position):
+    return MappingProxyType(dict(position))
+
+
+def _freeze(data):
+    """Read-only view of {symbol: position}: the mapping and every position record."""
+    return MappingProxyType({symbol: _frozen(p) for symbol, p in data.items()})
+
 
 class PortfolioManager:
-    def __init__(self, data_file="data/portfolio.json"):
+    def __init__(self, data_file="data/portfolio.json", cost_method='fifo'):
         self.data_file = data_file
+        self.wal_file = os.path.splitext(data_file)[0] + WAL_SUFFIX
+        self._lock = _lock_for(data_file)
+        self._seen = None          # (snapshot mtime, log size) the current view was built from
+        self._wal_entries = 0
+        self.portfolio = MappingProxyType({})
         self.portfolio = self.load_portfolio()
 
-    def load_portfolio(self):
-        """Load portfolio data from JSON file."""
+        data_dir = os.path.dirname(data_file)
+        self.ledger = Ledger(os.path.join(data_dir, "ledger.jsonl"), os.path.join(data_dir, "ledger_index.json"),
+                             method=cost_method, lock=self._lock)
+        self._seed_ledger()
+
+    def _seed_ledger(self):
+        """First run with a ledger: book each existing position as one opening lot."""
+        with self._lock:
+            if self.ledger.count or not self.portfolio:
+                return
+            for symbol, p in self.portfolio.items():
+                date = (p.get('date_added') or p.get('last_updated') or datetime.now().strftime("%Y-%m-%d"))[:10]
+                self.ledger.buy(symbol, p['shares'], p['avg_price'], date=date, note="opening balance")
+            self.ledger.flush()
+
+    def _position_entry(self, symbol, now):
+        """Position entry for the portfolio view from the ledger's open lots."""
+        pos = self.ledger.position(symbol)
+        current = self.portfolio.get(symbol, {})
+        return {
+            'shares': pos['shares'],
+            'avg_price': pos['cost'] / pos['shares'],
+            'date_added': current.get('date_added', now),
+            'last_updated': now
+        }
+
+    def _disk_state(self):
+        snap = os.stat(self.data_file).st_mtime_ns if os.path.exists(self.data_file) else None
+        wal = os.path.getsize(self.wal_file) if os.path.exists(self.wal_file) else 0
+        return snap, wal
+
+    def _reload(self):
+        """Rebuild the view from portfolio.json + the log (caller holds the lock)."""
+        data = {}
         if os.path.exists(self.data_file):
             try:
                 with open(self.data_file, 'r') as f:
-                    return json.load(f)
+                    data = json.load(f)
             except:
-                return {}
-        return {}
+                data = {}
+
+        entries = 0
+        if os.path.exists(self.wal_file):
+            with open(self.wal_file, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash mid-append
+                    if entry.get('op') == 'set':
+                        data[entry['symbol']] = entry['position']
+                    elif entry.get('op') == 'del':
+                        data.pop(entry['symbol'], None)
+                    entries += 1
+
+        self._wal_entries = entries
+        self._seen = self._disk_state()
+        self.portfolio = _freeze(data)
+        return self.portfolio
+
+    def _refresh(self):
+        # Another manager/process may have written since our view was built
+        if self._disk_state() != self._seen:
+            self._reload()
+
+    def load_portfolio(self):
+        """Return the current portfolio as a read-only mapping (snapshot + replayed log)."""
+        with self._lock:
+            self._refresh()
+            return self.portfolio
+
+    def _append(self, entry):
+        """Durably append one log entry and publish the new view (caller holds the lock)."""
+        os.makedirs(os.path.dirname(self.wal_file) or ".", exist_ok=True)
+        with open(self.wal_file, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        data = dict(self.portfolio)  # positions are already frozen; only the changed one is copied
+        if entry['op'] == 'set':
+            data[entry['symbol']] = _frozen(entry['position'])
+        else:
+            data.pop(entry['symbol'], None)
+        self.portfolio = MappingProxyType(data)
+        self._wal_entries += 1
+        self._seen = self._disk_state()
+
+        if self._wal_entries >= COMPACT_EVERY:
+            self._compact()
+
+    def _compact(self):
+        """Write the view to portfolio.json via temp file + rename, then clear the log."""
+        os.makedirs(os.path.dirname(self.data_file) or ".", exist_ok=True)
+        tmp = self.data_file + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump({symbol: dict(p) for symbol, p in self.portfolio.items()}, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.data_file)
+        if os.path.exists(self.wal_file):
+            open(self.wal_file, 'w').close()
+        self._wal_entries = 0
+        self._seen = self._disk_state()
 
     def save_portfolio(self):
-        """Save portfolio data to JSON file."""
-        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-        with open(self.data_file, 'w') as f:
-            json.dump(self.portfolio, f, indent=4)
+        """Fold the transaction log into portfolio.json (atomic rename) and write the ledger index."""
+        with self._lock:
+            self._refresh()
+            self._compact()
+            self.ledger.flush()
 
-    def add_position(self, symbol, shares, avg_price):
-        """Add or update a stock position."""
+    def add_position(self, symbol, shares, avg_price, date=None):
+        """Buy a new lot (the position's avg_price is the cost basis of its open lots)."""
         symbol = symbol.upper()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        if symbol in self.portfolio:
-            # Weighted Average Price Calculation if adding to existing
-            current_shares = self.portfolio[symbol]['shares']
-            current_avg = self.portfolio[symbol]['avg_price']
-            
-            total_shares = current_shares + shares
-            new_avg = ((current_shares * current_avg) + (shares * avg_price)) / total_shares
-            
-            self.portfolio[symbol] = {
-                'shares': total_shares,
-                'avg_price': new_avg,
-                'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        else:
-            self.portfolio[symbol] = {
-                'shares': float(shares),
-                'avg_price': float(avg_price),
-                'date_added': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
+        with self._lock:
+            self._refresh()
+            self.ledger.buy(symbol, float(shares), float(avg_price), date=date)
+            position = self._position_entry(symbol, now)
+            self._append({'op': 'set', 'symbol': symbol, 'position': position, 'ts': now})
         
-        self.save_portfolio()
-        print(f"✅ Position for {symbol} updated. Total Shares: {self.portfolio[symbol]['shares']:.0f} @ ₱{self.portfolio[symbol]['avg_price']:.2f}")
+        print(f"✅ Position for {symbol} updated. Total Shares: {position['shares']:.0f} @ ₱{position['avg_price']:.2f}")
 
-    def remove_position(self, symbol):
-        """Remove a stock position."""
+    def sell_position(self, symbol, shares, price, date=None):
+        """Sell shares (lots closed per the cost method). Returns the realized P&L, or None."""
         symbol = symbol.upper()
-        if symbol in self.portfolio:
-            del self.portfolio[symbol]
-            self.save_portfolio()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        with self._lock:
+            self._refresh()
+            before = (self.ledger.position(symbol) or {}).get('realized', 0.0)
+            try:
+                self.ledger.sell(symbol, float(shares), float(price), date=date)
+            except ValueError as e:
+                print(f"⚠️ {e}")
+                return None
+            pos = self.ledger.position(symbol)
+            realized = pos['realized'] - before
+            if pos['shares'] > 0:
+                self._append({'op': 'set', 'symbol': symbol, 'position': self._position_entry(symbol, now), 'ts': now})
+            else:
+                self._append({'op': 'del', 'symbol': symbol, 'ts': now})
+        
+        print(f"💰 Sold {shares:,.0f} {symbol} @ ₱{price:.2f}. Realized P/L: ₱{realized:,.2f}")
+        return realized
+
+    def remove_position(self, symbol, price=None):
+        """Remove a stock position: a full sale at `price`, or dropped without P&L if no price."""
+        symbol = symbol.upper()
+        if price is not None:
+            held = self.portfolio.get(symbol, {}).get('shares', 0)
+            if held:
+                return self.sell_position(symbol, held, price)
+
+        with self._lock:
+            self._refresh()
+            found = symbol in self.portfolio
+            if found:
+                if (self.ledger.position(symbol) or {}).get('shares'):
+                    self.ledger.remove(symbol)
+                self._append({'op': 'del', 'symbol': symbol, 'ts': datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        
+        if found:
             print(f"🗑️ Removed {symbol} from portfolio.")
         else:
             print(f"⚠️ {symbol} not found in portfolio.")
 
-    def get_portfolio_summary(self, current_prices):
+    def get_portfolio_summary(self, current_prices, fund_data=None):
         """
         Calculate portfolio performance based on current market prices.
         current_prices: dict { 'SYMBOL': price, ... }
+        fund_data: pse_fundamentals records; if given, dividends received are included.
+        O(positions) via the ledger index, dividends included (Ledger.dividends_received).
         """
         summary = {
             'total_equity': 0.0,
             'total_cost': 0.0,
             'total_gain_loss': 0.0,
             'total_gain_loss_pct': 0.0,
+            'total_realized_pl': self.ledger.realized_total(),
+            'total_dividends': 0.0,
             'positions': []
         }
+        today = datetime.now().date()
         
-        for symbol, data in self.portfolio.items():
+        for symbol, data in self.portfolio.items():  # lock-free: the view and its positions are read-only
             shares = data['shares']
             avg_price = data['avg_price']
             current_price = current_prices.get(symbol, 0.0)
@@ -91,6 +256,9 @@ class PortfolioManager:
             summary['total_equity'] += market_value
             summary['total_cost'] += cost_basis
             
+            lots = (self.ledger.positions.get(symbol) or {})
+            first_buy = lots['lots'][0][0] if lots.get('lots') else None
+            
             summary['positions'].append({
                 'symbol': symbol,
                 'shares': shares,
@@ -98,11 +266,16 @@ class PortfolioManager:
                 'current_price': current_price,
                 'market_value': market_value,
                 'gain_loss': gain_loss,
-                'gain_loss_pct': gain_loss_pct
+                'gain_loss_pct': gain_loss_pct,
+                'realized_pl': lots.get('realized', 0.0),
+                'first_buy': first_buy,
+                'holding_days': (today - datetime.strptime(first_buy, "%Y-%m-%d").date()).days if first_buy else None
             })
             
         summary['total_gain_loss'] = summary['total_equity'] - summary['total_cost']
         if summary['total_cost'] > 0:
             summary['total_gain_loss_pct'] = (summary['total_gain_loss'] / summary['total_cost']) * 100.0
+        if fund_data:
+            summary['total_dividends'] = self.ledger.dividends_received(fund_data)
             
         return summary
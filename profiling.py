@@ -0,0 +1,212 @@
+# profiling.py
+# --profile support for the entry points: cProfile + stack sampler (+ optional tracemalloc)
+#
+# Writes to profiles/<name>-<timestamp>.*:
+#   .collapsed  sampled stacks, one "frame;frame;frame count" per line (flamegraph.pl / speedscope)
+#   .txt        top-N hotspot tables (sampled across all threads, and cProfile for the main thread)
+#   .prof       raw cProfile stats (snakeviz, pstats)
+#   .mem.txt    with --profile-memory: allocations inside Analyzer.analyze_trend and
+#               ReportGenerator.generate_dashboard
+import cProfile
+import datetime
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+PROFILE_DIR = "profiles"
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+MEMORY_TARGETS = [
+    ('analyzer', 'Analyzer', 'analyze_trend'),
+    ('report_generator', 'ReportGenerator', 'generate_dashboard'),
+]
+
+
+def add_profile_args(parser):
+    """Register --profile / --profile-memory / --profile-top on an argparse parser."""
+    parser.add_argument('--profile', action='store_true', help="Profile the run (writes to profiles/)")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="With --profile: trace allocations in analyze_trend and generate_dashboard "
+                             "(slow; profile timings without it)")
+    parser.add_argument('--profile-top', type=int, default=30, help="Rows in the hotspot tables (default 30)")
+
+
+def _frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class _StackSampler(threading.Thread):
+    """Samples every thread's Python stack at a fixed interval."""
+
+    def __init__(self, interval):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.is_set():
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(tid, str(tid)))
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class _MemoryTracer:
+    """Wraps the MEMORY_TARGETS methods to record net and peak traced memory per call."""
+
+    def __init__(self, top_n):
+        self.top_n = top_n
+        self.stats = {}       # label -> {'calls', 'net', 'peak'}
+        self.diffs = {}       # label -> snapshot diff of the call with the highest peak
+        self.originals = []
+        self.lock = threading.Lock()
+
+    def _wrap(self, label, func):
+        tracer = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            before_snap = tracemalloc.take_snapshot()
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                after, peak = tracemalloc.get_traced_memory()
+                with tracer.lock:
+                    s = tracer.stats.setdefault(label, {'calls': 0, 'net': 0, 'peak': 0})
+                    s['calls'] += 1
+                    s['net'] += after - before
+                    if peak - before >= s['peak']:
+                        s['peak'] = peak - before
+                        tracer.diffs[label] = tracemalloc.take_snapshot().compare_to(before_snap, 'lineno')
+        return wrapper
+
+    def start(self):
+        import importlib
+        tracemalloc.start(10)
+        for module_name, cls_name, method in MEMORY_TARGETS:
+            cls = getattr(importlib.import_module(module_name), cls_name)
+            original = getattr(cls, method)
+            self.originals.append((cls, method, original))
+            setattr(cls, method, self._wrap(f"{cls_name}.{method}", original))
+
+    def stop(self):
+        for cls, method, original in self.originals:
+            setattr(cls, method, original)
+        tracemalloc.stop()
+
+    def report(self):
+        out = io.StringIO()
+        out.write("Traced allocations (process-wide while each call runs; concurrent threads are included)\n\n")
+        for label, s in self.stats.items():
+            out.write(f"{label}: {s['calls']} calls, net {s['net'] / 1024:.1f} KiB, "
+                      f"max peak {s['peak'] / 1024:.1f} KiB\n")
+            for stat in self.diffs.get(label, [])[:self.top_n]:
+                out.write(f"    {stat}\n")
+            out.write("\n")
+        return out.getvalue()
+
+
+class Profiler:
+    """Context manager that profiles the enclosed block when enabled."""
+
+    def __init__(self, name, enabled=True, memory=False, top_n=30, interval=SAMPLE_INTERVAL):
+        self.name = name
+        self.enabled = enabled
+        self.memory = memory
+        self.top_n = top_n
+        self.interval = interval
+
+    @classmethod
+    def from_args(cls, name, args):
+        return cls(name, enabled=args.profile, memory=args.profile_memory, top_n=args.profile_top)
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        self.mem = _MemoryTracer(self.top_n) if self.memory else None
+        if self.mem:
+            self.mem.start()
+        self.sampler = _StackSampler(self.interval)
+        self.sampler.start()
+        self.cprofile = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.cprofile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.enabled:
+            return False
+        self.cprofile.disable()
+        elapsed = time.perf_counter() - self.started
+        self.sampler.stop()
+        if self.mem:
+            self.mem.stop()
+        self._write(elapsed)
+        return False
+
+    def _sampled_table(self):
+        self_counts, total_counts = {}, {}
+        for stack, count in self.sampler.stacks.items():
+            frames = stack.split(";")[1:]  # drop thread name
+            if not frames:
+                continue
+            self_counts[frames[-1]] = self_counts.get(frames[-1], 0) + count
+            for fr in set(frames):
+                total_counts[fr] = total_counts.get(fr, 0) + count
+
+        total = sum(self.sampler.stacks.values()) or 1
+        out = io.StringIO()
+        out.write(f"Sampled hotspots, all threads ({self.sampler.samples} ticks @ {self.interval * 1000:.0f}ms)\n")
+        out.write(f"{'SELF%':>7} {'TOTAL%':>7}  FUNCTION\n")
+        for fr, c in sorted(self_counts.items(), key=lambda kv: kv[1], reverse=True)[:self.top_n]:
+            out.write(f"{c / total * 100:>6.1f}% {total_counts[fr] / total * 100:>6.1f}%  {fr}\n")
+        return out.getvalue()
+
+    def _write(self, elapsed):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(PROFILE_DIR, f"{self.name}-{stamp}")
+
+        with open(base + ".collapsed", 'w') as f:
+            for stack, count in sorted(self.sampler.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+        self.cprofile.dump_stats(base + ".prof")
+        cp_out = io.StringIO()
+        pstats.Stats(self.cprofile, stream=cp_out).sort_stats('cumulative').print_stats(self.top_n)
+
+        with open(base + ".txt", 'w') as f:
+            f.write(f"Profile of {self.name}: {elapsed:.2f}s wall\n\n")
+            f.write(self._sampled_table())
+            f.write("\ncProfile, main thread, by cumulative time\n")
+            f.write(cp_out.getvalue())
+
+        if self.mem:
+            with open(base + ".mem.txt", 'w') as f:
+                f.write(self.mem.report())
+
+        print(f"\n[profile] {elapsed:.2f}s wall. Wrote {base}.txt / .collapsed / .prof"
+              + (" / .mem.txt" if self.mem else ""))
+        print(self._sampled_table())
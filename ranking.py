@@ -0,0 +1,90 @@
+# ranking.py
+# Top-k selection over the scored universe: bounded heaps instead of full sorts
+#
+# rank() walks the universe once. Every ranking key is computed once per symbol
+# and offered to a k-sized heap for the whole universe and one per category the
+# symbol belongs to (categories are inverted into {symbol: [category, ...]} up
+# front, so membership is a dict lookup, not a scan of each category's list).
+# Cost is O(N log k) per key; results match a stable descending sort cut to k
+# (ties keep the input order), so callers can swap it in for sort()[:k].
+import heapq
+
+
+class TopK:
+    """The k largest items by key(item), ties in arrival order (like sorted(..., reverse=True)[:k])."""
+
+    def __init__(self, k, key):
+        self.k = k
+        self.key = key
+        self.heap = []   # min-heap of (key, -arrival, item): the root is the weakest kept item
+        self.count = 0
+
+    def push(self, item, value=None):
+        """Offer an item (value: its precomputed key, if already known)."""
+        if self.k <= 0:
+            return
+        entry = (self.key(item) if value is None else value, -self.count, item)
+        self.count += 1
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, entry)
+
+    def items(self):
+        """Kept items, best first."""
+        return [item for _, _, item in sorted(self.heap, key=lambda e: e[:2], reverse=True)]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+def top_k(items, k, key):
+    """The k largest of `items` by `key`, best first (stable for ties)."""
+    top = TopK(k, key)
+    for item in items:
+        top.push(item)
+    return top.items()
+
+
+def category_index(categories):
+    """{category: [symbols]} -> {symbol: [categories]} (each category once per symbol)."""
+    index = {}
+    for category, symbols in categories.items():
+        for symbol in dict.fromkeys(symbols):
+            index.setdefault(symbol, []).append(category)
+    return index
+
+
+def rank(rows, keys, k=20, categories=None, k_per_category=1):
+    """
+    One pass over `rows` ({symbol: row}) for every ranking key.
+
+    keys: {name: key(symbol, row) -> comparable, or None to leave the row out of that ranking}
+    categories: {category: [symbols]} for per-category rankings (optional)
+    Returns {'top': {name: [(symbol, row), ...]},
+             'by_category': {category: {name: [(symbol, row), ...]}}}, best first.
+    """
+    index = category_index(categories) if categories else {}
+    top = {name: TopK(k, None) for name in keys}
+    per_category = {}
+
+    for symbol, row in rows.items():
+        cats = index.get(symbol, ())
+        if k <= 0 and not cats:
+            continue  # no ranking would keep it
+        for name, key in keys.items():
+            value = key(symbol, row)
+            if value is None:
+                continue
+            top[name].push((symbol, row), value)
+            for cat in cats:
+                heaps = per_category.get(cat)
+                if heaps is None:
+                    heaps = per_category[cat] = {n: TopK(k_per_category, None) for n in keys}
+                heaps[name].push((symbol, row), value)
+
+    return {
+        'top': {name: heap.items() for name, heap in top.items()},
+        'by_category': {cat: {name: heap.items() for name, heap in heaps.items()}
+                        for cat, heaps in per_category.items()},
+    }
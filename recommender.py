@@ -2,73 +2,81 @@
 # Suggests the best stock to buy each day with expert financial analysis
 from typing import List, Dict
 
+from ranking import rank
+
 class Recommender:
     def recommend_by_category(self, analysis_results: Dict[str, dict], categories: Dict[str, list]) -> Dict[str, dict]:
         """
         Recommend the best stock for each category based on Technicals & Risk/Reward.
+        One pass over the universe (ranking.rank): each stock is scored once and kept
+        only if it beats its categories' current best.
+        """
+        ranked = rank(analysis_results, {'pick': self.pick}, k=0, categories=categories, k_per_category=1)
+        return self.from_ranking(ranked, categories)
+
+    def pick(self, symbol: str, stats: dict):
+        """rank() key for the category picks: pick_score, or None if the stock can't be picked."""
+        if not stats or not stats.get('last_close'):
+            return None
+        score = self.pick_score(stats)
+        return score if score > -9999 else None  # also drops NaN scores
+
+    def from_ranking(self, ranked: dict, categories: Dict[str, list], key: str = 'pick') -> Dict[str, dict]:
+        """
+        Expert advice for each category's best stock under `key` in a rank() result
+        (rows being technical stats), so callers ranking other keys share the pass.
         """
         recommendations = {}
-        
-        for category, symbols in categories.items():
-            # Filter results for this category
-            cat_results = {k: v for k, v in analysis_results.items() if k in symbols and v and v.get('last_close')}
-            
-            if not cat_results:
-                continue
-            
-            best_symbol = None
-            best_score = -9999
-            best_analysis = None
-            
-            for symbol, stats in cat_results.items():
-                score = 0
-                
-                # 1. Trend Analysis
-                trend = stats.get('trend', 'Neutral')
-                if trend == "Strong Uptrend": score += 20
-                elif trend == "Uptrend": score += 10
-                elif trend == "Downtrend": score -= 10
-                elif trend == "Strong Downtrend": score -= 20
-                
-                # 2. RSI Analysis
-                rsi = stats.get('rsi', 50)
-                if 40 <= rsi <= 60: score += 5 # Sweet spot for steady growth
-                elif rsi < 30: score += 10 # Oversold bounce play
-                elif rsi > 70: score -= 5 # potential pullback
-                
-                # 3. Volatility (Stability)
-                vol = stats.get('std_close', 0)
-                if vol > 0:
-                    # Prefer lower volatility relative to price (coefficient of variation technically, but simple vol check here)
-                    # We negate vol because higher vol = lower score for "safety"
-                    score -= (vol / stats['last_close']) * 100 
-                
-                # 4. Risk / Reward Upside
-                # Distance to Resistance
-                last_price = stats['last_close']
-                resistance = stats.get('resistance', last_price * 1.1)
-                support = stats.get('support', last_price * 0.9)
-                
-                if resistance <= last_price: resistance = last_price * 1.1 # Logical fix if breaking ATH
-                
-                upside = (resistance - last_price) / last_price
-                downside = (last_price - support) / last_price
-                
-                if downside == 0: downside = 0.01
-                rr_ratio = upside / downside
-                
-                score += rr_ratio * 5 # Factor in R/R
-                
-                if score > best_score:
-                    best_score = score
-                    best_symbol = symbol
-                    best_analysis = stats
-            
-            if best_symbol and best_analysis:
+        for category in categories:
+            best = ranked['by_category'].get(category, {}).get(key)
+            if best:
+                best_symbol, best_analysis = best[0]
                 recommendations[category] = self._generate_expert_advice(best_symbol, best_analysis)
             
         return recommendations
 
+    @staticmethod
+    def pick_score(stats: dict) -> float:
+        """Category pick score: trend, RSI zone, volatility and risk/reward to resistance."""
+        score = 0
+        
+        # 1. Trend Analysis
+        trend = stats.get('trend', 'Neutral')
+        if trend == "Strong Uptrend": score += 20
+        elif trend == "Uptrend": score += 10
+        elif trend == "Downtrend": score -= 10
+        elif trend == "Strong Downtrend": score -= 20
+        
+        # 2. RSI Analysis
+        rsi = stats.get('rsi', 50)
+        if 40 <= rsi <= 60: score += 5 # Sweet spot for steady growth
+        elif rsi < 30: score += 10 # Oversold bounce play
+        elif rsi > 70: score -= 5 # potential pullback
+        
+        # 3. Volatility (Stability)
+        vol = stats.get('std_close', 0)
+        if vol > 0:
+            # Prefer lower volatility relative to price (coefficient of variation technically, but simple vol check here)
+            # We negate vol because higher vol = lower score for "safety"
+            score -= (vol / stats['last_close']) * 100 
+        
+        # 4. Risk / Reward Upside
+        # Distance to Resistance
+        last_price = stats['last_close']
+        resistance = stats.get('resistance', last_price * 1.1)
+        support = stats.get('support', last_price * 0.9)
+        
+        if resistance <= last_price: resistance = last_price * 1.1 # Logical fix if breaking ATH
+        
+        upside = (resistance - last_price) / last_price
+        downside = (last_price - support) / last_price
+        
+        if downside == 0: downside = 0.01
+        rr_ratio = upside / downside
+        
+        score += rr_ratio * 5 # Factor in R/R
+        return score
+
     def _generate_expert_advice(self, symbol: str, stats: dict) -> dict:
         """Generate detailed expert advice for the selected stock."""
         last_price = stats['last_close']
@@ -1,10 +1,21 @@
-from report_generator import ReportGenerator
+from tracing import TRACER
+from profiling import Profiler, add_profile_args
+import argparse
 import os
 
+parser = argparse.ArgumentParser(description="Rebuild report.html from the saved data files")
+parser.add_argument('--inline', action='store_true',
+                    help="Embed the CSS/JS in report.html instead of linking assets/ (single self-contained file)")
+add_profile_args(parser)
+args = parser.parse_args()
+
 print("Generating Dashboard...")
+from report_generator import ReportGenerator  # after argparse, so --help stays instant
 gen = ReportGenerator()
-output = gen.generate_dashboard()
+with Profiler.from_args('regenerate_report', args):
+    output = gen.generate_dashboard(inline_assets=args.inline)
 print(f"Done: {output}")
+TRACER.finish('regenerate_report')
 
 # Open it
 gen.open_in_browser(output)
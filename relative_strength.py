@@ -0,0 +1,173 @@
+# relative_strength.py
+# Cross-sectional relative strength and sector rotation, for every symbol on every day of the price panel
+#
+# data/relative_strength.json (stored through datastore) holds series aligned with `dates`:
+#   symbols   {symbol: {'sector',
+#                       'ret_<lb>'          trailing return over the lookback, basis points
+#                       'rank_<lb>'         percentile of that return in the universe (1-100)
+#                       'sector_rank_<lb>'  percentile within the symbol's sector
+#                       'rs' / 'rs_sector'  composite: percentile of the mean lookback rank,
+#                                           in the universe / within the sector}}
+#   sectors   {sector: {'ret_<lb>' median member return (bp), 'rank_<lb>' percentile among
+#                       sectors, 'rs' composite sector percentile}}
+# None where a symbol has too little history; symbols without a sector in the metadata
+# have no sector_rank/rs_sector and no sector entry, and 'rank'/'rs' among sectors is
+# None on days with fewer than two sectors to compare. Everything is computed in one pass of
+# DataFrame rank/groupby operations over valuation.price_panel; each day only uses
+# closes up to that day, so the backtester can read ranks point-in-time with at().
+import bisect
+
+from datastore import data_mtime, load_data, save_data
+from stock_data import get_universe
+
+RELATIVE_STRENGTH_FILE = "data/relative_strength.json"
+TECHNICAL_DATA_FILE = "data/technical_data.json"
+METADATA_FILE = "data/stock_metadata.json"
+LOOKBACKS = {'1m': 21, '3m': 63, '6m': 126}  # trading days
+UNCATEGORIZED = 'Uncategorized'  # no sector in the metadata: ranked in the universe only
+
+
+def _series(frame, scale=1.0):
+    """{column: [int or None per row]} from a float DataFrame."""
+    import numpy as np
+    values = frame.to_numpy(dtype=float) * scale
+    missing = np.isnan(values)
+    grid = np.rint(np.where(missing, 0, values)).astype(np.int64).astype(object)
+    grid[missing] = None
+    return {col: grid[:, j].tolist() for j, col in enumerate(frame.columns)}
+
+
+def compute(histories, sector_of, lookbacks=LOOKBACKS):
+    """
+    Table for {symbol: technical_data history} with sectors from {symbol: sector}.
+    Symbols without one get universe ranks only: 'Uncategorized' is not a sector, so
+    it gets no in-sector ranks and takes no part in sector rotation.
+    """
+    import pandas as pd
+    from valuation import price_panel
+
+    symbols = sorted(s for s, h in histories.items() if h)
+    if not symbols:
+        return {'dates': [], 'lookbacks': dict(lookbacks), 'symbols': {}, 'sectors': {}}
+    closes = price_panel(histories, symbols)
+    sectors = pd.Series({s: sector_of.get(s, UNCATEGORIZED) for s in symbols})
+    real = sectors[sectors != UNCATEGORIZED]
+
+    def sector_rank(frame):
+        # percentile within each sector, per day (sectors are the columns' groups)
+        return frame[real.index].T.groupby(real).rank(pct=True).T * 100
+
+    def across_sectors(frame):
+        # percentile among sectors, per day; none on days with fewer than two sectors to compare
+        return (frame.rank(axis=1, pct=True) * 100).where(frame.notna().sum(axis=1) >= 2, axis=0)
+
+    out = {s: {'sector': sectors[s]} for s in symbols}
+    groups = {}
+    ranks, group_ranks = [], []
+    for name, days in lookbacks.items():
+        ret = closes / closes.shift(days) - 1
+        rank = ret.rank(axis=1, pct=True) * 100
+        group_ret = ret[real.index].T.groupby(real).median().T
+        group_rank = across_sectors(group_ret)
+        ranks.append(rank)
+        group_ranks.append(group_rank)
+        for col, field in ((ret, f'ret_{name}'), (rank, f'rank_{name}'), (sector_rank(ret), f'sector_rank_{name}')):
+            for symbol, values in _series(col, 10000 if col is ret else 1).items():
+                out[symbol][field] = values
+        for col, field in ((group_ret, f'ret_{name}'), (group_rank, f'rank_{name}')):
+            for sector, values in _series(col, 10000 if col is group_ret else 1).items():
+                groups.setdefault(sector, {})[field] = values
+
+    # Composite: the mean of a name's lookback percentiles, ranked again
+    composite = sum(r.fillna(0) for r in ranks) / sum(r.notna().astype(float) for r in ranks)
+    for field, frame in (('rs', composite.rank(axis=1, pct=True) * 100), ('rs_sector', sector_rank(composite))):
+        for symbol, values in _series(frame).items():
+            out[symbol][field] = values
+    group_composite = sum(r.fillna(0) for r in group_ranks) / sum(r.notna().astype(float) for r in group_ranks)
+    for sector, values in _series(across_sectors(group_composite)).items():
+        groups[sector]['rs'] = values
+
+    return {'dates': list(closes.index), 'lookbacks': dict(lookbacks), 'symbols': out, 'sectors': groups}
+
+
+def build_table(tech_data, universe=None):
+    """Table for every technical_data history, sectors from stock_metadata.json."""
+    if universe is None:
+        universe = get_universe(METADATA_FILE)
+    histories = {s: t.get('history') for s, t in tech_data.items() if isinstance(t, dict)}
+    return compute(histories, universe.sector_of)
+
+
+def at(table, symbol, as_of=None):
+    """
+    Flat snapshot of one symbol on the last day <= as_of (default: the newest day):
+    rs, rs_sector, rank_<lb>, sector_rank_<lb>, ret_<lb> (percent), sector,
+    sector_rs (its sector's composite). {} if unknown or not rankable that day.
+    """
+    record = (table or {}).get('symbols', {}).get(symbol)
+    dates = table.get('dates') if record else None
+    if not dates:
+        return {}
+    i = len(dates) - 1 if as_of is None else bisect.bisect_right(dates, str(as_of)[:10]) - 1
+    if i < 0:
+        return {}
+    snap = {}
+    for field, values in record.items():
+        if field == 'sector' or values[i] is None:
+            continue
+        snap[field] = values[i] / 100.0 if field.startswith('ret_') else values[i]
+    if not snap:
+        return {}
+    snap['sector'] = record['sector']
+    sector_rs = table.get('sectors', {}).get(record['sector'], {}).get('rs')
+    if sector_rs and sector_rs[i] is not None:
+        snap['sector_rs'] = sector_rs[i]
+    return snap
+
+
+def latest(table):
+    """{symbol: snapshot} on the newest day of the table."""
+    return {symbol: at(table, symbol) for symbol in (table or {}).get('symbols', {})}
+
+
+def rotation(table, as_of=None):
+    """Sectors by composite momentum on a day, strongest first: [(sector, rs, {'ret_<lb>': percent})]."""
+    dates = (table or {}).get('dates')
+    if not dates:
+        return []
+    i = len(dates) - 1 if as_of is None else bisect.bisect_right(dates, str(as_of)[:10]) - 1
+    rows = []
+    for sector, series in table.get('sectors', {}).items():
+        if i >= 0 and series.get('rs') and series['rs'][i] is not None:
+            rets = {k: v[i] / 100.0 for k, v in series.items() if k.startswith('ret_') and v[i] is not None}
+            rows.append((sector, series['rs'][i], rets))
+    return sorted(rows, key=lambda r: -r[1])
+
+
+def _source_stamp():
+    return [data_mtime(TECHNICAL_DATA_FILE), data_mtime(METADATA_FILE)]
+
+
+def save_table(table):
+    """Persist the table, stamped with the technical data and metadata files it was built from."""
+    save_data(RELATIVE_STRENGTH_FILE, dict(table, source=_source_stamp()))
+
+
+def load_table():
+    """The persisted table, or None if missing or built from other inputs."""
+    stored = load_data(RELATIVE_STRENGTH_FILE)
+    if not stored or stored.get('source') != _source_stamp():
+        return None
+    return stored
+
+
+def ensure_table(tech_data=None):
+    """Current table, rebuilding (and saving) it if the technical data or sectors changed."""
+    table = load_table()
+    if table is not None:
+        return table
+    if tech_data is None:
+        tech_data = load_data(TECHNICAL_DATA_FILE)
+    table = build_table(tech_data)
+    save_table(table)
+    return table
@@ -0,0 +1,146 @@
+# scores.py
+# Shared 'Top Pick' score table, computed once per pipeline run
+import datetime
+import hashlib
+import json
+import os
+
+import dividends
+import relative_strength
+from datastore import data_mtime, load_data
+from tracing import span
+
+TECHNICAL_DATA_FILE = "data/technical_data.json"
+FUNDAMENTAL_DATA_FILE = "data/pse_fundamentals.json"
+SCORES_FILE = "data/scores.json"
+DIVIDENDS_FILE = dividends.DIVIDENDS_FILE
+RELATIVE_STRENGTH_FILE = relative_strength.RELATIVE_STRENGTH_FILE
+
+# Fields calculate_score actually reads (used for the per-symbol inputs hash)
+TECH_SCORE_KEYS = ['trend', 'last_close', 'support', 'rsi', 'ema_50', 'golden_cross',
+                   'volume_spike', 'macd', 'macd_signal', 'win_rate', 'rs', 'sector_rs', 'sector']
+FUND_SCORE_KEYS = ['pe_ratio', 'div_freq']
+
+
+def load_json(filepath):
+    if os.path.exists(filepath):
+        try:
+            with open(filepath, 'r') as f:
+                return json.load(f)
+        except:
+            return {}
+    return {}
+
+
+def fundamentals_view(of, last_close, now=None, div=None):
+    """
+    Build the fundamentals dict used for scoring and display from a raw
+    pse_fundamentals.json record: copies the official fields and adds TTM
+    dividend amount, frequency, schedule and yield from the symbol's
+    dividends.py table record `div` (parsed from div_history if not given).
+    """
+    f = {}
+    if not of:
+        return f
+
+    for key in ['pe_ratio', 'eps', 'status', 'market_cap', 'outstanding_shares', 'high_52', 'low_52', 'div_history']:
+        if of.get(key): f[key] = of[key]
+
+    if div is None:
+        if not of.get('div_history'):
+            return f
+        div = dividends.summarize(of['div_history'], now)
+    f.update(dividends.stats(div, now, last_close))
+    return f
+
+
+def _plain(obj):
+    # numpy scalars -> python (np.bool_ must hash like a JSON-loaded bool)
+    if hasattr(obj, 'item'):
+        return obj.item()
+    return str(obj)
+
+
+def inputs_hash(t, f):
+    """Stable hash of the inputs calculate_score reads for one symbol."""
+    payload = {
+        't': {k: t.get(k) for k in TECH_SCORE_KEYS},
+        'f': {k: f.get(k) for k in FUND_SCORE_KEYS},
+    }
+    raw = json.dumps(payload, sort_keys=True, default=_plain)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _source_stamp():
+    """mtime of each input file, so readers can tell whether the table is current."""
+    return {path: data_mtime(path) for path in [TECHNICAL_DATA_FILE, FUNDAMENTAL_DATA_FILE, DIVIDENDS_FILE,
+                                                 RELATIVE_STRENGTH_FILE]}
+
+
+def build_score_table(tech_data, fund_data, analyzer=None, div_table=None, strength=None):
+    """
+    Score every symbol with technical data. Returns {symbol: entry}.
+    div_table: dividends.py table ({symbol: record}); the persisted one if not given.
+    strength: {symbol: relative_strength.at() snapshot}; the persisted table's latest day if not given.
+    """
+    if analyzer is None:
+        from analyzer import Analyzer  # pandas: only when something needs scoring
+        analyzer = Analyzer()
+    now = datetime.datetime.now()
+    if div_table is None:
+        div_table = dividends.ensure_table(fund_data)
+    if strength is None:
+        strength = relative_strength.latest(relative_strength.ensure_table(tech_data))
+    table = {}
+
+    for symbol, t in tech_data.items():
+        if not t: continue
+        if strength.get(symbol):
+            t = dict(t, **strength[symbol])
+        of = fund_data.get(symbol, {})
+        with span('score'):
+            f = fundamentals_view(of, t.get('last_close'), now, div_table.get(symbol))
+            score, reasons = analyzer.calculate_score(t, f)
+
+        table[symbol] = {
+            'score': int(score),
+            'reasons': reasons,
+            'inputs_hash': inputs_hash(t, f),
+            'last_close': float(t.get('last_close') or 0),
+            'status': of.get('status', 'Active'),
+        }
+    return table
+
+
+def save_score_table(table):
+    with open(SCORES_FILE, 'w') as f:
+        json.dump({'sources': _source_stamp(), 'scores': table}, f)
+
+
+def load_score_table():
+    """Return the persisted score table, or None if missing or older than its inputs."""
+    stored = load_json(SCORES_FILE)
+    if not stored or stored.get('sources') != _source_stamp():
+        return None
+    return stored.get('scores')
+
+
+def ensure_score_table(tech_data=None, fund_data=None):
+    """
+    Return a current score table, rebuilding (and persisting) it only when
+    technical_data.json, pse_fundamentals.json, dividends.json or relative_strength.json
+    changed since it was written.
+    Data already in memory can be passed in to avoid re-reading the files.
+    """
+    table = load_score_table()
+    if table is not None:
+        return table
+
+    if tech_data is None:
+        tech_data = load_data(TECHNICAL_DATA_FILE)
+    if fund_data is None:
+        fund_data = load_data(FUNDAMENTAL_DATA_FILE)
+
+    table = build_score_table(tech_data, fund_data)
+    save_score_table(table)
+    return table
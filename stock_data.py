@@ -1,12 +1,17 @@
 # stock_data.py
 # Dynamic Stock Configuration v2.0
 # Loads categories and symbols strictly from data/stock_metadata.json
-
+#
+# The file is parsed on first use (not at import) and cached by mtime, so
+# importing this module is free and a re-scraped metadata file is picked up
+# by long-running processes (app.py) on the next call.
 import json
 import os
+import threading
 
 METADATA_FILE = "data/stock_metadata.json"
 STOCK_IDS_FILE = "data/stock_ids.json"
+LAST_SECTOR = "SME Board"  # listed after the alphabetical sectors
 
 def load_json(filename):
     try:
@@ -19,33 +24,72 @@ def load_json(filename):
         print(f"[Warning] Could not load {filename}: {e}")
     return {}
 
-def _build_categories():
-    """Dynamically build STOCK_CATEGORIES from metadata."""
-    meta = load_json(METADATA_FILE)
-    if not meta:
-        # Fallback to simple list from stock_ids if metadata missing
-        ids = load_json(STOCK_IDS_FILE)
-        return {"All Stocks": list(ids.keys())} if ids else {}
-
-    categories = {}
-    for symbol, data in meta.items():
-        sec = data.get('sector', 'Uncategorized')
-        # Normalize
-        sec = sec.replace(' & ', ' and ')
-        sec = sec.replace('Small, Medium and Emerging Board', 'SME Board')
-        
-        if sec not in categories:
-            categories[sec] = []
-        categories[sec].append(symbol)
-        
-    return categories
-
-# Dynamic Constants
-STOCK_CATEGORIES = _build_categories()
+def normalize_sector(sector):
+    """PSE sector name as the dashboard groups it (Mining & Oil -> Mining and Oil)."""
+    sector = (sector or 'Uncategorized').replace(' & ', ' and ')
+    return sector.replace('Small, Medium and Emerging Board', 'SME Board')
+
+
+class Universe:
+    """
+    The listed universe from stock_metadata.json:
+      metadata    {symbol: metadata record}
+      sector_of   {symbol: normalized sector}
+      categories  {sector: [symbols]} (file order within a sector)
+      sectors     sorted sector names, SME Board last
+    """
+
+    def __init__(self, metadata, fallback_symbols=()):
+        self.metadata = metadata
+        self.sector_of = {symbol: normalize_sector(m.get('sector')) for symbol, m in metadata.items()}
+        self.categories = {}
+        for symbol, sector in self.sector_of.items():
+            self.categories.setdefault(sector, []).append(symbol)
+        if not metadata and fallback_symbols:
+            # Fallback to simple list from stock_ids if metadata missing
+            self.categories = {"All Stocks": list(fallback_symbols)}
+        self.sectors = sorted(self.categories, key=lambda s: (s == LAST_SECTOR, s))
+        self.symbols = sorted({s for members in self.categories.values() for s in members})
+
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def get_universe(path=None):
+    """
+    Universe for a metadata file (default: data/stock_metadata.json next to this module).
+    Parsed once per file mtime; callers share the returned object, so treat it as read-only.
+    """
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), METADATA_FILE)
+    path = os.path.abspath(path)
+    ids_path = os.path.join(os.path.dirname(os.path.dirname(path)), STOCK_IDS_FILE)
+    stamp = (_mtime(path), _mtime(ids_path))
+    with _lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        meta = load_json(path)
+        universe = Universe(meta, () if meta else load_json(ids_path).keys())
+        _cache[path] = (stamp, universe)
+        return universe
+
+
+def __getattr__(name):
+    # STOCK_CATEGORIES stays importable, but is only built when first used
+    if name == 'STOCK_CATEGORIES':
+        return get_universe().categories
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def get_all_symbols():
     """Return a flat list of all unique symbols from the loaded categories."""
-    symbols = []
-    for cat_stocks in STOCK_CATEGORIES.values():
-        symbols.extend(cat_stocks)
-    return sorted(list(set(symbols)))
+    return list(get_universe().symbols)
@@ -2,64 +2,50 @@ import json
 import argparse
 from datetime import datetime
 from portfolio_manager import PortfolioManager
+from scores import TECHNICAL_DATA_FILE, ensure_score_table
+from datastore import load_data
+from board_lots import allocate
+import optimizer
 
-def suggest_portfolio(investment_amount=10000, max_stocks=10, simulate=False):
+def suggest_portfolio(investment_amount=10000, max_stocks=10, simulate=False, method='equal',
+                      max_weight=0.25, sector_cap=0.4, max_drift=0.05):
     """
     Suggests a portfolio based on 'Top Pick' scores.
+    method='equal' takes the top scores (max 2 per sector) at equal weight; the optimizer
+    methods (optimizer.METHODS) weight every qualifying stock from its return history,
+    with at most max_weight per stock and sector_cap per sector. Orders are whole PSE
+    board lots, each stock within max_drift of its target weight (board_lots.allocate).
     If simulate=True, adds them to the persistent portfolio.json with 'investment_amount' allocated.
     """
     
-    # 1. Load Data
+    # 1. Load Data (scores come precomputed from the pipeline's score table)
     try:
-        with open('data/technical_data.json', 'r') as f:
-            tech_data = json.load(f)
         with open('data/stock_metadata.json', 'r') as f:
             meta_data = json.load(f)
-        with open('data/pse_fundamentals.json', 'r') as f:
-            fund_data = json.load(f)
     except Exception as e:
         print(f"❌ Error loading data: {e}")
         return
 
-    print(f"\n🔍 Analyzing {len(tech_data)} stocks for Top Picks...")
+    score_table = ensure_score_table()
+    if not score_table:
+        print("❌ Error loading data: no technical data to score.")
+        return
 
-    # 2. Filter & Score
-    candidates = []
-    
-    for symbol, data in tech_data.items():
-        # Basic Filter: Score >= 7 (High Confidence)
-        # Also check liquidity > 1M avg value? (approx)
-        
-        # Recalculate Score if needed, or use what's in tech/report? 
-        # Actually analyzer.py calculates it on the fly usually, 
-        # but report_generator logic put it in the HTML, not the JSON?
-        # Wait, technical_data.json does NOT have the score. 
-        # We need to Calculate it.
-        
-        # We need to import Analyzer logic or simpler:
-        # Re-use the Analyzer class is best.
-        pass
+    print(f"\n🔍 Analyzing {len(score_table)} stocks for Top Picks...")
 
-    # Quick Analyzer instantiation
-    from analyzer import Analyzer
-    analyzer = Analyzer()
+    # 2. Filter by Score
+    candidates = []
     
-    for symbol, t_data in tech_data.items():
-        if not t_data: continue
-        
-        f_data = fund_data.get(symbol, {})
-        
+    for symbol, entry in score_table.items():
         # Filter: Must not be suspended
-        if f_data.get('status') == 'Suspended': continue
-        
-        score, reasons = analyzer.calculate_score(t_data, f_data)
+        if entry.get('status') == 'Suspended': continue
         
-        if score >= 6: # Threshold
+        if entry['score'] >= 6: # Threshold
              candidates.append({
                  'symbol': symbol,
-                 'score': score,
-                 'price': t_data['last_close'],
-                 'reasons': reasons,
+                 'score': entry['score'],
+                 'price': entry['last_close'],
+                 'reasons': entry['reasons'],
                  'sector': meta_data.get(symbol, {}).get('sector', 'Unknown')
              })
 
@@ -68,18 +54,39 @@ def suggest_portfolio(investment_amount=10000, max_stocks=10, simulate=False):
     # Let's sort by Score Desc
     candidates.sort(key=lambda x: x['score'], reverse=True)
     
-    # 4. Diversification (Max 2 per sector)
-    final_picks = []
-    sector_counts = {}
-    
-    for c in candidates:
-        if len(final_picks) >= max_stocks: break
-        
-        sec = c['sector']
-        if sector_counts.get(sec, 0) >= 2: continue # Skip if sector full
+    candidates = [c for c in candidates if c['price'] > 0]
+    if method == 'equal':
+        # 4. Diversification (Max 2 per sector)
+        final_picks = []
+        sector_counts = {}
         
-        final_picks.append(c)
-        sector_counts[sec] = sector_counts.get(sec, 0) + 1
+        for c in candidates:
+            if len(final_picks) >= max_stocks: break
+            
+            sec = c['sector']
+            if sector_counts.get(sec, 0) >= 2: continue # Skip if sector full
+            
+            final_picks.append(c)
+            sector_counts[sec] = sector_counts.get(sec, 0) + 1
+            c['weight'] = None
+    else:
+        # 4. Optimizer: weights for every candidate from a year of returns (sector caps replace the count cap)
+        if not candidates:
+            final_picks = []
+        else:
+            print(f"📐 Optimizing {len(candidates)} candidates ({method}, max {max_weight:.0%}/stock, {sector_cap:.0%}/sector)...")
+            result = optimizer.optimize(method, load_data(TECHNICAL_DATA_FILE), [c['symbol'] for c in candidates],
+                                        [c['sector'] for c in candidates], max_weight, sector_cap, max_assets=max_stocks)
+            weights = result['weights'] if result else {}
+            final_picks = [c for c in candidates if c['symbol'] in weights]
+            for c in final_picks:
+                c['weight'] = weights[c['symbol']]
+            final_picks.sort(key=lambda c: c['weight'], reverse=True)
+            if result:
+                print(f"   Expected return {result['expected_return']:.1%}, volatility {result['volatility']:.1%}, "
+                      f"Sharpe {result['sharpe']:.2f} (covariance shrinkage {result['shrinkage']:.2f})")
+                if result['dropped']:
+                    print(f"   Skipped (under {optimizer.MIN_OBS} days of history): {', '.join(result['dropped'])}")
         
     if not final_picks:
         print("⚠️ No suitable stocks found with score >= 6.")
@@ -87,36 +94,40 @@ def suggest_portfolio(investment_amount=10000, max_stocks=10, simulate=False):
 
     print(f"✅ Found {len(final_picks)} Top Picks for Portfolio:\n")
     
-    # 5. Allocation (Equal Weight)
-    allocation_per_stock = investment_amount / len(final_picks)
+    # 5. Allocation: target weights (equal, or the optimizer's) as whole board lots
+    targets = {p['symbol']: p['weight'] if p['weight'] is not None else 1.0 / len(final_picks) for p in final_picks}
+    allocation = allocate(investment_amount, {p['symbol']: p['price'] for p in final_picks}, targets, max_drift)
     
     manager = PortfolioManager() if simulate else None
     
-    print(f"{'SYMBOL':<8} {'SCORE':<6} {'PRICE':<10} {'SHARES':<10} {'COST':<10} {'SECTOR'}")
-    print("-" * 70)
+    print(f"{'SYMBOL':<8} {'SCORE':<6} {'TARGET':<8} {'ACTUAL':<8} {'PRICE':<10} {'SHARES':<10} {'COST':<11} {'SECTOR'}")
+    print("-" * 86)
     
     total_invested = 0
     
     for p in final_picks:
         price = p['price']
-        if price <= 0: continue
+        shares = allocation['shares'].get(p['symbol'], 0)
+        target = f"{targets[p['symbol']]:.1%}"
         
-        # Calculate shares (floor)
-        shares = int(allocation_per_stock / price)
-        if shares == 0: shares = 1 # Force at least 1 share if possible, or skip?
+        if shares == 0:
+            print(f"{p['symbol']:<8} {p['score']:<6} {target:<8} {'-':<8} ₱{price:<9.2f} -- no whole board lot fits the budget, skipped")
+            continue
         
         cost = shares * price
         total_invested += cost
+        actual = f"{allocation['weights'][p['symbol']]:.1%}"
         
-        print(f"{p['symbol']:<8} {p['score']:<6} ₱{price:<9.2f} {shares:<10} ₱{cost:<9.2f} {p['sector']}")
+        print(f"{p['symbol']:<8} {p['score']:<6} {target:<8} {actual:<8} ₱{price:<9.2f} {shares:<10,} ₱{cost:<10,.2f} {p['sector']}")
         
         if simulate:
             manager.add_position(p['symbol'], shares, price)
 
-    print("-" * 70)
-    print(f"Total Invested: ₱{total_invested:,.2f} / ₱{investment_amount:,.2f}")
+    print("-" * 86)
+    print(f"Total Invested: ₱{total_invested:,.2f} / ₱{investment_amount:,.2f} (₱{investment_amount - total_invested:,.2f} cash left)")
     
     if simulate:
+        manager.save_portfolio()  # fold the log into portfolio.json (committed by the monthly workflow)
         print(f"\n🚀 Simulation Active: Added these positions to 'data/portfolio.json'.")
         print("Run 'python regenerate_report.py' to view them in dashboard.")
     else:
@@ -127,6 +138,13 @@ if __name__ == "__main__":
     parser.add_argument('--amount', type=int, default=10000, help="Investment Amount (PHP)")
     parser.add_argument('--stocks', type=int, default=5, help="Max Number of Stocks")
     parser.add_argument('--simulate', action='store_true', help="Write to portfolio.json")
+    parser.add_argument('--method', choices=('equal',) + optimizer.METHODS, default='equal',
+                        help="Weighting: equal (default) or an optimizer over return history")
+    parser.add_argument('--max-weight', type=float, default=0.25, help="Optimizer: max weight per stock (default 0.25)")
+    parser.add_argument('--sector-cap', type=float, default=0.4, help="Optimizer: max weight per sector (default 0.4)")
+    parser.add_argument('--max-drift', type=float, default=0.05,
+                        help="Max distance of a stock's board-lot weight from its target (default 0.05)")
     
     args = parser.parse_args()
-    suggest_portfolio(args.amount, args.stocks, args.simulate)
+    suggest_portfolio(args.amount, args.stocks, args.simulate, args.method, args.max_weight, args.sector_cap,
+                      args.max_drift)
@@ -0,0 +1,843 @@
+// dashboard.js
+// Static dashboard behaviour: navigation, virtualized grids/tables, stock modal, portfolio actions and charts.
+// report.html defines STOCK_DATA, PORTFOLIO_DATA, CARDS, TOP_PICKS and DIV_PICKS before loading this file.
+
+let previousSectionId = 'overview';
+
+function showSection(id) {
+    // Update Active State
+    if (!document.getElementById(id)) return;
+
+    localStorage.setItem('pse_active_section', id);
+    // ... rest of function ...
+
+    if (id !== 'search_results' && id !== 'search_tab') {
+        document.getElementById('search_input').value = "";
+        previousSectionId = id;
+        // Reset filters
+        document.getElementById('filter_sector').value = "All";
+        document.getElementById('filter_trend').value = "all";
+        document.getElementById('filter_val').value = "all";
+        document.getElementById('filter_yield').value = "all";
+        filterStocks(); 
+    }
+
+    document.querySelectorAll('.section').forEach(el => el.classList.remove('active'));
+    document.querySelectorAll('.nav-item').forEach(el => el.classList.remove('active'));
+
+
+    document.getElementById(id).classList.add('active');
+
+     // Highlight nav
+     let navLink = document.querySelector(`.nav-item[data-section="${id}"]`);
+     if (navLink) navLink.classList.add('active');
+
+    refreshViews();
+}
+
+// ... functions ...
+
+// Initialize from LocalStorage
+document.addEventListener('DOMContentLoaded', () => {
+    const savedSection = localStorage.getItem('pse_active_section');
+
+    if (savedSection && document.getElementById(savedSection)) {
+        showSection(savedSection);
+    } else {
+        refreshViews();
+    }
+
+    // Add Event Listeners
+    const searchInput = document.getElementById('search_input');
+    if (searchInput) {
+        searchInput.addEventListener('input', filterStocks);
+    }
+});
+
+// --- Data-driven grids and tables ---
+// CARDS (A-Z), TOP_PICKS and DIV_PICKS are injected by report_generator.py. Only the
+// rows scrolled into view exist in the DOM; filtering and sorting work on index arrays.
+
+const GRID_MIN_COLUMN = 300;  // px, as .dashboard-grid's minmax(300px, 1fr)
+const GRID_GAP = 24;          // px, 1.5rem
+const OVERSCAN_ROWS = 2;      // rows rendered above/below the viewport
+const FREQ_PER_YEAR = { 'Quarterly': 4, 'Semi-Annual': 2, 'Annual': 1 };
+
+function esc(value) {
+    return String(value == null ? '' : value)
+        .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+}
+
+function fixed(value, digits) {
+    return (Number(value) || 0).toFixed(digits);
+}
+
+function watchButton(c) {
+    return `<span class="watchlist-btn" onclick="event.stopPropagation(); openAddModal('${c.symbol}', ${c.price})" title="Add to Portfolio">☆</span>`;
+}
+
+function cardHtml(c) {
+    const trend = c.trend || 'Neutral';
+    const up = trend.indexOf('Uptrend') !== -1;
+    const trendCls = up ? 'green' : trend.indexOf('Downtrend') !== -1 ? 'red' : 'gray';
+    const suspended = c.status === 'Suspended' || c.status === 'Halted';
+
+    let badges = '';
+    if (suspended) badges += `<span class="trend-badge" style="background:rgba(245, 158, 11, 0.15); color:#f59e0b;">${esc(c.status.toUpperCase())}</span> `;
+    if (!(suspended && ['Suspended', 'Unknown', 'Neutral'].indexOf(trend) !== -1)) badges += `<span class="trend-badge ${trendCls}">${esc(trend)}</span>`;
+    if (c.golden) badges += ' <span class="trend-badge gold">GOLDEN CROSS</span>';
+    if (c.volume_spike) badges += ' <span class="trend-badge" style="background:rgba(59, 130, 246, 0.2); color:#60a5fa;">VOL SPIKE</span>';
+
+    const rsiCls = c.rsi < 30 ? 'text-red' : c.rsi > 70 ? 'text-green' : '';
+    const divRow = c.div_amount > 0
+        ? `<div style="border-top:1px solid #334155; margin-top:8px; padding-top:4px; display:flex; justify-content:space-between; align-items:center;"><span style="font-size:0.75rem; color:#94a3b8;">Est. Div Amt</span><span class="mono" style="font-size:0.8rem; color:#fff;">₱${fixed(c.div_amount, 2)}</span></div>`
+        : '';
+
+    return `
+        <div class="card" onclick="showStockDetails('${c.symbol}')" style="cursor:pointer;">
+            <div class="card-header">
+                <div>
+                    <div class="symbol mono" style="color:var(--accent); display:flex; align-items:center;">
+                        ${c.symbol}
+                        ${watchButton(c)}
+                    </div>
+                    <div style="font-size:0.75rem; color:var(--text-tertiary); margin-top:4px;">${esc((c.name || '').slice(0, 30))}</div>
+                </div>
+                <div style="text-align:right;">
+                    <div class="price mono">₱${fixed(c.price, 2)}</div>
+                    ${c.spark || ''}
+                </div>
+            </div>
+            <div style="margin-bottom:8px;">${badges}</div>
+            <div class="metrics">
+                <div class="metric">
+                    <span class="metric-label" title="RSI">RSI</span>
+                    <span class="metric-val mono ${rsiCls}">${fixed(c.rsi, 1)}</span>
+                </div>
+                <div class="metric">
+                    <span class="metric-label">Supp/Res</span>
+                    <span class="metric-val mono">${fixed(c.support, 2)} / ${fixed(c.resistance, 2)}</span>
+                </div>
+                <div class="metric">
+                    <span class="metric-label">P/E Ratio</span>
+                    <span class="metric-val mono">${c.pe ? fixed(c.pe, 2) : '-'}</span>
+                </div>
+                <div class="metric">
+                    <span class="metric-label">Yield</span>
+                    <span class="metric-val mono text-green">${c.yield ? fixed(c.yield, 2) + '%' : '-'}</span>
+                </div>
+            </div>
+            ${divRow}
+        </div>`;
+}
+
+function topPickRow(r) {
+    const trend = r.trend || 'Neutral';
+    const trendCls = trend.indexOf('Uptrend') !== -1 ? 'text-green' : trend.indexOf('Downtrend') !== -1 ? 'text-red' : 'text-muted';
+    let badge = '';
+    if (r.rank <= 3) badge = `<span class="rank-badge rank-${r.rank}">#${r.rank}</span>`;
+    else if (r.rank <= 10) badge = `<span class="rank-badge rank-other">#${r.rank}</span>`;
+    const scoreCls = r.score >= 9 ? 'green' : r.score >= 7 ? 'accent' : 'gray';
+    const yld = r.yield || 0;
+    return `
+        <tr onclick="showStockDetails('${r.symbol}')" style="cursor:pointer;">
+            <td>
+                <div class="mono" style="font-weight:700; color:var(--accent); display:flex; align-items:center;">
+                    ${r.symbol} ${badge}
+                    ${watchButton(r)}
+                </div>
+                <div style="font-size:0.75rem; color:#64748b;">${esc((r.name || '').slice(0, 20))}</div>
+            </td>
+            <td class="mono">₱${fixed(r.price, 2)}</td>
+            <td><span class="${trendCls}">${esc(trend)}</span></td>
+            <td class="mono">${fixed(r.win_rate, 0)}% <span style='font-size:0.75rem; color:#64748b;'>(${r.avg_return >= 0 ? '+' : ''}${fixed(r.avg_return, 1)}%)</span></td>
+            <td class="mono" style="font-size:0.8rem;">${esc(r.freq || '-')}</td>
+            <td class="mono ${yld > 4 ? 'text-green' : ''}">${yld > 0 ? fixed(yld, 2) + '%' : '-'}</td>
+            <td class="mono">${r.pe ? fixed(r.pe, 2) : '-'}</td>
+            <td class="mono" title="${esc((r.reasons || []).join('\n'))}">
+                <span class="${scoreCls}" style="font-weight:bold; padding:2px 8px; border-radius:4px;">${r.score}</span>
+            </td>
+        </tr>`;
+}
+
+function divPickRow(r) {
+    const trend = r.trend || 'Neutral';
+    const payoutCls = r.payout > 90 ? 'text-red' : r.payout > 60 ? 'text-muted' : 'text-green';
+    const trap = r.yield > 8.0 && (r.payout > 100 || trend.indexOf('Downtrend') !== -1)
+        ? ' <span style="background:rgba(239, 68, 68, 0.2); color:#ef4444; padding:2px 6px; border-radius:4px; font-size:0.7em;">TRAP?</span>'
+        : '';
+    return `
+        <tr onclick="showStockDetails('${r.symbol}')" style="cursor:pointer;">
+            <td>
+                <div class="mono" style="font-weight:700; color:var(--accent); display:flex; align-items:center;">
+                    ${r.symbol}
+                    ${watchButton(r)}
+                </div>
+                <div style="font-size:0.75rem; color:#64748b;">${esc((r.name || '').slice(0, 20))}</div>
+            </td>
+            <td class="mono">₱${fixed(r.price, 2)}</td>
+            <td class="text-green mono" style="font-weight:700;">${fixed(r.yield, 2)}%</td>
+            <td class="mono">${r.div_amount ? '₱' + fixed(r.div_amount, 2) : '-'}</td>
+            <td class="mono" style="font-weight:bold;">${r.eps ? '₱' + fixed(r.eps, 2) : '-'}</td>
+            <td class="mono ${payoutCls}">${fixed(r.payout, 1)}%</td>
+            <td class="mono" style="text-align:center;">${esc(r.freq || '-')}</td>
+            <td class="mono" style="font-size:0.8rem;">${esc(r.sched || '-')}</td>
+            <td class="mono">${r.pe ? fixed(r.pe, 2) : '-'}</td>
+            <td>${esc(trend)}${trap}</td>
+            <td class="mono">${r.div_score}</td>
+        </tr>`;
+}
+
+function allIndices(n) {
+    const out = new Int32Array(n);
+    for (let i = 0; i < n; i++) out[i] = i;
+    return out;
+}
+
+// Cards in a responsive grid; only the rows overlapping the scroller's viewport are in the DOM.
+class VirtualGrid {
+    constructor(host, items, render, scroller) {
+        this.items = items;
+        this.render = render;
+        this.scroller = scroller;
+        this.indices = allIndices(items.length);
+        this.rowHeight = 0;   // measured from the tallest rendered card
+        this.window = null;
+        this.spacer = document.createElement('div');
+        this.spacer.style.position = 'relative';
+        this.inner = document.createElement('div');
+        this.inner.className = 'dashboard-grid';
+        this.inner.style.position = 'absolute';
+        this.inner.style.left = '0';
+        this.inner.style.right = '0';
+        this.spacer.appendChild(this.inner);
+        host.innerHTML = '';
+        host.appendChild(this.spacer);
+        this.host = host;
+    }
+
+    setIndices(indices) {
+        this.indices = indices;
+        this.window = null;
+        this.update();
+    }
+
+    update() {
+        const width = this.host.clientWidth;
+        if (!width) return;  // section hidden
+        const cols = Math.max(1, Math.floor((width + GRID_GAP) / (GRID_MIN_COLUMN + GRID_GAP)));
+        const rows = Math.ceil(this.indices.length / cols);
+        const rowHeight = this.rowHeight || 240;
+
+        const top = this.host.getBoundingClientRect().top - this.scroller.getBoundingClientRect().top;
+        const first = Math.max(0, Math.floor(-top / rowHeight) - OVERSCAN_ROWS);
+        const last = Math.min(rows, Math.ceil((this.scroller.clientHeight - top) / rowHeight) + OVERSCAN_ROWS);
+        const key = `${cols}:${first}:${last}:${rowHeight}`;
+        if (key === this.window) return;
+        this.window = key;
+
+        let html = '';
+        for (let k = first * cols, end = Math.min(this.indices.length, last * cols); k < end; k++) {
+            html += this.render(this.items[this.indices[k]]);
+        }
+        this.inner.style.gridTemplateColumns = `repeat(${cols}, 1fr)`;
+        this.inner.style.top = (first * rowHeight) + 'px';
+        this.inner.innerHTML = html;
+        this.spacer.style.height = Math.max(0, rows * rowHeight - GRID_GAP) + 'px';
+
+        // Rows are laid out at a fixed pitch: grow it to the tallest card seen so far
+        let tallest = 0;
+        for (const card of this.inner.children) tallest = Math.max(tallest, card.scrollHeight);
+        if (tallest + GRID_GAP > this.rowHeight) {
+            this.rowHeight = tallest + GRID_GAP;
+            this.inner.style.gridAutoRows = tallest + 'px';
+            this.window = null;
+            this.update();
+        }
+    }
+}
+
+// Table body windowed inside its scrolling .table-container, sortable per column.
+class VirtualTable {
+    constructor(table, rows, render, keys) {
+        this.rows = rows;
+        this.render = render;
+        this.keys = keys.map(key => rows.map(key));  // per-column sort keys, computed once
+        this.tbody = table.tBodies[0];
+        this.scroller = table.closest('.table-container') || document.querySelector('main');
+        this.indices = allIndices(rows.length);
+        this.sorted = { col: -1, dir: 1 };
+        this.rowHeight = 0;
+        this.window = null;
+        this.scroller.addEventListener('scroll', () => this.update(), { passive: true });
+    }
+
+    sort(col) {
+        const keys = this.keys[col];
+        if (!keys) return;
+        const dir = this.sorted.col === col ? -this.sorted.dir : 1;
+        this.sorted = { col, dir };
+        const idx = Array.from(this.indices);
+        idx.sort((a, b) => (keys[a] > keys[b] ? 1 : keys[a] < keys[b] ? -1 : a - b) * dir);
+        this.indices = Int32Array.from(idx);
+        this.window = null;
+        this.update();
+    }
+
+    update() {
+        if (!this.tbody.offsetParent) return;  // section hidden
+        const n = this.indices.length;
+        const rowHeight = this.rowHeight || 60;
+        const head = this.tbody.offsetTop;
+        const viewTop = Math.max(0, this.scroller.scrollTop - head);
+        const first = Math.max(0, Math.floor(viewTop / rowHeight) - OVERSCAN_ROWS);
+        const last = Math.min(n, Math.ceil((viewTop + this.scroller.clientHeight) / rowHeight) + OVERSCAN_ROWS);
+        const key = `${first}:${last}:${rowHeight}`;
+        if (key === this.window) return;
+        this.window = key;
+
+        const spacer = rows => `<tr class="spacer"><td colspan="99" style="height:${rows * rowHeight}px; padding:0; border:0;"></td></tr>`;
+        let html = first > 0 ? spacer(first) : '';
+        for (let k = first; k < last; k++) html += this.render(this.rows[this.indices[k]]);
+        if (last < n) html += spacer(n - last);
+        this.tbody.innerHTML = html;
+
+        // Rows are laid out at a fixed pitch: grow it to the tallest row seen so far
+        const rendered = Array.from(this.tbody.rows).filter(tr => !tr.classList.contains('spacer'));
+        const tallest = Math.max(0, ...rendered.map(tr => tr.offsetHeight));
+        if (tallest > this.rowHeight) {
+            this.rowHeight = tallest;
+            this.window = null;
+            this.update();
+            return;
+        }
+        rendered.forEach(tr => { tr.style.height = this.rowHeight + 'px'; });
+    }
+}
+
+let VIEWS = null;
+
+// Column arrays over CARDS for filterStocks, built once
+function buildIndex() {
+    const n = CARDS.length;
+    const index = {
+        search: new Array(n),
+        sector: new Array(n),
+        up: new Uint8Array(n),
+        strong: new Uint8Array(n),
+        golden: new Uint8Array(n),
+        pe: new Float64Array(n),
+        yield: new Float64Array(n),
+    };
+    CARDS.forEach((c, i) => {
+        const trend = c.trend || '';
+        index.search[i] = (c.symbol + '\u0000' + (c.name || '')).toUpperCase();
+        index.sector[i] = c.sector;
+        index.up[i] = trend.indexOf('Uptrend') !== -1;
+        index.strong[i] = trend.indexOf('Strong Uptrend') !== -1;
+        index.golden[i] = !!c.golden;
+        index.pe[i] = c.pe == null ? NaN : c.pe;
+        index.yield[i] = c.yield || 0;
+    });
+    return index;
+}
+
+function views() {
+    if (VIEWS) return VIEWS;
+    const scroller = document.querySelector('main');
+    const sectors = {};
+    CARDS.forEach((c, i) => { (sectors[c.sector] = sectors[c.sector] || []).push(i); });
+
+    VIEWS = { index: buildIndex(), grids: [], tables: {} };
+    VIEWS.overview = new VirtualGrid(document.getElementById('all_stocks_grid'), CARDS, cardHtml, scroller);
+    VIEWS.grids.push(VIEWS.overview);
+    document.querySelectorAll('.vgrid[data-sector]').forEach(host => {
+        const grid = new VirtualGrid(host, CARDS, cardHtml, scroller);
+        grid.indices = Int32Array.from(sectors[host.dataset.sector] || []);
+        VIEWS.grids.push(grid);
+    });
+
+    const text = field => r => String(r[field] || '');
+    const num = field => r => Number(r[field]) || 0;
+    VIEWS.tables.table_top_picks = new VirtualTable(document.getElementById('table_top_picks'), TOP_PICKS, topPickRow,
+        [text('symbol'), num('price'), text('trend'), num('win_rate'), text('freq'), num('yield'), num('pe'), num('score')]);
+    VIEWS.tables.table_dividends = new VirtualTable(document.getElementById('table_dividends'), DIV_PICKS, divPickRow,
+        [text('symbol'), num('price'), num('yield'), num('div_amount'), num('eps'), num('payout'),
+         r => FREQ_PER_YEAR[r.freq] || 0, null, num('pe'), text('trend'), num('div_score')]);
+
+    scroller.addEventListener('scroll', refreshViews, { passive: true });
+    window.addEventListener('resize', () => { VIEWS.grids.forEach(g => { g.window = null; }); refreshViews(); });
+    return VIEWS;
+}
+
+function refreshViews() {
+    const v = views();
+    v.grids.forEach(g => g.update());
+    Object.values(v.tables).forEach(t => t.update());
+}
+
+function filterStocks() {
+    const v = views();
+    const idx = v.index;
+    const filter = document.getElementById('search_input').value.toUpperCase();
+    const sectorVal = document.getElementById('filter_sector').value;
+    const trendVal = document.getElementById('filter_trend').value;
+    const valVal = document.getElementById('filter_val').value;
+    const yieldVal = document.getElementById('filter_yield').value;
+    const maxPe = valVal === 'cheap' ? 15 : valVal === 'fair' ? 25 : null;
+    const minYield = yieldVal === 'all' ? null : parseFloat(yieldVal);
+
+    const out = new Int32Array(CARDS.length);
+    let count = 0;
+    for (let i = 0; i < CARDS.length; i++) {
+        if (filter && idx.search[i].indexOf(filter) === -1) continue;
+        if (sectorVal !== 'All' && idx.sector[i] !== sectorVal) continue;
+        if (trendVal === 'uptrend' && !idx.up[i]) continue;
+        if (trendVal === 'strong' && !idx.strong[i]) continue;
+        if (trendVal === 'golden' && !idx.golden[i]) continue;
+        if (maxPe !== null && !(idx.pe[i] <= maxPe)) continue;
+        if (minYield !== null && idx.yield[i] < minYield) continue;
+        out[count++] = i;
+    }
+    v.overview.setIndices(out.subarray(0, count));
+
+    // Update Count
+    let countEl = document.getElementById('overview_count');
+    if(countEl) countEl.innerText = count;
+}
+
+function sortTable(tableId, n) {
+    const table = views().tables[tableId];
+    if (table) table.sort(n);
+}
+
+let chart; 
+
+function formatCurrency(val) {
+    if (!val) return "-";
+    if (val >= 1e12) return "₱" + (val / 1e12).toFixed(2) + "T";
+    if (val >= 1e9) return "₱" + (val / 1e9).toFixed(2) + "B";
+    if (val >= 1e6) return "₱" + (val / 1e6).toFixed(2) + "M";
+    return "₱" + val.toLocaleString();
+}
+
+function formatNumber(val) {
+    if (!val) return "-";
+    if (val >= 1e12) return (val / 1e12).toFixed(2) + "T";
+    if (val >= 1e9) return (val / 1e9).toFixed(2) + "B";
+    if (val >= 1e6) return (val / 1e6).toFixed(2) + "M";
+    return val.toLocaleString();
+}
+
+function strengthMetrics(rs) {
+    // Percentile vs the universe / the sector, and the sector's momentum rank (relative_strength.py)
+    if (!rs || rs.rs === undefined) return "";
+    const cls = v => v >= 80 ? "text-green" : (v <= 20 ? "text-red" : "");
+    const rets = ["1m", "3m", "6m"].filter(lb => rs["ret_" + lb] !== undefined)
+        .map(lb => `${lb}: ${rs["ret_" + lb].toFixed(1)}% (P${rs["rank_" + lb]})`).join("\n");
+    let html = `<div class="metric"><span class="metric-label" title="${rets}">Relative Strength</span><span class="metric-val mono ${cls(rs.rs)}">${rs.rs}<span style="font-size:0.75rem; color:var(--text-tertiary);"> / sector ${rs.rs_sector}</span></span></div>`;
+    if (rs.sector_rs !== undefined) {
+        html += `<div class="metric"><span class="metric-label">Sector Momentum</span><span class="metric-val mono ${cls(rs.sector_rs)}">${rs.sector_rs}</span></div>`;
+    }
+    return html;
+}
+
+function timeframeMetrics(tfs) {
+    // Weekly / monthly trend from the aggregated bars (timeframes.py)
+    if (!tfs) return "";
+    const labels = { W: "Weekly Trend", M: "Monthly Trend" };
+    return Object.keys(labels).filter(tf => tfs[tf]).map(tf => {
+        const t = tfs[tf];
+        const cls = t.trend.includes("Uptrend") ? "text-green" : (t.trend.includes("Downtrend") ? "text-red" : "");
+        return `<div class="metric"><span class="metric-label" title="${t.bars} bars | RSI ${t.rsi} | MACD ${t.macd_bullish ? "bullish" : "bearish"}">${labels[tf]}</span><span class="metric-val mono ${cls}">${t.trend}</span></div>`;
+    }).join("");
+}
+
+function showStockDetails(symbol) {
+    const data = STOCK_DATA[symbol];
+    if(!data) return;
+
+    document.getElementById('chartModal').style.display = 'flex';
+
+    // 1. HEADER
+    const headerHtml = `
+        <div style="display:flex; justify-content:space-between; align-items:end; margin-bottom:15px;">
+            <div>
+                <h2 style="margin:0; color:var(--text-primary); font-family:'JetBrains Mono'; font-size:1.8rem;">${data.symbol}</h2>
+                <div style="color:var(--text-secondary); font-size:0.9rem;">${data.name}</div>
+            </div>
+            <div style="text-align:right; font-size:0.8rem; color:var(--text-tertiary);">
+                <div><span style="color:var(--accent);">${data.sector}</span> <span style="margin:0 4px;">•</span> ${data.subsector}</div>
+                <div>Listed: ${data.listing_date}</div>
+            </div>
+        </div>
+    `;
+    document.getElementById('modalTitle').innerHTML = headerHtml;
+
+
+    // 2. FUNDAMENTAL STATS GRID
+    let caps = formatCurrency(parseFloat(data.mkt_cap));
+    let yieldVal = parseFloat(data.divYield) > 0 ? parseFloat(data.divYield).toFixed(2) + "%" : "-";
+    let peVal = parseFloat(data.pe) > 0 ? parseFloat(data.pe).toFixed(2) : "-";
+    let epsVal = parseFloat(data.eps) != 0 ? parseFloat(data.eps).toFixed(2) : "-";
+
+    const statsHtml = `
+        <div style="display:grid; grid-template-columns: repeat(auto-fit, minmax(140px, 1fr)); gap:10px; margin-bottom:20px; background:var(--bg-panel); padding:15px; border-radius:8px; border:1px solid var(--border);">
+            <div class="metric"><span class="metric-label" title="Market Capitalization: Total value of all shares.\nFormula: Price x Outstanding Shares.\nDenomination: B = Billions, T = Trillions">Market Cap ⓘ</span><span class="metric-val mono" style="color:#fff;">${caps}</span></div>
+            <div class="metric"><span class="metric-label">P/E Ratio</span><span class="metric-val mono">${peVal}</span></div>
+            <div class="metric"><span class="metric-label">EPS</span><span class="metric-val mono">${epsVal}</span></div>
+            <div class="metric"><span class="metric-label">Div Yield</span><span class="metric-val mono text-green">${yieldVal}</span></div>
+            <div class="metric"><span class="metric-label">52-Wk High</span><span class="metric-val mono text-green">${data.high_52.toFixed(2)}</span></div>
+            <div class="metric"><span class="metric-label">52-Wk Low</span><span class="metric-val mono text-red">${data.low_52.toFixed(2)}</span></div>
+            ${timeframeMetrics(data.timeframes)}
+            ${strengthMetrics(data.strength)}
+        </div>
+
+        <div style="margin-bottom:20px; background:rgba(59, 130, 246, 0.05); padding:15px; border-radius:8px; border:1px solid rgba(59, 130, 246, 0.2);">
+            <h3 style="font-size:0.9rem; margin-bottom:10px; color:var(--accent); text-transform:uppercase; letter-spacing:1px; font-weight:700;">Trading Plan</h3>
+            <div style="display:grid; grid-template-columns: repeat(auto-fit, minmax(120px, 1fr)); gap:15px;">
+                <div class="metric">
+                    <span class="metric-label">Support Level</span>
+                    <span class="metric-val mono">₱${parseFloat(data.support).toFixed(2)}</span>
+                </div>
+                <div class="metric">
+                    <span class="metric-label" style="color:var(--red);">Suggested Stop Loss</span>
+                    <span class="metric-val mono text-red" style="font-weight:700; font-size:1.1rem;">₱${parseFloat(data.stop_loss).toFixed(2)}</span>
+                    <span style="font-size:0.75rem; color:var(--text-tertiary);">Risk: -${parseFloat(data.risk_pct).toFixed(1)}%</span>
+                </div>
+                <div class="metric">
+                    <span class="metric-label" style="color:var(--green);">Target (Resistance)</span>
+                    <span class="metric-val mono text-green">₱${parseFloat(data.resistance).toFixed(2)}</span>
+                </div>
+            </div>
+        </div>
+    `;
+
+    // 3. CHART CONTAINER
+    const container = document.getElementById('chart-container');
+    container.innerHTML = statsHtml + '<div id="main-chart" style="width:100%; height:400px; flex-shrink: 0; border:1px solid var(--border); border-radius:8px; overflow:hidden;"></div>';
+
+    // 4. DIVIDEND HISTORY (Bottom)
+    let divs = data.div_history;
+    if (divs && divs.length > 0) {
+        let rows = "";
+        divs.slice(0, 5).forEach(d => {
+             rows += `<tr>
+                <td style="padding:8px; border-bottom:1px solid #334155; font-size:0.8rem;">${d.ex_date}</td>
+                <td style="padding:8px; border-bottom:1px solid #334155; font-size:0.8rem;">${d.pay_date}</td>
+                <td style="padding:8px; border-bottom:1px solid #334155; font-size:0.8rem;">${d.type}</td>
+                <td style="padding:8px; border-bottom:1px solid #334155; font-size:0.8rem; font-family:'JetBrains Mono'; text-align:right;">₱${parseFloat(d.amount).toFixed(4)}</td>
+             </tr>`;
+        });
+
+        container.innerHTML += `
+            <div style="margin-top:20px;">
+                <h3 style="font-size:1rem; margin-bottom:10px; color:var(--text-secondary);">Recent Dividends</h3>
+                <table style="width:100%; border-collapse:collapse;">
+                    <thead>
+                        <tr style="text-align:left; color:var(--text-tertiary); font-size:0.75rem; text-transform:uppercase;">
+                            <th style="padding:8px;">Ex-Date</th>
+                            <th style="padding:8px;">Pay-Date</th>
+                            <th style="padding:8px;">Type</th>
+                            <th style="padding:8px; text-align:right;">Amount</th>
+                        </tr>
+                    </thead>
+                    <tbody>${rows}</tbody>
+                </table>
+            </div>
+        `;
+    }
+
+    // 5. RECENT NEWS
+    if (data.news && data.news.length > 0) {
+        let newsHtml = '<div style="margin-top:20px; border-top:1px solid #334155; padding-top:15px;">';
+        newsHtml += '<h3 style="font-size:1rem; margin-bottom:10px; color:var(--text-secondary);">Recent News</h3>';
+        newsHtml += '<div style="display:flex; flex-direction:column; gap:10px;">';
+
+        data.news.forEach(item => {
+            newsHtml += `
+            <div style="background:var(--bg-secondary); padding:10px; border-radius:6px; border:1px solid var(--border);">
+                <a href="${item.link}" target="_blank" style="display:block; color:var(--text-primary); text-decoration:none; font-weight:600; margin-bottom:4px; font-size:0.95rem;">${item.title}</a>
+                <div style="display:flex; justify-content:space-between; font-size:0.75rem; color:var(--text-tertiary);">
+                    <span>${item.source}</span>
+                    <span>${new Date(item.date).toLocaleDateString()}</span>
+                </div>
+            </div>
+            `;
+        });
+
+        newsHtml += '</div></div>';
+        container.innerHTML += newsHtml;
+    }
+
+    // RENDER CHART
+    // Precomputed series: D = 3 months of daily candles, W / M = downsampled closes
+    const series = data.chart || {};
+    const chartDiv = document.getElementById('main-chart');
+
+    if(!series.D || series.D.t.length === 0) {
+        chartDiv.innerHTML = '<div style="display:flex; height:100%; justify-content:center; align-items:center; color:var(--text-tertiary);">No Price History Available</div>';
+        return;
+    }
+
+    chart = LightweightCharts.createChart(chartDiv, {
+        width: chartDiv.clientWidth,
+        height: chartDiv.clientHeight,
+        layout: {
+            background: { type: 'solid', color: '#1e293b' },
+            textColor: '#94a3b8',
+        },
+        grid: {
+            vertLines: { color: '#334155' },
+            horzLines: { color: '#334155' },
+        },
+         rightPriceScale: {
+            borderColor: '#485c7b',
+        },
+        timeScale: {
+            borderColor: '#485c7b',
+        },
+    });
+
+    showChartLevel(chart, series, CHART_LEVELS.filter(l => series[l]).pop());
+    chart.timeScale().fitContent();
+    chart.timeScale().subscribeVisibleLogicalRangeChange(range => {
+        if (range && !chart.switching) pickChartLevel(chart, series, range);
+    });
+
+    // ResizeObserver to handle modal resize
+    new ResizeObserver(entries => {
+        if (entries.length === 0 || entries[0].target !== chartDiv) { return; }
+        const newRect = entries[0].contentRect;
+        chart.applyOptions({ width: newRect.width, height: newRect.height });
+    }).observe(chartDiv);
+}
+
+// --- CHART RESOLUTIONS ---
+const CHART_LEVELS = ['D', 'W', 'M'];  // finest first
+const DAY_MS = 86400000;
+
+function chartDays(level) {
+    return level.t.map(t => Date.parse(t) / DAY_MS);
+}
+
+function showChartLevel(chart, series, key) {
+    if (chart.levelSeries) chart.removeSeries(chart.levelSeries);
+    const level = series[key];
+    if (key === 'D') {
+        chart.levelSeries = chart.addCandlestickSeries({
+            upColor: '#10b981',
+            downColor: '#ef4444',
+            borderVisible: false,
+            wickUpColor: '#10b981',
+            wickDownColor: '#ef4444',
+        });
+        chart.levelSeries.setData(level.t.map((t, i) => ({ time: t, open: level.o[i], high: level.h[i], low: level.l[i], close: level.c[i] })));
+    } else {
+        chart.levelSeries = chart.addLineSeries({ color: '#3b82f6', lineWidth: 2 });
+        chart.levelSeries.setData(level.t.map((t, i) => ({ time: t, value: level.c[i] })));
+    }
+    chart.level = key;
+    chart.levelDays = chartDays(level);
+}
+
+// Visible span in days -> the finest resolution that covers it (daily candles only within their 3 months)
+function pickChartLevel(chart, series, range) {
+    const days = chart.levelDays;
+    const n = days.length;
+    const perBar = n > 1 ? (days[n - 1] - days[0]) / (n - 1) : 1;
+    const from = days[0] + range.from * perBar;
+    const to = days[0] + range.to * perBar;
+
+    let key = CHART_LEVELS.filter(l => series[l]).pop();
+    for (const l of CHART_LEVELS) {
+        if (!series[l]) continue;
+        const first = Date.parse(series[l].t[0]) / DAY_MS;
+        const covered = l === 'D' ? (to - from) <= 92 : (to - from) <= 366;
+        if (from >= first - perBar && covered) { key = l; break; }
+    }
+    if (key === chart.level) return;
+
+    chart.switching = true;
+    showChartLevel(chart, series, key);
+    const next = chart.levelDays;
+    const step = next.length > 1 ? (next[next.length - 1] - next[0]) / (next.length - 1) : 1;
+    chart.timeScale().setVisibleLogicalRange({ from: (from - next[0]) / step, to: (to - next[0]) / step });
+    chart.switching = false;
+}
+
+function closeModal() {
+    document.getElementById('chartModal').style.display = 'none';
+    if (chart) {
+        chart.remove();
+        chart = null;
+    }
+}
+
+// Close on click outside
+window.onclick = function(event) {
+    const modal = document.getElementById('chartModal');
+    if (event.target == modal) {
+        closeModal();
+    }
+}
+
+// Toast Notification
+function showToast(msg) {
+    let toast = document.createElement('div');
+    toast.className = 'toast';
+    toast.innerText = msg;
+    document.body.appendChild(toast);
+    setTimeout(() => { toast.remove(); }, 3000);
+}
+
+// --- API INTEGRATION ---
+async function apiCall(endpoint, data) {
+    try {
+        const response = await fetch(endpoint, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+        const res = await response.json();
+        if (res.success) {
+            window.location.reload();
+        } else {
+            alert('Error: ' + (res.error || 'Unknown error'));
+        }
+    } catch (e) {
+         alert('Server not running? Make sure to run "python app.py" to use this feature.');
+    }
+}
+
+let positionToRemove = null;
+function removePosition(symbol) {
+    positionToRemove = symbol;
+    document.getElementById('remove_symbol_display').innerText = symbol;
+    document.getElementById('removeModal').style.display = 'flex';
+}
+
+function confirmRemove() {
+    if(positionToRemove) {
+        apiCall('/api/remove', { symbol: positionToRemove });
+    }
+}
+
+function openAddModal(symbol, price) {
+    document.getElementById('addModal').style.display = 'flex';
+    if(symbol) document.getElementById('add_symbol').value = symbol;
+    if(price) document.getElementById('add_price').value = price;
+    document.getElementById('add_shares').value = "";
+}
+
+function submitAddPosition() {
+    const sym = document.getElementById('add_symbol').value.toUpperCase();
+    const shares = document.getElementById('add_shares').value;
+    const price = document.getElementById('add_price').value;
+
+    if(!sym || !shares || !price) {
+        alert("Please fill all fields");
+        return;
+    }
+
+    apiCall('/api/add', {
+        symbol: sym,
+        shares: parseFloat(shares),
+        price: parseFloat(price)
+    });
+}
+
+// Portfolio charts (PORTFOLIO_DATA is injected by report_generator.py)
+document.addEventListener('DOMContentLoaded', function() {
+    const positions = PORTFOLIO_DATA.positions;
+
+    // 1. Asset Allocation Data
+    const labels = positions.map(p => p.symbol);
+    const values = positions.map(p => p.market_value);
+    const colors = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#ec4899', '#6366f1', '#14b8a6'];
+
+    new Chart(document.getElementById('chartAllocation'), {
+        type: 'doughnut',
+        data: {
+            labels: labels,
+            datasets: [{
+                data: values,
+                backgroundColor: colors,
+                borderColor: '#1e293b',
+                borderWidth: 2
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: { position: 'right', labels: { color: '#94a3b8', font: { size: 10 } } },
+                title: { display: true, text: 'Holdings Allocation', color: '#f1f5f9' }
+            }
+        }
+    });
+
+    // 2. Sector Allocation Data
+    const sectorMap = {};
+    // Need to fetch sector from the big STOCK_DATA object if available, 
+    // or pass it in. Since STOCK_DATA is global, we can use it!
+
+    positions.forEach(p => {
+        let data = STOCK_DATA[p.symbol];
+        let sec = data ? data.sector : 'Unknown';
+        if(!sectorMap[sec]) sectorMap[sec] = 0;
+        sectorMap[sec] += p.market_value;
+    });
+
+    new Chart(document.getElementById('chartSector'), {
+        type: 'pie',
+        data: {
+            labels: Object.keys(sectorMap),
+            datasets: [{
+                data: Object.values(sectorMap),
+                backgroundColor: ['#8b5cf6', '#ec4899', '#f59e0b', '#3b82f6', '#10b981'],
+                borderColor: '#1e293b',
+                borderWidth: 2
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+             plugins: {
+                legend: { position: 'right', labels: { color: '#94a3b8', font: { size: 10 } } },
+                title: { display: true, text: 'Sector Exposure', color: '#f1f5f9' }
+            }
+        }
+    });
+
+    // 3. Equity Curve (NAV vs money invested, drawdown on the right axis)
+    const navSeries = PORTFOLIO_DATA.nav_series;
+    if(navSeries.length > 0) {
+        new Chart(document.getElementById('chartEquity'), {
+            type: 'line',
+            data: {
+                labels: navSeries.map(r => r.date),
+                datasets: [
+                    { label: 'NAV', data: navSeries.map(r => r.nav), borderColor: '#3b82f6', pointRadius: 0, borderWidth: 2, yAxisID: 'y' },
+                    { label: 'Invested', data: navSeries.map(r => r.invested), borderColor: '#94a3b8', pointRadius: 0, borderWidth: 1, borderDash: [4, 4], yAxisID: 'y' },
+                    { label: 'Drawdown %', data: navSeries.map(r => r.drawdown * 100), borderColor: '#ef4444', backgroundColor: 'rgba(239,68,68,0.15)', fill: true, pointRadius: 0, borderWidth: 1, yAxisID: 'dd' }
+                ]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                interaction: { mode: 'index', intersect: false },
+                scales: {
+                    x: { ticks: { color: '#94a3b8', maxTicksLimit: 12 }, grid: { color: '#334155' } },
+                    y: { ticks: { color: '#94a3b8' }, grid: { color: '#334155' } },
+                    dd: { position: 'right', max: 0, ticks: { color: '#ef4444' }, grid: { display: false } }
+                },
+                plugins: {
+                    legend: { labels: { color: '#94a3b8', font: { size: 10 } } },
+                    title: { display: true, text: 'Equity Curve', color: '#f1f5f9' }
+                }
+            }
+        });
+    }
+});
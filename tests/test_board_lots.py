@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from board_lots import allocate, board_lot, round_to_lot
+
+
+@pytest.mark.parametrize("price, lot", [
+    (0.0095, 1_000_000), (0.01, 100_000), (0.30, 10_000), (4.99, 1_000),
+    (5.00, 100), (49.95, 100), (50.00, 10), (999.0, 10), (1000.0, 5), (6000.0, 5),
+])
+def test_board_lot_bands(price, lot):
+    assert board_lot(price) == lot
+
+
+def test_round_to_lot_floors_to_whole_lots():
+    assert round_to_lot(1_234, 12.0) == 1_200
+    assert round_to_lot(99, 12.0) == 0
+    assert round_to_lot(25, 1500.0) == 25
+
+
+def _random_case(rng):
+    n = rng.randint(1, 5)
+    prices = {f"S{i}": round(rng.uniform(0.5, 800), 2) for i in range(n)}
+    raw = [rng.random() + 0.05 for _ in range(n)]
+    weights = {s: w / sum(raw) for s, w in zip(prices, raw)}
+    return rng.randint(2_000, 200_000), prices, weights
+
+
+def test_allocate_invariants():
+    rng = random.Random(7)
+    for _ in range(300):
+        budget, prices, weights = _random_case(rng)
+        out = allocate(budget, prices, weights)
+        spent = 0.0
+        for s, shares in out['shares'].items():
+            lot = board_lot(prices[s])
+            assert shares % lot == 0
+            spent += shares * prices[s]
+            # Within max_drift of the target, or one lot of it where lots are coarser
+            lot_weight = lot * prices[s] / budget
+            assert abs(out['weights'][s] - weights[s]) <= max(0.05, lot_weight) + 1e-9
+        assert spent == pytest.approx(out['cost'])
+        assert out['cost'] <= budget + 1e-6
+        assert out['cash'] == pytest.approx(budget - out['cost'])
+
+
+def test_branch_and_bound_never_leaves_more_cash_than_greedy():
+    rng = random.Random(11)
+    for _ in range(300):
+        budget, prices, weights = _random_case(rng)
+        greedy = allocate(budget, prices, weights, max_nodes=0)
+        repaired = allocate(budget, prices, weights)
+        assert repaired['cash'] <= greedy['cash'] + 1e-9
+
+
+def test_branch_and_bound_improves_on_greedy():
+    prices = {'S0': 108.06, 'S1': 267.61, 'S2': 66.31}
+    weights = {'S0': 0.37, 'S1': 0.38, 'S2': 0.25}
+    greedy = allocate(21_417, prices, weights, max_nodes=0)
+    repaired = allocate(21_417, prices, weights)
+    assert greedy['cash'] == pytest.approx(519.70)
+    assert repaired['cash'] == pytest.approx(102.20)
+
+
+def test_allocate_skips_unpriced_and_zero_weight():
+    out = allocate(10_000, {'A': 10.0, 'B': 0, 'C': 20.0}, {'A': 0.5, 'B': 0.3, 'C': 0.0})
+    assert set(out['shares']) == {'A'}
@@ -0,0 +1,223 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from ledger import Ledger
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "ledger.jsonl"), str(tmp_path / "ledger_index.json")
+
+
+def open_ledger(paths, method='fifo'):
+    return Ledger(paths[0], paths[1], method=method)
+
+
+def fresh_positions(paths, method='fifo'):
+    """Positions from a full replay (no index)."""
+    if os.path.exists(paths[1]):
+        os.remove(paths[1])
+    return open_ledger(paths, method).positions
+
+
+def lots(ledger, symbol):
+    return [tuple(lot) for lot in ledger.position(symbol)['lots']]
+
+
+# --- Cost methods ---
+
+def test_fifo_realized_and_remaining_lots(paths):
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-01-05')
+    ledger.buy('TEL', 100, 12.0, date='2026-02-05')
+    ledger.sell('TEL', 150, 15.0, date='2026-03-05')
+    pos = ledger.position('TEL')
+    assert pos['realized'] == pytest.approx(100 * 5 + 50 * 3)
+    assert pos['shares'] == 50
+    assert pos['cost'] == pytest.approx(50 * 12.0)
+    assert lots(ledger, 'TEL') == [('2026-02-05', 50, 12.0)]
+
+
+def test_average_cost_realized_and_remaining_lots(paths):
+    ledger = open_ledger(paths, 'average')
+    ledger.buy('TEL', 100, 10.0, date='2026-01-05')
+    ledger.buy('TEL', 100, 12.0, date='2026-02-05')
+    ledger.sell('TEL', 150, 15.0, date='2026-03-05')
+    pos = ledger.position('TEL')
+    assert pos['realized'] == pytest.approx(150 * 4.0)
+    assert pos['cost'] == pytest.approx(50 * 11.0)
+    assert [lot[2] for lot in pos['lots']] == [pytest.approx(11.0)]
+
+
+def test_full_sale_and_remove_clear_the_position(paths):
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-01-05')
+    ledger.sell('TEL', 100, 9.0, date='2026-01-06')
+    ledger.buy('BDO', 10, 100.0, date='2026-01-05')
+    ledger.remove('BDO', date='2026-01-07')
+    assert ledger.open_positions() == {}
+    assert ledger.realized_total() == pytest.approx(-100.0)  # remove books no P&L
+
+
+def test_fifo_uses_trade_date_order_for_back_dated_buys(paths):
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-05-01')
+    ledger.buy('TEL', 100, 5.0, date='2026-01-01')
+    ledger.sell('TEL', 100, 8.0, date='2026-06-01')
+    assert lots(ledger, 'TEL') == [('2026-05-01', 100, 10.0)]
+    closed = ledger.closed_lots()
+    assert [(c['buy_date'], c['realized']) for c in closed] == [('2026-01-01', pytest.approx(300.0))]
+    assert all(c['days_held'] >= 0 for c in closed)
+
+
+# --- Validation ---
+
+def test_sell_before_the_lots_it_would_close_is_rejected(paths):
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-05-01')
+    with pytest.raises(ValueError):
+        ledger.sell('TEL', 50, 8.0, date='2025-01-01')
+    ledger.buy('TEL', 100, 10.0, date='2026-07-01')
+    with pytest.raises(ValueError):
+        ledger.sell('TEL', 150, 8.0, date='2026-06-01')  # only 100 bought by then
+    ledger.sell('TEL', 100, 8.0, date='2026-06-01')
+    assert ledger.count == 3
+
+
+def test_oversell_and_unheld_are_rejected(paths):
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-01-01')
+    with pytest.raises(ValueError):
+        ledger.sell('TEL', 101, 8.0, date='2026-02-01')
+    with pytest.raises(ValueError):
+        ledger.sell('BDO', 1, 8.0, date='2026-02-01')
+    with pytest.raises(ValueError):
+        ledger.sell('BDO', 0, 8.0, date='2026-02-01')
+
+
+@pytest.mark.parametrize("date", ["notadate", "2026-13-01", "01/05/2026"])
+def test_invalid_dates_are_rejected_before_writing(paths, date):
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-01-01')
+    size = os.path.getsize(paths[0])
+    with pytest.raises(ValueError):
+        ledger.buy('TEL', 100, 10.0, date=date)
+    assert os.path.getsize(paths[0]) == size
+    assert ledger.count == 1
+
+
+# --- Durability and the index ---
+
+def test_torn_last_line_is_skipped_and_terminated(paths):
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-01-01')
+    with open(paths[0], 'ab') as f:
+        f.write(b'{"id": 2, "type": "buy", "sym')  # crash mid-append
+
+    reopened = open_ledger(paths)
+    assert reopened.count == 1
+    reopened.buy('BDO', 10, 100.0, date='2026-01-02')
+
+    again = open_ledger(paths)
+    assert again.count == 2
+    assert set(again.open_positions()) == {'TEL', 'BDO'}
+    assert [t['symbol'] for t in again.transactions()] == ['TEL', 'BDO']
+
+
+def test_index_plus_tail_replay_matches_full_replay(paths):
+    ledger = open_ledger(paths)
+    for day in range(1, 21):
+        ledger.buy('TEL', 100, 10.0 + day, date=f'2026-01-{day:02d}')
+        if day % 3 == 0:
+            ledger.sell('TEL', 150, 20.0, date=f'2026-01-{day:02d}')
+        if day == 10:
+            ledger.flush()  # index covers the first half; the rest is replayed on open
+
+    reopened = open_ledger(paths)
+    assert reopened.pending > 0
+    assert reopened.positions == fresh_positions(paths)
+
+
+def test_index_for_a_replaced_ledger_is_not_trusted(paths, tmp_path):
+    ledger = open_ledger(paths)
+    for day in range(1, 6):
+        ledger.buy('TEL', 100, 10.0, date=f'2026-01-{day:02d}')
+    ledger.flush()
+
+    other = Ledger(str(tmp_path / "other.jsonl"), str(tmp_path / "other_index.json"))
+    for day in range(1, 9):
+        other.buy('BDO', 10, 100.0, date=f'2026-02-{day:02d}')
+    shutil.copy(other.path, paths[0])  # e.g. a pull of the committed ledger
+
+    reopened = open_ledger(paths)
+    assert set(reopened.positions) == {'BDO'}
+    assert reopened.count == 8
+
+
+def test_refresh_picks_up_appends_from_another_ledger(paths):
+    first = open_ledger(paths)
+    second = open_ledger(paths)
+    second.buy('TEL', 100, 10.0, date='2026-01-01')
+    assert first.position('TEL')['shares'] == 100
+
+
+def test_index_file_round_trips(paths):
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-01-01')
+    ledger.flush()
+    with open(paths[1]) as f:
+        idx = json.load(f)
+    assert idx['offset'] == os.path.getsize(paths[0])
+    assert open_ledger(paths).pending == 0
+
+
+# --- Dividends ---
+
+def _fund(*events):
+    return {'TEL': {'div_history': [{'ex_date': ex, 'pay_date': pay, 'amount': amount}
+                                    for ex, pay, amount in events]}}
+
+
+def _received(ledger, fund, as_of):
+    return sum(e['amount'] for e in ledger.dividends(fund, as_of) if e['received'])
+
+
+def test_dividends_received_matches_replay(paths):
+    fund = _fund(("Mar 10, 2026", "Mar 30, 2026", "1.00"),
+                 ("Jun 10, 2026", "Jun 30, 2026", "1.50"),
+                 ("Sep 10, 2026", "Sep 30, 2026", "2.00"))
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-01-05')
+    assert ledger.dividends_received(fund, '2026-04-01') == pytest.approx(100.0)
+    ledger.buy('TEL', 100, 10.0, date='2026-06-10')  # on the ex-date: not entitled
+    ledger.sell('TEL', 50, 10.0, date='2026-08-01')
+    # Sep dividend declared (ex-date passed) but not yet paid on Sep 15
+    assert ledger.dividends_received(fund, '2026-09-15') == pytest.approx(_received(ledger, fund, '2026-09-15'))
+    assert ledger.dividends_received(fund, '2026-10-01') == pytest.approx(100 + 150 + 300)
+    assert ledger.dividends_received(fund, '2026-10-01') == pytest.approx(_received(ledger, fund, '2026-10-01'))
+
+
+def test_dividends_received_after_back_dated_trade_and_revised_history(paths):
+    fund = _fund(("Mar 10, 2026", "Mar 30, 2026", "1.00"))
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-01-05')
+    assert ledger.dividends_received(fund, '2026-10-01') == pytest.approx(100.0)
+
+    ledger.buy('TEL', 100, 10.0, date='2026-02-01')  # back-dated before an attributed ex-date
+    assert ledger.dividends_received(fund, '2026-10-01') == pytest.approx(200.0)
+
+    fund = _fund(("Mar 10, 2026", "Mar 30, 2026", "1.00"), ("Jan 20, 2026", "Feb 05, 2026", "0.50"))
+    assert ledger.dividends_received(fund, '2026-10-01') == pytest.approx(_received(ledger, fund, '2026-10-01'))
+
+
+def test_dividends_received_survives_the_index(paths):
+    fund = _fund(("Mar 10, 2026", "Mar 30, 2026", "1.00"), ("Jun 10, 2026", "Jun 30, 2026", "1.00"))
+    ledger = open_ledger(paths)
+    ledger.buy('TEL', 100, 10.0, date='2026-01-05')
+    ledger.dividends_received(fund, '2026-04-01')
+    ledger.flush()
+    ledger.buy('TEL', 100, 10.0, date='2026-05-01')
+    assert open_ledger(paths).dividends_received(fund, '2026-07-01') == pytest.approx(100 + 200)
@@ -0,0 +1,155 @@
+# timeframes.py
+# Weekly and monthly OHLCV bars kept incrementally from the daily bar store, plus indicators on them
+#
+# data/timeframes.json (stored through datastore) holds, per symbol in technical_data.json:
+#   last      date of the newest daily bar folded in
+#   W / M     [{'key', 'time', 'open', 'high', 'low', 'close', 'volume', 'days'}, ...]
+#             key is the ISO week ("2025-W07") or month ("2025-02"); time is the
+#             period's first trading day
+#   analysis  {tf: {'bar': stamp of the bar it was computed on, 'result': ...}}
+# An update only folds the daily bars after `last` (the still-open period is
+# rebuilt from the daily history, so a revised final bar is picked up). Periods
+# are never dropped, so weekly/monthly history outgrows the one year of daily
+# bars technical_data keeps. Indicators are Analyzer.analyze_trend run on the
+# aggregated bars, recomputed only when a timeframe's last bar changes.
+import bisect
+import datetime
+
+from datastore import data_mtime, load_data, save_data
+
+TIMEFRAMES_FILE = "data/timeframes.json"
+TECHNICAL_DATA_FILE = "data/technical_data.json"
+TIMEFRAMES = ('W', 'M')
+SKIP_KEYS = ('history', 'sparkline')  # daily-only outputs of analyze_trend
+
+
+def period_key(day, tf):
+    """Period a "YYYY-MM-DD" daily bar falls in: ISO week for 'W', month for 'M'."""
+    if tf == 'M':
+        return day[:7]
+    year, week, _ = datetime.date.fromisoformat(day[:10]).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _fold(bars, daily, tf):
+    """Append daily bars (ascending) to the aggregated `bars` of one timeframe, in place."""
+    for b in daily:
+        key = period_key(b['time'], tf)
+        volume = float(b.get('volume') or 0)
+        if bars and bars[-1]['key'] == key:
+            p = bars[-1]
+            p['high'] = max(p['high'], float(b['high']))
+            p['low'] = min(p['low'], float(b['low']))
+            p['close'] = float(b['close'])
+            p['volume'] += volume
+            p['days'] += 1
+        elif not bars or key > bars[-1]['key']:
+            bars.append({'key': key, 'time': b['time'][:10], 'open': float(b['open']),
+                         'high': float(b['high']), 'low': float(b['low']), 'close': float(b['close']),
+                         'volume': volume, 'days': 1})
+
+
+def update(record, history, timeframes=TIMEFRAMES):
+    """
+    Fold a symbol's daily history ([{time, open, high, low, close, volume}, ...],
+    ascending) into its table record (None for a new symbol). Returns the record.
+    """
+    record = record or {}
+    if not history:
+        return record
+    times = [b['time'][:10] for b in history]
+    last = record.get('last')
+    for tf in timeframes:
+        bars = record.setdefault(tf, [])
+        start = 0
+        if bars and times[0] <= bars[-1]['time']:
+            # The daily store still covers the open period: rebuild it from there
+            start = bisect.bisect_left(times, bars.pop()['time'])
+        elif bars and last:
+            start = bisect.bisect_right(times, last)
+        _fold(bars, history[start:], tf)
+    record['last'] = max(last or times[-1], times[-1])
+    return record
+
+
+def frame(bars):
+    """Aggregated bars as the OHLCV DataFrame Analyzer works on."""
+    import pandas as pd
+    return pd.DataFrame({
+        'Open': [b['open'] for b in bars],
+        'High': [b['high'] for b in bars],
+        'Low': [b['low'] for b in bars],
+        'Close': [b['close'] for b in bars],
+        'Volume': [b['volume'] for b in bars],
+    }, index=pd.DatetimeIndex([b['time'] for b in bars]))
+
+
+def analyze(record, tf, analyzer=None):
+    """analyze_trend on one timeframe of a record, cached in the record per last bar."""
+    bars = (record or {}).get(tf)
+    if not bars:
+        return {}
+    stamp = [len(bars), bars[-1]]
+    cached = record.setdefault('analysis', {}).get(tf)
+    if cached and cached.get('bar') == stamp:
+        return cached['result']
+    if analyzer is None:
+        from analyzer import Analyzer
+        analyzer = Analyzer()
+    result = {k: v for k, v in analyzer.analyze_trend(frame(bars)).items() if k not in SKIP_KEYS}
+    record['analysis'][tf] = {'bar': [len(bars), dict(bars[-1])], 'result': result}
+    return result
+
+
+def summary(record):
+    """{tf: {'trend', 'rsi', 'macd_bullish', 'bars'}} from a record's cached analysis (for display)."""
+    out = {}
+    for tf, cached in ((record or {}).get('analysis') or {}).items():
+        r = cached.get('result') or {}
+        if r:
+            out[tf] = {'trend': r.get('trend', 'Neutral'), 'rsi': round(float(r.get('rsi', 50)), 1),
+                       'macd_bullish': bool(r.get('macd', 0) > r.get('macd_signal', 0)),
+                       'bars': cached['bar'][0]}
+    return out
+
+
+def update_table(table, tech_data, analyzer=None):
+    """Fold every technical_data history into `table` ({symbol: record}) and refresh its indicators."""
+    for symbol, t in tech_data.items():
+        if not isinstance(t, dict) or not t.get('history'):
+            continue
+        record = table[symbol] = update(table.get(symbol), t['history'])
+        for tf in TIMEFRAMES:
+            analyze(record, tf, analyzer)
+    return table
+
+
+def save_table(table):
+    """Persist the table, stamped with the technical data file it was last updated from."""
+    save_data(TIMEFRAMES_FILE, {'source': data_mtime(TECHNICAL_DATA_FILE), 'symbols': table})
+
+
+def load_table(current=True):
+    """
+    The persisted table; None if missing or (current=True) not yet updated from the
+    present technical data. current=False returns whatever was stored, as the base
+    for an incremental update.
+    """
+    stored = load_data(TIMEFRAMES_FILE)
+    if not stored:
+        return None if current else {}
+    if current and stored.get('source') != data_mtime(TECHNICAL_DATA_FILE):
+        return None
+    return stored.get('symbols') or {}
+
+
+def ensure_table(tech_data=None):
+    """Current table, folding in (and saving) the technical data if it changed since the last update."""
+    table = load_table()
+    if table is not None:
+        return table
+    if tech_data is None:
+        tech_data = load_data(TECHNICAL_DATA_FILE)
+    table = update_table(load_table(current=False), tech_data)
+    save_table(table)
+    return table
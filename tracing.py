@@ -0,0 +1,130 @@
+# tracing.py
+# Lightweight run instrumentation: named spans + per-host request latency histograms
+import datetime
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+RUN_REPORT_FILE = "data/run_report.json"
+
+# Latency histogram bucket upper bounds (ms); the last bucket is open-ended
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def _percentile(sorted_vals, pct):
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, int(round(pct / 100.0 * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+class Tracer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.spans = {}      # name -> [seconds, ...]
+            self.requests = {}   # host -> [(symbol, seconds, ok), ...]
+
+    @contextmanager
+    def span(self, name):
+        """Time a block of work under `name` (fetch, parse, analyze, score, news, render...)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - start)
+
+    def add_span(self, name, seconds):
+        with self.lock:
+            self.spans.setdefault(name, []).append(seconds)
+
+    def record_request(self, host, symbol, seconds, ok=True):
+        """Record one upstream round trip for a symbol."""
+        with self.lock:
+            self.requests.setdefault(host, []).append((symbol, seconds, ok))
+
+    def summary(self):
+        with self.lock:
+            spans = {k: list(v) for k, v in self.spans.items()}
+            requests = {k: list(v) for k, v in self.requests.items()}
+
+        out = {'spans': {}, 'hosts': {}}
+        for name, vals in spans.items():
+            vals.sort()
+            out['spans'][name] = {
+                'count': len(vals),
+                'total_s': round(sum(vals), 4),
+                'mean_ms': round(sum(vals) / len(vals) * 1000, 2),
+                'p50_ms': round(_percentile(vals, 50) * 1000, 2),
+                'p95_ms': round(_percentile(vals, 95) * 1000, 2),
+                'max_ms': round(vals[-1] * 1000, 2),
+            }
+
+        for host, rows in requests.items():
+            ms = sorted(r[1] * 1000 for r in rows)
+            buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            for v in ms:
+                i = 0
+                while i < len(LATENCY_BUCKETS_MS) and v > LATENCY_BUCKETS_MS[i]:
+                    i += 1
+                buckets[i] += 1
+            slowest = sorted(rows, key=lambda r: r[1], reverse=True)[:5]
+            out['hosts'][host] = {
+                'count': len(rows),
+                'errors': sum(1 for r in rows if not r[2]),
+                'p50_ms': round(_percentile(ms, 50), 1),
+                'p95_ms': round(_percentile(ms, 95), 1),
+                'max_ms': round(ms[-1], 1),
+                'histogram_ms': {
+                    **{f"<={b}": c for b, c in zip(LATENCY_BUCKETS_MS, buckets)},
+                    f">{LATENCY_BUCKETS_MS[-1]}": buckets[-1],
+                },
+                'slowest': [{'symbol': s, 'ms': round(sec * 1000, 1)} for s, sec, _ in slowest],
+            }
+        return out
+
+    def finish(self, entry):
+        """Print the run summary and store it under `entry` in data/run_report.json."""
+        report = self.summary()
+        report['started'] = datetime.datetime.fromtimestamp(self.started).strftime('%Y-%m-%d %H:%M:%S')
+        report['duration_s'] = round(time.time() - self.started, 2)
+
+        all_reports = {}
+        if os.path.exists(RUN_REPORT_FILE):
+            try:
+                with open(RUN_REPORT_FILE, 'r') as f:
+                    all_reports = json.load(f)
+            except:
+                all_reports = {}
+        previous = all_reports.get(entry, {})
+
+        print(f"\n{'='*60}")
+        print(f" RUN SUMMARY ({entry}) - {report['duration_s']:.1f}s"
+              + (f" (prev {previous['duration_s']:.1f}s)" if previous.get('duration_s') else ""))
+        print(f"{'='*60}")
+        print(f" {'SPAN':<20} {'COUNT':>6} {'TOTAL':>9} {'P50':>9} {'P95':>9} {'PREV TOTAL':>11}")
+        for name, s in sorted(report['spans'].items(), key=lambda kv: kv[1]['total_s'], reverse=True):
+            prev = previous.get('spans', {}).get(name, {}).get('total_s')
+            prev_txt = f"{prev:.2f}s" if prev is not None else "-"
+            print(f" {name:<20} {s['count']:>6} {s['total_s']:>8.2f}s {s['p50_ms']:>7.1f}ms {s['p95_ms']:>7.1f}ms {prev_txt:>11}")
+        for host, h in report['hosts'].items():
+            print(f" {host}: {h['count']} req, {h['errors']} err, p50 {h['p50_ms']:.0f}ms, p95 {h['p95_ms']:.0f}ms, max {h['max_ms']:.0f}ms")
+        print(f"{'='*60}")
+
+        all_reports[entry] = report
+        os.makedirs(os.path.dirname(RUN_REPORT_FILE), exist_ok=True)
+        with open(RUN_REPORT_FILE, 'w') as f:
+            json.dump(all_reports, f, indent=4)
+        return report
+
+
+# Process-wide tracer used by the pipeline modules
+TRACER = Tracer()
+span = TRACER.span
+record_request = TRACER.record_request
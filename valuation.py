@@ -0,0 +1,178 @@
+# valuation.py
+# Historical portfolio valuation: daily market value, P&L, NAV and drawdown in one vectorized pass
+#
+# The ledger is replayed once per *transaction* to get the holdings after each trade.
+# Everything per *date* is then DataFrame arithmetic over a dates x symbols panel:
+#   closes   technical_data 'history' closes, forward-filled (trade prices seed the gaps)
+#   shares   holdings after each trade, forward-filled onto the trading dates
+#   value    (shares * closes).sum(axis=1)
+# so a year of history for the whole book costs a handful of pandas operations.
+#
+# Buys are treated as new money: cash holds sale proceeds and dividends (ex-date
+# basis), nav = market_value + cash and pl = nav - invested. Drawdown is measured
+# on a time-weighted return index (buy amounts are stripped out of each day's
+# change), so adding money to the book never shows up as a recovery.
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['market_value', 'cost_basis', 'unrealized', 'realized', 'dividends', 'cash',
+           'invested', 'nav', 'pl', 'return_index', 'drawdown']
+
+
+def _events(txns, ledger=None):
+    """
+    One row per transaction with the symbol's state after it:
+    date, symbol, shares, cost, realized, invested (buy amount), proceeds (sale amount).
+    A 'remove' (a position entered by mistake) takes its cost back out of invested.
+    With a ledger its cost method (FIFO / average) prices the lots; without one
+    the transactions are plain buys.
+    """
+    positions = {}
+    rows = []
+    for t in txns:
+        kind, shares, price = t['type'], t.get('shares') or 0.0, t.get('price') or 0.0
+        cost_before = positions.get(t['symbol'], {}).get('cost', 0.0)
+        if ledger is not None:
+            ledger._apply(positions, t)
+            pos = positions[t['symbol']]
+        else:
+            pos = positions.setdefault(t['symbol'], {'shares': 0.0, 'cost': 0.0, 'realized': 0.0})
+            pos['shares'] += shares
+            pos['cost'] += shares * price
+        rows.append((t['date'], t['symbol'], pos['shares'], pos['cost'], pos['realized'],
+                     shares * price if kind == 'buy' else (pos['cost'] - cost_before if kind == 'remove' else 0.0),
+                     shares * price if kind == 'sell' else 0.0,
+                     t.get('price') if kind in ('buy', 'sell') else None))
+    return pd.DataFrame(rows, columns=['date', 'symbol', 'shares', 'cost', 'realized',
+                                       'invested', 'proceeds', 'price'])
+
+
+def price_panel(histories, symbols, start=None):
+    """
+    Closes as a dates x symbols DataFrame (forward-filled).
+    histories: {symbol: [{'time': 'YYYY-MM-DD', 'close': x, ...}, ...]} (technical_data 'history').
+    """
+    times, values, cols = [], [], []
+    for j, symbol in enumerate(symbols):
+        bars = histories.get(symbol) or []
+        times += [b['time'] for b in bars]
+        values += [b['close'] for b in bars]
+        cols += [j] * len(bars)
+    dates = sorted(set(times))
+    row_of = {t: k for k, t in enumerate(dates)}
+    rows = [row_of[t] for t in times]
+    grid = np.full((len(dates), len(symbols)), np.nan)
+    grid[rows, cols] = np.asarray(values, dtype=float)  # duplicate bars: the last one wins
+    panel = pd.DataFrame(grid, index=pd.Index(dates, dtype=object), columns=list(symbols))
+    if start is not None:
+        # Keep the last close before `start` so positions opened on a holiday are priced
+        before = panel.index[panel.index < start]
+        panel = panel.loc[before[-1]:] if len(before) else panel
+    return panel.ffill()
+
+
+def _on_dates(frame, dates):
+    """Map event dates onto the first trading date on/after them (events past the end are dropped)."""
+    pos = np.searchsorted(np.asarray(dates), frame['date'].to_numpy(), side='left')
+    keep = pos < len(dates)
+    frame = frame[keep].copy()
+    frame['date'] = np.asarray(dates)[pos[keep]]
+    return frame
+
+
+def _value(txns, histories, dividends=(), ledger=None):
+    """Core valuation over sorted transactions. Returns a DataFrame indexed by date (COLUMNS)."""
+    if not txns:
+        return pd.DataFrame(columns=COLUMNS)
+    events = _events(txns, ledger)
+    symbols = list(dict.fromkeys(events['symbol']))
+    first = events['date'].iloc[0]
+
+    closes = price_panel(histories, symbols, start=first)
+    dates = closes.index[closes.index >= first]
+    if not len(dates):
+        return pd.DataFrame(columns=COLUMNS)
+    events = _on_dates(events, dates)
+
+    # Holdings per date: the state after the last trade of each (date, symbol), carried forward
+    last = events.groupby(['date', 'symbol'], sort=False).last()
+    state = {col: last[col].unstack('symbol').reindex(index=dates, columns=symbols).ffill().fillna(0.0)
+             for col in ('shares', 'cost', 'realized')}
+
+    # Trade prices stand in for closes the history doesn't cover (e.g. a listing with no bars yet)
+    fills = last['price'].dropna().astype(float).unstack('symbol').reindex(index=closes.index, columns=symbols)
+    prices = closes.fillna(fills).ffill().reindex(dates)
+    prices = prices.fillna(state['cost'] / state['shares'].replace(0.0, np.nan)).fillna(0.0)
+
+    flows = events.groupby('date')[['invested', 'proceeds']].sum().reindex(dates, fill_value=0.0)
+    div = pd.Series(0.0, index=dates)
+    if len(dividends):
+        d = _on_dates(pd.DataFrame(list(dividends), columns=['date', 'amount']), dates)
+        div = d.groupby('date')['amount'].sum().reindex(dates, fill_value=0.0)
+
+    out = pd.DataFrame(index=dates)
+    out['market_value'] = (state['shares'] * prices).sum(axis=1)
+    out['cost_basis'] = state['cost'].sum(axis=1)
+    out['unrealized'] = out['market_value'] - out['cost_basis']
+    out['realized'] = state['realized'].sum(axis=1)
+    out['dividends'] = div.cumsum()
+    out['cash'] = flows['proceeds'].cumsum() + out['dividends']
+    out['invested'] = flows['invested'].cumsum()
+    out['nav'] = out['market_value'] + out['cash']
+    out['pl'] = out['nav'] - out['invested']
+
+    # Time-weighted daily returns: today's nav minus today's new money, over yesterday's nav
+    prev = out['nav'].shift(1)
+    daily = ((out['nav'] - flows['invested']) / prev - 1.0).where(prev > 0, 0.0)
+    out['return_index'] = (1.0 + daily).cumprod()
+    out['drawdown'] = out['return_index'] / out['return_index'].cummax() - 1.0
+    out.index.name = 'date'
+    return out
+
+
+def _histories(tech_data):
+    return {s: d.get('history') or [] for s, d in tech_data.items() if isinstance(d, dict)}
+
+
+def value_ledger(ledger, tech_data, fund_data=None):
+    """Daily valuation of every transaction in `ledger` against technical_data price history."""
+    txns = sorted(ledger.transactions(), key=lambda t: (t['date'], t['id']))
+    return value_transactions(txns, _histories(tech_data), ledger, fund_data)
+
+
+def value_transactions(txns, histories, ledger, fund_data=None):
+    """value_ledger over an already-sorted transaction list and {symbol: history} mapping."""
+    dividends = []
+    if fund_data and txns:
+        as_of = max((h[-1]['time'] for s, h in histories.items() if h), default=None)
+        dividends = [(e['ex_date'], e['amount']) for e in ledger.dividends(fund_data, as_of=as_of)]
+    return _value(txns, histories, dividends, ledger)
+
+
+def summarize(frame):
+    """Headline numbers for a valuation frame (None if it is empty)."""
+    if frame is None or frame.empty:
+        return None
+    last = frame.iloc[-1]
+    trough = frame['drawdown'].idxmin()
+    peak = frame.loc[:trough, 'return_index'].idxmax()
+    return {
+        'start': frame.index[0],
+        'end': frame.index[-1],
+        'nav': float(last['nav']),
+        'invested': float(last['invested']),
+        'pl': float(last['pl']),
+        'time_weighted_return_pct': float(last['return_index'] - 1.0) * 100.0,
+        'drawdown_pct': float(last['drawdown']) * 100.0,
+        'max_drawdown_pct': float(frame['drawdown'].min()) * 100.0,
+        'max_drawdown_peak': peak,
+        'max_drawdown_trough': trough,
+    }
+
+
+def to_records(frame, columns=COLUMNS):
+    """[{date, <columns>}] rows for JSON (the dashboard chart)."""
+    if frame is None or frame.empty:
+        return []
+    rounded = frame[list(columns)].astype(float).round(4)
+    return [dict(date=d, **row) for d, row in zip(rounded.index, rounded.to_dict('records'))]